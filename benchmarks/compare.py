@@ -0,0 +1,47 @@
+"""Compares two results of benchmarks/run.py (e.g. of two commits).
+
+Usage:
+    python benchmarks/compare.py baseline.json results.json
+"""
+
+import json
+import click
+
+from typing import Any, Dict
+from prettytable import PrettyTable
+
+METRICS = ["files_per_s", "kloc_per_s", "peak_rss_mb"]
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+@click.command(help="Compares the results of two runs of the benchmarks.")
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("results", type=click.Path(exists=True, dir_okay=False))
+def main(baseline: str, results: str) -> None:
+    old, new = load(baseline), load(results)
+    if old["params"] != new["params"]:
+        click.echo(
+            "WARNING: The benchmarks were run with different parameters.", err=True
+        )
+
+    table = PrettyTable()
+    table.field_names = ["Tech", "Metric", "Baseline", "Results", "Change (%)"]
+    for tech, r in new["results"].items():
+        if tech not in old["results"]:
+            continue
+        for metric in METRICS:
+            before, after = old["results"][tech][metric], r[metric]
+            change = (after - before) / before * 100 if before != 0 else 0.0
+            table.add_row(  # type: ignore
+                [tech, metric, round(before, 2), round(after, 2), round(change, 1)]
+            )
+    print(f"Baseline: {old.get('commit')}\nResults: {new.get('commit')}")
+    print(table)
+
+
+if __name__ == "__main__":
+    main()
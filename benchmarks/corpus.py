@@ -0,0 +1,213 @@
+"""Generator of synthetic IaC scripts used by the benchmarks.
+
+The scripts are not meant to be realistic, but to exercise the parsers and
+the analyses of GLITCH with inputs whose size can be controlled: the number
+of files, the number of resources per file, the depth of the nested
+attributes and the proportion of comments.
+"""
+
+import os
+import random
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+from glitch.repr.inter import UnitBlockType
+from glitch.tech import Tech
+
+
+@dataclass
+class CorpusParams:
+    files: int = 50
+    resources: int = 20
+    depth: int = 2
+    # Proportion of resources preceded by a comment
+    comments: float = 0.2
+    seed: int = 0
+
+
+# The words used in the comments include keywords of some smells (e.g.
+# suspicious comments), so that the analyses also report errors
+COMMENT_WORDS = ["install", "the", "service", "config", "todo", "fixme", "hack", "bug"]
+PACKAGES = ["nginx", "apache2", "mysql-server", "redis", "curl", "git", "openssl"]
+
+
+def _comment(rand: random.Random, params: CorpusParams, prefix: str) -> List[str]:
+    if rand.random() >= params.comments:
+        return []
+    return [prefix + " " + " ".join(rand.choices(COMMENT_WORDS, k=6))]
+
+
+def ansible_script(rand: random.Random, params: CorpusParams, n: int) -> str:
+    lines = ["---", f"- name: Benchmark play {n}", "  hosts: all", "  tasks:"]
+    for i in range(params.resources):
+        lines += ["    " + c for c in _comment(rand, params, "#")]
+        lines += [
+            f"    - name: Install package {i}",
+            "      apt:",
+            f"        name: {rand.choice(PACKAGES)}",
+            "        state: present",
+            f"        update_cache: {rand.choice(['yes', 'no'])}",
+        ]
+        indent = "        "
+        for d in range(params.depth):
+            lines.append(f"{indent}options_{d}:")
+            indent += "  "
+        lines.append(f"{indent}value: http://example.com/{n}/{i}")
+        lines += [
+            "      become: yes",
+            f"      when: ansible_os_family == 'Debian' and item_{i} is defined",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def _chef_hash(depth: int, value: str) -> str:
+    if depth == 0:
+        return value
+    return "{ 'level_" + str(depth) + "' => " + _chef_hash(depth - 1, value) + " }"
+
+
+def chef_script(rand: random.Random, params: CorpusParams, n: int) -> str:
+    lines: List[str] = [f"version = '{n}.0'", ""]
+    for i in range(params.resources):
+        lines += _comment(rand, params, "#")
+        lines += [
+            f"package '{rand.choice(PACKAGES)}-{i}' do",
+            "  action :install",
+            f'  version "#{{version}}"',
+            f"  options({_chef_hash(params.depth, repr(f'http://example.com/{i}'))})",
+            "end",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def _puppet_hash(depth: int, value: str) -> str:
+    if depth == 0:
+        return value
+    return "{ 'level_" + str(depth) + "' => " + _puppet_hash(depth - 1, value) + " }"
+
+
+def puppet_script(rand: random.Random, params: CorpusParams, n: int) -> str:
+    lines = [f"class benchmark_{n} (", "  $version = 'latest',", ") {"]
+    for i in range(params.resources):
+        lines += ["  " + c for c in _comment(rand, params, "#")]
+        lines += [
+            f"  package {{ '{rand.choice(PACKAGES)}-{i}':",
+            "    ensure => $version,",
+            f"    install_options => {_puppet_hash(params.depth, repr(f'http://example.com/{i}'))},",
+            "  }",
+            "",
+        ]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def terraform_script(rand: random.Random, params: CorpusParams, n: int) -> str:
+    lines: List[str] = []
+    for i in range(params.resources):
+        lines += _comment(rand, params, "#")
+        lines += [
+            f'resource "aws_s3_bucket" "bucket_{n}_{i}" {{',
+            f'  bucket = "bucket-{n}-{i}"',
+            f'  acl    = "{rand.choice(["private", "public-read"])}"',
+            "  tags = {",
+            f'    Name = "bucket-{n}-{i}"',
+            "  }",
+        ]
+        indent = "  "
+        for d in range(params.depth):
+            lines.append(f"{indent}server_side_encryption_configuration_{d} {{")
+            indent += "  "
+        lines.append(f'{indent}sse_algorithm = "AES256"')
+        for d in range(params.depth):
+            indent = indent[:-2]
+            lines.append(f"{indent}}}")
+        lines += ["}", ""]
+    return "\n".join(lines)
+
+
+def docker_script(rand: random.Random, params: CorpusParams, n: int) -> str:
+    # Dockerfiles do not have nested attributes, so the depth is used as the
+    # number of commands of each RUN instruction
+    lines = [f"FROM ubuntu:2{n % 3}.04", ""]
+    for i in range(params.resources):
+        lines += _comment(rand, params, "#")
+        commands = ["apt-get update"] + [
+            f"apt-get install -y {rand.choice(PACKAGES)}"
+            for _ in range(max(1, params.depth))
+        ]
+        lines += [
+            f"ENV VERSION_{i}={i}.0",
+            "RUN " + " && \\\n    ".join(commands),
+            f"RUN curl -o /tmp/file_{i} http://example.com/{n}/{i}",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def gha_script(rand: random.Random, params: CorpusParams, n: int) -> str:
+    lines = [f"name: Benchmark {n}", "on: push", "jobs:", "  build:"]
+    lines += ["    runs-on: ubuntu-latest", "    steps:"]
+    for i in range(params.resources):
+        lines += ["      " + c for c in _comment(rand, params, "#")]
+        lines += [
+            f"      - name: Step {i}",
+            "        uses: actions/checkout@v4",
+            "        with:",
+            f"          ref: branch-{i}",
+            f"      - run: echo ${{{{ github.sha }}}} && curl http://example.com/{i}",
+        ]
+        # Workflows do not have nested attributes, so the depth is used as
+        # the number of environment variables of each step
+        lines += ["        env:"] + [
+            f"          VAR_{d}: value-{d}" for d in range(max(1, params.depth))
+        ]
+    return "\n".join(lines) + "\n"
+
+
+GENERATORS: Dict[Tech, Callable[[random.Random, CorpusParams, int], str]] = {
+    Tech.ansible: ansible_script,
+    Tech.chef: chef_script,
+    Tech.puppet: puppet_script,
+    Tech.terraform: terraform_script,
+    Tech.docker: docker_script,
+    Tech.gha: gha_script,
+}
+
+EXTENSIONS: Dict[Tech, str] = {
+    Tech.ansible: "yml",
+    Tech.chef: "rb",
+    Tech.puppet: "pp",
+    Tech.terraform: "tf",
+    Tech.docker: "Dockerfile",
+    Tech.gha: "yml",
+}
+
+TYPES: Dict[Tech, UnitBlockType] = {
+    Tech.ansible: UnitBlockType.script,
+    Tech.chef: UnitBlockType.unknown,
+    Tech.puppet: UnitBlockType.unknown,
+    Tech.terraform: UnitBlockType.unknown,
+    Tech.docker: UnitBlockType.unknown,
+    Tech.gha: UnitBlockType.unknown,
+}
+
+
+def generate(tech: Tech, folder: str, params: CorpusParams) -> List[str]:
+    """Writes a synthetic corpus of the technology to the folder.
+
+    Returns:
+        List[str]: The paths of the generated files.
+    """
+    rand = random.Random(f"{params.seed}-{tech.tech}")
+    paths: List[str] = []
+    for n in range(params.files):
+        if tech == Tech.docker:
+            name = f"benchmark_{n}.Dockerfile"
+        else:
+            name = f"benchmark_{n}.{EXTENSIONS[tech]}"
+        path = os.path.join(folder, name)
+        with open(path, "w") as f:
+            f.write(GENERATORS[tech](rand, params, n))
+        paths.append(path)
+    return paths
@@ -0,0 +1,148 @@
+"""Measures the memory used by the intermediate representation of a synthetic
+corpus of each technology.
+
+The representation of every file is kept in memory at the same time (as it
+happens when a project is analyzed) and the memory allocated while parsing
+is divided by the number of nodes of the representation.
+
+Usage:
+    python benchmarks/memory.py --tech terraform --output memory.json
+"""
+
+import os
+import sys
+import gc
+import json
+import click
+import tracemalloc
+
+from dataclasses import asdict
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional, Tuple
+from prettytable import PrettyTable
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusParams, TYPES, generate  # noqa: E402
+from glitch.analyzer import get_parser  # noqa: E402
+from glitch.repr.inter import CodeElement  # noqa: E402
+from glitch.tech import Tech  # noqa: E402
+
+
+def count_nodes(element: Any) -> int:
+    """Counts the code elements reachable from the element."""
+    count = 0
+    stack: List[Any] = [element]
+    seen: set[int] = set()
+    while stack:
+        e = stack.pop()
+        if isinstance(e, (list, tuple)):
+            stack.extend(e)  # type: ignore
+            continue
+        elif isinstance(e, dict):
+            stack.extend(e.keys())  # type: ignore
+            stack.extend(e.values())  # type: ignore
+            continue
+        elif not isinstance(e, CodeElement) or id(e) in seen:
+            continue
+
+        seen.add(id(e))
+        count += 1
+        for attr in ["statements", "attributes", "keyvalues", "value"]:
+            stack.append(getattr(e, attr, None))
+        for attr in ["dependencies", "comments", "variables", "atomic_units"]:
+            stack.append(getattr(e, attr, None))
+        stack.append(getattr(e, "unit_blocks", None))
+        stack.append(getattr(e, "else_statement", None))
+    return count
+
+
+def measure_tech(tech: Tech, params: CorpusParams) -> Dict[str, Any]:
+    parser = get_parser(tech)
+    with TemporaryDirectory() as folder:
+        paths = generate(tech, folder, params)
+        # Parses a file first, so that the memory of the parser itself (e.g.
+        # its tables) is not attributed to the representation
+        parser.parse_file(paths[0], TYPES[tech])
+
+        gc.collect()
+        tracemalloc.start()
+        inters = [parser.parse_file(path, TYPES[tech]) for path in paths]
+        gc.collect()
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    nodes = sum(count_nodes(inter) for inter in inters)
+    return {
+        "files": len(paths),
+        "nodes": nodes,
+        "bytes": size,
+        "peak_bytes": peak,
+        "bytes_per_node": size / max(1, nodes),
+    }
+
+
+@click.command(help="Measures the memory used by the representation of GLITCH.")
+@click.option(
+    "--tech",
+    type=click.Choice([t.tech for t in Tech]),
+    multiple=True,
+    help="The technologies to measure. Defaults to all of them.",
+)
+@click.option(
+    "--files", type=click.IntRange(min=1), default=20, help="Files per technology."
+)
+@click.option(
+    "--resources", type=click.IntRange(min=1), default=50, help="Resources per file."
+)
+@click.option(
+    "--depth",
+    type=click.IntRange(min=0),
+    default=2,
+    help="Depth of the nested attributes.",
+)
+@click.option("--seed", type=int, default=0, help="Seed of the generated corpus.")
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="A JSON file to which the results are written.",
+)
+def main(
+    tech: Tuple[str, ...],
+    files: int,
+    resources: int,
+    depth: int,
+    seed: int,
+    output: Optional[str],
+) -> None:
+    params = CorpusParams(files, resources, depth, 0.2, seed)
+    results: Dict[str, Dict[str, Any]] = {}
+    with TemporaryDirectory() as cwd:
+        # Some parsers write temporary files to the working directory
+        os.chdir(cwd)
+        for t in Tech:
+            if tech == () or t.tech in tech:
+                results[t.tech] = measure_tech(t, params)
+
+    table = PrettyTable()
+    table.field_names = ["Tech", "Files", "Nodes", "Memory (KB)", "Bytes per node"]
+    for t, r in results.items():
+        table.add_row(  # type: ignore
+            [
+                t,
+                r["files"],
+                r["nodes"],
+                round(r["bytes"] / 1024, 1),
+                round(r["bytes_per_node"], 1),
+            ]
+        )
+    print(table)
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump({"params": asdict(params), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Measures the performance of the parsers and the analyses of GLITCH on a
+synthetic corpus of each technology.
+
+Each technology is benchmarked in a fresh process, so that the peak RSS
+reported is the one of parsing and analyzing that technology alone.
+
+Usage:
+    python benchmarks/run.py --output results.json
+    python benchmarks/compare.py baseline.json results.json
+"""
+
+import os
+import sys
+import json
+import click
+import platform
+import resource
+import subprocess
+import multiprocessing
+
+from time import perf_counter
+from dataclasses import asdict
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from prettytable import PrettyTable
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusParams, TYPES, generate  # noqa: E402
+from glitch.analyzer import get_analyses, get_config, get_parser  # noqa: E402
+from glitch.stats.stats import FileStats  # noqa: E402
+from glitch.tech import Tech  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return rss / (1024 * 1024)
+    return rss / 1024
+
+
+def benchmark_tech(tech: Tech, params: CorpusParams, repeat: int) -> Dict[str, Any]:
+    parser = get_parser(tech)
+    analyses = get_analyses(tech, get_config(tech), ())
+    type = TYPES[tech]
+
+    with TemporaryDirectory() as folder:
+        paths = generate(tech, folder, params)
+        # Some parsers write temporary files to the working directory (e.g.
+        # the Dockerfile parser), which should not be left in the repository
+        os.chdir(folder)
+
+        # The best time of the repetitions is reported, since it is the one
+        # least affected by other processes
+        parse_time = float("inf")
+        check_times = {a.get_name(): float("inf") for a in analyses}
+        stats = FileStats()
+        errors = 0
+        for r in range(repeat):
+            inters: List[Any] = []
+            start = perf_counter()
+            for path in paths:
+                inters.append(parser.parse_file(path, type))
+            parse_time = min(parse_time, perf_counter() - start)
+
+            found = 0
+            for analysis in analyses:
+                start = perf_counter()
+                for inter in inters:
+                    if inter is not None:
+                        found += len(analysis.check(inter))
+                check_times[analysis.get_name()] = min(
+                    check_times[analysis.get_name()], perf_counter() - start
+                )
+
+            if r == 0:
+                errors = found
+                for inter in inters:
+                    if inter is not None:
+                        stats.compute(inter)
+
+    total = parse_time + sum(check_times.values())
+    kloc = stats.loc / 1000
+    return {
+        "files": len(paths),
+        "parsed": len(stats.files),
+        "loc": stats.loc,
+        "errors": errors,
+        "parse_s": parse_time,
+        "check_s": check_times,
+        "total_s": total,
+        "files_per_s": len(paths) / total,
+        "kloc_per_s": kloc / total,
+        "parse_kloc_per_s": kloc / parse_time,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_commit() -> Optional[str]:
+    run = subprocess.run(
+        ["git", "rev-parse", "HEAD"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    return run.stdout.strip() if run.returncode == 0 else None
+
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    table = PrettyTable()
+    table.field_names = ["Tech", "Files", "LoC", "Files/s", "KLoC/s", "Peak RSS (MB)"]
+    for tech, r in results.items():
+        table.add_row(  # type: ignore
+            [
+                tech,
+                r["files"],
+                r["loc"],
+                round(r["files_per_s"], 2),
+                round(r["kloc_per_s"], 2),
+                round(r["peak_rss_mb"], 1),
+            ]
+        )
+    print(table)
+
+
+@click.command(help="Benchmarks the parsers and the analyses of GLITCH.")
+@click.option(
+    "--tech",
+    type=click.Choice([t.tech for t in Tech]),
+    multiple=True,
+    help="The technologies to benchmark. Defaults to all of them.",
+)
+@click.option(
+    "--files", type=click.IntRange(min=1), default=50, help="Files per technology."
+)
+@click.option(
+    "--resources", type=click.IntRange(min=1), default=20, help="Resources per file."
+)
+@click.option(
+    "--depth",
+    type=click.IntRange(min=0),
+    default=2,
+    help="Depth of the nested attributes.",
+)
+@click.option(
+    "--comments",
+    type=click.FloatRange(min=0, max=1),
+    default=0.2,
+    help="Proportion of resources preceded by a comment.",
+)
+@click.option("--seed", type=int, default=0, help="Seed of the generated corpus.")
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    help="Number of times each corpus is parsed and analyzed. The best time is reported.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="A JSON file to which the results are written.",
+)
+def main(
+    tech: Tuple[str, ...],
+    files: int,
+    resources: int,
+    depth: int,
+    comments: float,
+    seed: int,
+    repeat: int,
+    output: Optional[str],
+) -> None:
+    params = CorpusParams(files, resources, depth, comments, seed)
+    techs = [t for t in Tech if tech == () or t.tech in tech]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    context = multiprocessing.get_context("spawn")
+    for t in techs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[t.tech] = pool.submit(benchmark_tech, t, params, repeat).result()
+
+    print_results(results)
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "params": {**asdict(params), "repeat": repeat},
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
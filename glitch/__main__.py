@@ -1,54 +1,79 @@
 import json
 import tqdm
 import click, os, sys
+import subprocess
 
 from pathlib import Path
+from time import perf_counter
 from typing import Tuple, List, Set, Optional, TextIO, Dict
-from glitch.analysis.rules import Error, RuleVisitor
+from glitch.analysis.rules import Error
+from glitch.analyzer import Analyzer, get_config, get_parser
 from glitch.helpers import get_smell_types, get_smells
-from glitch.parsers.docker import DockerParser
 from glitch.stats.print import print_stats
 from glitch.stats.stats import FileStats
 from glitch.tech import Tech
 from glitch.repr.inter import UnitBlockType
 from glitch.parsers.parser import Parser
-from glitch.parsers.ansible import AnsibleParser
-from glitch.parsers.chef import ChefParser
-from glitch.parsers.puppet import PuppetParser
-from glitch.parsers.terraform import TerraformParser
-from glitch.parsers.gha import GithubActionsParser
+from glitch.parsers.ripper_worker import set_ripper_workers
 from glitch.exceptions import throw_exception
-from pkg_resources import resource_filename
-from copy import deepcopy
-from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from glitch.cache import (
+    FileHashes,
+    FindingsCache,
+    IRCache,
+    default_cache_dir,
+    is_tech_file,
+)
+from glitch.profiler import Profiler, enable_profiler, profile as measure
+from glitch.server.daemon import serve
+from glitch.server.lsp import lsp
+from concurrent.futures import (
+    Executor,
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+    Future,
+    as_completed,
+)
 
+# State of each worker process used by the process executor. The analyzer is
+# built once per worker by __init_worker, instead of being pickled and sent
+# with every task.
+__worker_analyzer: Optional[Analyzer] = None
+__worker_profile: bool = False
 
-# NOTE: These are necessary in order for python to load the visitors.
-# Otherwise, python will not consider these types of rules.
-from glitch.analysis.design.visitor import DesignVisitor  # type: ignore
-from glitch.analysis.security import SecurityVisitor  # type: ignore
 
+def __init_worker(
+    tech: Tech,
+    config: str,
+    smell_types: Tuple[str, ...],
+    cache: Optional[FindingsCache],
+    ir_cache: Optional[IRCache],
+    profile: bool = False,
+) -> None:
+    global __worker_analyzer, __worker_profile
+    __worker_analyzer = Analyzer(tech, config, smell_types, cache, ir_cache)
+    __worker_profile = profile
 
-def __parse_and_check(
-    type: UnitBlockType,
-    path: str,
-    module: bool,
-    parser: Parser,
-    analyses: List[RuleVisitor],
-    stats: FileStats,
-) -> Set[Error]:
-    errors: Set[Error] = set()
-    inter = parser.parse(path, type, module)
-    # Avoids problems with multiple threads (and possibly multiple files)
-    # sharing the same object
-    analyses = deepcopy(analyses)
 
-    if inter != None:
-        for analysis in analyses:
-            errors.update(analysis.check(inter))
-        stats.compute(inter)
+def __parse_and_check_worker(
+    type: UnitBlockType, path: str, module: bool
+) -> Tuple[Set[Error], FileStats, Optional[Profiler]]:
+    assert __worker_analyzer is not None
+    # Each task computes its own stats and profile, which are merged by the
+    # main process
+    stats = FileStats()
+    profiler = enable_profiler() if __worker_profile else None
+    errors = __worker_analyzer.analyze(path, type, module, stats)
+    return errors, stats, profiler
+
 
-    return errors
+def __analyze_task(
+    analyzer: Analyzer, type: UnitBlockType, path: str, module: bool
+) -> Tuple[Set[Error], FileStats, Optional[Profiler]]:
+    # As in the worker processes, the stats of each task are merged by the
+    # main thread, since the stats can not be updated by several threads
+    stats = FileStats()
+    errors = analyzer.analyze(path, type, module, stats)
+    return errors, stats, None
 
 
 def __print_errors(errors: Set[Error], f: TextIO, linter: bool, csv: bool) -> None:
@@ -64,23 +89,6 @@ def __print_errors(errors: Set[Error], f: TextIO, linter: bool, csv: bool) -> No
             print(error, file=f)
 
 
-def __get_parser(tech: Tech) -> Parser:
-    if tech == Tech.ansible:
-        return AnsibleParser()
-    elif tech == Tech.chef:
-        return ChefParser()
-    elif tech == Tech.puppet:
-        return PuppetParser()
-    elif tech == Tech.docker:
-        return DockerParser()
-    elif tech == Tech.terraform:
-        return TerraformParser()
-    elif tech == Tech.gha:
-        return GithubActionsParser()
-    else:
-        raise ValueError(f"Invalid tech: {tech}")
-
-
 def __get_paths_and_title(
     folder_strategy: str, path: str, tech: Tech
 ) -> Tuple[Set[str], str]:
@@ -111,12 +119,123 @@ def __get_paths_and_title(
     return paths, title
 
 
+def __get_changed_files(path: str, ref: str) -> Set[str]:
+    """Returns the real paths of the files inside path which were changed,
+    added or deleted since the git reference ref (including untracked files)."""
+    folder = path if os.path.isdir(path) else os.path.dirname(path) or "."
+
+    def git(*args: str) -> List[str]:
+        run = subprocess.run(
+            ["git", "-C", folder, *args], capture_output=True, text=True
+        )
+        if run.returncode != 0:
+            raise click.BadOptionUsage(
+                "changed-since",
+                f"Invalid value for 'changed-since': {run.stderr.strip()}",
+            )
+        return run.stdout.splitlines()
+
+    root = git("rev-parse", "--show-toplevel")[0]
+    files = git("diff", "--name-only", ref, "--")
+    files += git("ls-files", "--others", "--exclude-standard", "--full-name")
+
+    real_path = os.path.realpath(path)
+    changed: Set[str] = set()
+    for file in files:
+        file = os.path.realpath(os.path.join(root, file))
+        if file == real_path or file.startswith(real_path + os.sep):
+            changed.add(file)
+    return changed
+
+
+def __get_changed_module(file: str, root: str, tech: Tech) -> Optional[str]:
+    """Returns the folder of the module (as parsed in a project by the parser
+    of the technology) which contains the file, or None if the file does not
+    belong to a module and so it is only analyzed as part of the project."""
+    if tech == Tech.terraform:
+        return os.path.dirname(file)
+
+    folder = os.path.dirname(file)
+    while folder != root and folder.startswith(root + os.sep):
+        parent = os.path.dirname(folder)
+        if tech == Tech.chef and os.path.basename(folder) in [
+            "resources",
+            "recipes",
+            "attributes",
+            "definitions",
+            "libraries",
+            "providers",
+        ]:
+            return parent
+        elif (tech == Tech.ansible and os.path.basename(parent) == "roles") or (
+            tech == Tech.puppet and os.path.basename(parent) == "modules"
+        ):
+            return folder
+        folder = parent
+
+    return None
+
+
+def __filter_changed_paths(
+    folder_strategy: str,
+    path: str,
+    tech: Tech,
+    paths: Set[str],
+    module: bool,
+    changed: Set[str],
+) -> Tuple[Set[str], bool]:
+    """Narrows the paths to analyze to the ones affected by the changed files.
+
+    Returns:
+        Tuple[Set[str], bool]: The paths to analyze and if they should be
+        analyzed as modules.
+    """
+    # Deleted files are kept, since they change the results of the folders
+    # and modules that contained them, but they are never parsed themselves
+    changed = set(c for c in changed if is_tech_file(c, tech))
+
+    def contains_changes(p: str) -> bool:
+        p = os.path.realpath(p)
+        return any(c == p or c.startswith(p + os.sep) for c in changed)
+
+    if folder_strategy == "include-all":
+        return set(p for p in paths if os.path.realpath(p) in changed), module
+    elif folder_strategy in ["dataset", "module"] or os.path.isfile(path):
+        return set(p for p in paths if contains_changes(p)), module
+
+    # Project: the files are analyzed individually if they do not depend
+    # on the rest of the project, otherwise only the modules with changes are
+    # analyzed, unless a file outside of a module changed
+    root = os.path.realpath(path)
+    if tech in [Tech.docker, Tech.gha]:
+        return (
+            set(
+                os.path.join(path, os.path.relpath(c, root))
+                for c in changed
+                if os.path.isfile(c)
+            ),
+            False,
+        )
+
+    modules: Set[str] = set()
+    for c in changed:
+        m = __get_changed_module(c, root, tech)
+        if m is None:
+            return set(p for p in paths if contains_changes(p)), module
+        if os.path.isdir(m):
+            modules.add(os.path.join(path, os.path.relpath(m, root)))
+
+    return set(os.path.normpath(m) for m in modules), True
+
+
 def repr_mode(
     type: UnitBlockType,
     path: str,
     module: bool,
     parser: Parser,
+    ir_cache: Optional[IRCache] = None,
 ) -> None:
+    parser.cache = ir_cache
     inter = parser.parse(path, type, module)
     if inter != None:
         print(json.dumps(inter.as_dict(), indent=2))
@@ -160,6 +279,8 @@ def repr_mode(
     "If 'dataset', each subfolder in the root folder is analyzed as a Project construct. "
     "If 'include-all', all files inside the folder and its subfolders, and which extensions correspond to the technology being considered, are analyzed individually"
     " (e.g. .yml and .yaml files for Ansible). "
+    "Blocks duplicated in different files are only found among the files of the same Project "
+    "or Module construct, so they are not found with 'include-all'. "
     "Defaults to 'project'.",
 )
 @click.option(
@@ -193,6 +314,59 @@ def repr_mode(
     help="Number of parallel workers to use. Defaults to 1.",
     default=1,
 )
+@click.option(
+    "--executor",
+    type=click.Choice(["thread", "process"]),
+    default="thread",
+    help="The kind of parallel workers used. If 'process', the files are parsed and analyzed "
+    "in separate processes, which avoids contention on the GIL when using multiple workers. "
+    "Defaults to 'thread'.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=default_cache_dir,
+    help="The folder where the results of previous runs are cached. Files and folders whose "
+    "content did not change since a previous run are not analyzed again, and files whose "
+    "content did not change are not parsed again. Files whose size and modification time "
+    "did not change are not read again. "
+    "Defaults to $XDG_CACHE_HOME/glitch or ~/.cache/glitch.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Disables the cache of the results of previous runs.",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=0),
+    default=1024,
+    help="The maximum size in MB of the cache of the results, of the cache of the parsed "
+    "files and of the index of the hashes of the files. The least recently used entries are "
+    "evicted when a cache grows over this size. Defaults to 1024.",
+)
+@click.option(
+    "--changed-since",
+    type=str,
+    default=None,
+    help="A git reference (e.g. a branch or a commit). If given, only the files changed or added since "
+    "the reference are analyzed. With the 'project' strategy, only the modules with changes are "
+    "analyzed when possible.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Prints a table with the time spent and the number of calls of each stage of the run "
+    "(e.g. parsing, each analysis and each checker).",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="A JSON file to which the profile of the run is written. Implies --profile.",
+)
 @click.argument("path", type=click.Path(exists=True), required=True)
 @click.argument("output", type=click.Path(), required=False)
 def glitch(
@@ -208,6 +382,13 @@ def glitch(
     linter: bool,
     mode: str,
     n_workers: int,
+    executor: str,
+    cache_dir: str,
+    no_cache: bool,
+    cache_size: int,
+    changed_since: Optional[str],
+    profile: bool,
+    profile_output: Optional[str],
 ):
     for t in Tech:
         if t.tech == tech:
@@ -230,62 +411,115 @@ def glitch(
         raise click.BadOptionUsage(
             "config", f"Invalid value for 'config': Path '{config}' should be a file."
         )
-    elif config == "configs/default.ini":
-        config = resource_filename("glitch", "configs/default.ini")
-
-    parser = __get_parser(tech)
-    if tech == Tech.terraform:
-        config = resource_filename("glitch", "configs/terraform.ini")
+    config = get_config(tech, None if config == "configs/default.ini" else config)
     file_stats = FileStats()
 
+    hashes: Optional[FileHashes] = None
+    ir_cache: Optional[IRCache] = None
+    if not no_cache:
+        # The caches share the hashes of the files, which are read only once
+        hashes = FileHashes(cache_dir, cache_size * 1024 * 1024)
+        ir_cache = IRCache(cache_dir, cache_size * 1024 * 1024, tech, hashes)
+
     if mode == "repr":
-        repr_mode(type, path, module, parser)
+        repr_mode(type, path, module, get_parser(tech), ir_cache)
+        for c in [ir_cache, hashes]:
+            if c is not None:
+                c.prune()
         return
 
     if smell_types == ():
         smell_types = get_smell_types()
 
-    analyses: List[RuleVisitor] = []
-    rules = RuleVisitor.__subclasses__()
-    for r in rules:
-        if smell_types == () or r.get_name() in smell_types:
-            analysis = r(tech)
-            analysis.config(config)
-            analyses.append(analysis)
+    profiler: Optional[Profiler] = None
+    if profile or profile_output is not None:
+        profiler = enable_profiler()
+    start = perf_counter()
 
     errors: List[Error] = []
     paths: Set[str]
     title: str
-    paths, title = __get_paths_and_title(folder_strategy, path, tech)
-    futures: List[Future[Set[Error]]] = []
-    future_to_path: Dict[Future[Set[Error]], str] = {}
-    executor = ThreadPoolExecutor(max_workers=n_workers)
-
-    for p in paths:
-        futures.append(
-            executor.submit(
-                __parse_and_check, type, p, module, parser, analyses, file_stats
+    with measure("discovery", folder_strategy):
+        paths, title = __get_paths_and_title(folder_strategy, path, tech)
+        if changed_since is not None:
+            paths, module = __filter_changed_paths(
+                folder_strategy,
+                path,
+                tech,
+                paths,
+                module,
+                __get_changed_files(path, changed_since),
             )
+            title += f" (CHANGED SINCE {changed_since})"
+    futures: List[Future[Tuple[Set[Error], FileStats, Optional[Profiler]]]] = []
+    future_to_path: Dict[
+        Future[Tuple[Set[Error], FileStats, Optional[Profiler]]], str
+    ] = {}
+    pool: Executor
+
+    cache: Optional[FindingsCache] = None
+    if not no_cache:
+        cache = FindingsCache(
+            cache_dir, cache_size * 1024 * 1024, tech, config, smell_types, hashes
         )
-        future_to_path[futures[-1]] = p
+
+    if executor == "process":
+        pool = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=__init_worker,
+            initargs=(tech, config, smell_types, cache, ir_cache, profiler is not None),
+        )
+        for p in paths:
+            futures.append(pool.submit(__parse_and_check_worker, type, p, module))
+            future_to_path[futures[-1]] = p
+    else:
+        analyzer = Analyzer(tech, config, smell_types, cache, ir_cache)
+        # Each thread can parse a Chef file at the same time. The processes
+        # of the process executor use a single Ruby worker each.
+        set_ripper_workers(n_workers)
+        pool = ThreadPoolExecutor(max_workers=n_workers)
+        for p in paths:
+            futures.append(pool.submit(__analyze_task, analyzer, type, p, module))
+            future_to_path[futures[-1]] = p
 
     f = sys.stdout if output is None else open(output, "w")
     for future in tqdm.tqdm(as_completed(futures), total=len(futures), desc=title):
         try:
-            new_errors = future.result()
+            new_errors, new_stats, new_profiler = future.result()
+            file_stats.merge(new_stats)
+            if profiler is not None and new_profiler is not None:
+                profiler.merge(new_profiler)
             errors.extend(new_errors)
-            __print_errors(new_errors, f, linter, csv)
+            with measure("output", "errors"):
+                __print_errors(new_errors, f, linter, csv)
         except:
             throw_exception("Unknown Error: {}", future_to_path[future])
+    pool.shutdown()
+    for c in [cache, ir_cache, hashes]:
+        if c is not None:
+            c.prune()
     if f != sys.stdout:
         f.close()
 
     if not linter:
-        print_stats(errors, get_smells(smell_types, tech), file_stats, table_format)
+        with measure("output", "stats"):
+            print_stats(errors, get_smells(smell_types, tech), file_stats, table_format)
+
+    if profiler is not None:
+        profiler.add("run", "total", perf_counter() - start)
+        # The profile is not mixed with the output of the linter
+        profiler.print(table_format, sys.stderr if linter else sys.stdout)
+        if profile_output is not None:
+            profiler.dump(profile_output)
 
 
 def main() -> None:
-    glitch(prog_name="glitch")
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve(args=sys.argv[2:], prog_name="glitch serve")
+    elif len(sys.argv) > 1 and sys.argv[1] == "lsp":
+        lsp(args=sys.argv[2:], prog_name="glitch lsp")
+    else:
+        glitch(prog_name="glitch")
 
 
 if __name__ == "__main__":
@@ -1,40 +1,163 @@
-from typing import List, Tuple, Set
+import hashlib
+import numpy as np
+
+from bisect import bisect_right
+from typing import List, Set
+from numpy.lib.stride_tricks import sliding_window_view
 from glitch.analysis.rules import Error
-from glitch.analysis.design.smell_checker import DesignSmellChecker
+from glitch.analysis.design.smell_checker import DesignContext, DesignSmellChecker
 from glitch.repr.inter import *
 
 
 class UnguardedVariable(DesignSmellChecker):
-    def __get_line(self, i: int, lines: List[Tuple[int, int]]):
-        for j, line in lines:
-            if i < j:
-                return line
-        raise RuntimeError("Line not found")
+    # Number of (non-whitespace) characters in a block
+    __BLOCK_SIZE = 150
+    # Base of the hash and its inverse modulo 2**64
+    __BASE = 0x100000001B3
+    __INVERSE = pow(__BASE, -1, 1 << 64)
+    # Number of consecutive blocks from which a fingerprint is selected. Any
+    # block of code with at least __BLOCK_SIZE + __WINDOW - 1 characters which
+    # is in two files has a fingerprint in both
+    __WINDOW = 50
+
+    def __get_line(self, i: int, offsets: List[int]) -> int:
+        # The line is the first whose offset is greater than i
+        line = bisect_right(offsets, i)
+        if line == len(offsets):
+            raise RuntimeError("Line not found")
+        return line + 1
+
+    def __get_hashes(self, code: str) -> np.ndarray:
+        """Returns the hashes of the blocks of the code. The hashes of all
+        blocks are computed at once from the prefix sums of a polynomial
+        (Rabin-Karp) hash, so the blocks are never copied.
+
+        Args:
+            code (str): The code without whitespace.
+
+        Returns:
+            np.ndarray: The hash of the block in each position.
+        """
+        size, n_blocks = self.__BLOCK_SIZE, len(code) - self.__BLOCK_SIZE
+        if n_blocks <= 0:
+            return np.zeros(0, dtype=np.uint64)
+
+        chars = np.frombuffer(
+            code.encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+        )
+        powers = np.full(len(code), self.__BASE, dtype=np.uint64)
+        powers[0] = 1
+        np.cumprod(powers, out=powers)
+        inverses = np.full(n_blocks, self.__INVERSE, dtype=np.uint64)
+        inverses[0] = 1
+        np.cumprod(inverses, out=inverses)
+
+        # The arithmetic is modulo 2**64, so the hash of a block is the
+        # difference of the prefix sums divided by the power of its position
+        prefix = np.zeros(len(code) + 1, dtype=np.uint64)
+        np.cumsum(chars * powers, out=prefix[1:])
+        return (prefix[size : size + n_blocks] - prefix[:n_blocks]) * inverses
+
+    def __get_candidates(self, hashes: np.ndarray) -> List[int]:
+        # Positions of the blocks whose hash is shared by another block
+        if len(hashes) == 0:
+            return []
+        _, index, counts = np.unique(hashes, return_inverse=True, return_counts=True)
+        return np.flatnonzero(counts[index] >= 2).tolist()
+
+    def __get_fingerprints(self, hashes: np.ndarray) -> List[int]:
+        """Returns the positions of the blocks selected as fingerprints of the
+        code by winnowing, i.e. the block with the minimum hash in each window
+        of consecutive blocks. Only these blocks are compared with the other
+        files, so the index of a run keeps a fraction of the blocks.
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+        Args:
+            hashes (np.ndarray): The hash of the block in each position.
+
+        Returns:
+            List[int]: The positions, in increasing order.
+        """
+        if len(hashes) == 0:
+            return []
+        window = min(self.__WINDOW, len(hashes))
+        minimums = sliding_window_view(hashes, window).argmin(axis=1)
+        return np.unique(minimums + np.arange(len(minimums))).tolist()
+
+    def __check_files(
+        self,
+        element: UnitBlock,
+        file: str,
+        code: str,
+        hashes: np.ndarray,
+        offsets: List[int],
+        checked: Set[int],
+        ctx: DesignContext,
+    ) -> List[Error]:
+        """Looks for the blocks of the file in the other files checked in the
+        run, and adds the fingerprints of the file to the index of the run.
+
+        Args:
+            element (UnitBlock): The unit block of the file.
+            file (str): The file being checked.
+            code (str): The code of the file without whitespace.
+            hashes (np.ndarray): The hash of the block in each position.
+            offsets (List[int]): The number of non-whitespace characters
+                before the end of each line.
+            checked (Set[int]): The positions already in a duplicate block.
+            ctx (DesignContext): The context of the run.
+
+        Returns:
+            List[Error]: The errors found.
+        """
+        errors: List[Error] = []
+        for i in self.__get_fingerprints(hashes):
+            # A second hash of the block makes collisions of the rolling hash
+            # negligible, without keeping the code of the other files. Unlike
+            # the hash of Python, it does not depend on the process
+            block = code[i : i + self.__BLOCK_SIZE].encode("utf-8", "surrogatepass")
+            digest = hashlib.blake2b(block, digest_size=8).digest()
+            fingerprint = (int(hashes[i]) << 64) | int.from_bytes(digest, "little")
+            line = self.__get_line(i, offsets)
+            other_file, other_line = ctx.block_fingerprints.setdefault(
+                fingerprint, (file, line)
+            )
+            if other_file != file and i not in checked:
+                error = Error(
+                    "design_duplicate_block",
+                    element,
+                    file,
+                    ctx.code_lines[line - 1],
+                    f"Suggestion: the block is also in line {other_line} of {other_file}.",
+                )
+                error.line = line
+                errors.append(error)
+                checked.update(range(i, i + self.__BLOCK_SIZE))
+        return errors
+
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
         errors: List[Error] = []
 
         if isinstance(element, UnitBlock) and element.type != UnitBlockType.block:
-            lines: List[Tuple[int, int]] = []
-            all_code, code = "".join(self.code_lines), ""
-            current_line = 1
+            # Number of non-whitespace characters before the end of each line
+            offsets: List[int] = []
+            lines: List[str] = []
             i = 0
-            for c in all_code:
-                if c == "\n":
-                    lines.append((i, current_line))
-                    current_line += 1
-                elif not c.isspace():
-                    code += c
-                    i += 1
-            lines.append((i, current_line))
-
-            blocks: Dict[int, List[int]] = {}
-            for i in range(len(code) - 150):
-                hash = code[i : i + 150].__hash__()
-                if hash not in blocks:
-                    blocks[hash] = [i]
+            for line in "".join(ctx.code_lines).split("\n"):
+                line = "".join(line.split())
+                lines.append(line)
+                i += len(line)
+                offsets.append(i)
+            code = "".join(lines)
+            hashes = self.__get_hashes(code)
+
+            # The candidates are grouped by their code, to discard collisions
+            blocks: Dict[str, List[int]] = {}
+            for i in self.__get_candidates(hashes):
+                block = code[i : i + self.__BLOCK_SIZE]
+                if block not in blocks:
+                    blocks[block] = [i]
                 else:
-                    blocks[hash].append(i)
+                    blocks[block].append(i)
 
             # Note: changing the structure to a set instead of a list increased the speed A LOT
             checked: Set[int] = set()
@@ -42,15 +165,22 @@ class UnguardedVariable(DesignSmellChecker):
                 if len(value) >= 2:
                     for i in value:
                         if i not in checked:
-                            line = self.__get_line(i, lines)
+                            line = self.__get_line(i, offsets)
                             error = Error(
                                 "design_duplicate_block",
                                 element,
                                 file,
-                                self.code_lines[line - 1],
+                                ctx.code_lines[line - 1],
                             )
                             error.line = line
                             errors.append(error)
-                            checked.update(range(i, i + 150))
+                            checked.update(range(i, i + self.__BLOCK_SIZE))
+
+            # The blocks in other files can only be found when checking a
+            # project or module (see --folder-strategy)
+            if not isinstance(ctx.code, UnitBlock):
+                errors += self.__check_files(
+                    element, file, code, hashes, offsets, checked, ctx
+                )
 
         return errors
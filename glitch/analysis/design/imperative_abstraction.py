@@ -1,7 +1,6 @@
 from typing import List, Tuple
 from glitch.analysis.rules import Error
-from glitch.analysis.design.visitor import DesignVisitor
-from glitch.analysis.design.smell_checker import DesignSmellChecker
+from glitch.analysis.design.smell_checker import DesignContext, DesignSmellChecker
 from glitch.repr.inter import *
 
 
@@ -10,7 +9,7 @@ class ImperativeAbstraction(DesignSmellChecker):
         count_resources = len(ub.atomic_units)
         count_execs = 0
         for au in ub.atomic_units:
-            if au.type in DesignVisitor.EXEC:
+            if au.type in self.visitor.EXEC:
                 count_execs += 1
 
         for unitblock in ub.unit_blocks:
@@ -20,7 +19,7 @@ class ImperativeAbstraction(DesignSmellChecker):
 
         return count_resources, count_execs
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
         if isinstance(element, UnitBlock):
             total_resources, total_execs = self.__count_atomic_units(element)
             if total_execs > 2 and (total_execs / total_resources) > 0.20:
@@ -1,24 +1,23 @@
 from typing import List, Optional
 from glitch.analysis.rules import Error
-from glitch.analysis.design.smell_checker import DesignSmellChecker
+from glitch.analysis.design.smell_checker import DesignContext, DesignSmellChecker
 from glitch.tech import Tech
 from glitch.repr.inter import *
 
 
 class ImproperAlignmentTabs(DesignSmellChecker):
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
         if isinstance(element, UnitBlock):
             errors: List[Error] = []
-            for i, line in enumerate(self.code_lines):
-                if "\t" in line:
-                    error = Error(
-                        "implementation_improper_alignment",
-                        element,
-                        file,
-                        repr(element),
-                    )
-                    error.line = i + 1
-                    errors.append(error)
+            for i in ctx.line_metrics.tab_lines.tolist():
+                error = Error(
+                    "implementation_improper_alignment",
+                    element,
+                    file,
+                    repr(element),
+                )
+                error.line = i + 1
+                errors.append(error)
             return errors
         return []
 
@@ -28,7 +27,7 @@ class ImproperAlignment(DesignSmellChecker):
     def ignore_techs() -> List[Tech]:
         return [Tech.puppet, Tech.ansible]
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
         if isinstance(element, AtomicUnit):
             identation = None
             for a in element.attributes:
@@ -52,23 +51,15 @@ class ImproperAlignment(DesignSmellChecker):
 
 
 class PuppetImproperAlignment(DesignSmellChecker):
-    def __init__(self):
-        self.cached_file = ""
-        self.lines = []
-
     @staticmethod
     def tech() -> Optional[Tech]:
         return Tech.puppet
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
         if not isinstance(element, AtomicUnit) and not isinstance(element, UnitBlock):
             return []
 
-        if self.cached_file != file:
-            with open(file, "r") as f:
-                self.lines = f.readlines()
-                self.cached_file = file
-        lines = self.lines
+        lines = ctx.get_file_lines(file)
 
         longest = 0
         longest_ident = 0
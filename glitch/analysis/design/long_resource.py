@@ -1,13 +1,12 @@
 from typing import List
 from glitch.analysis.rules import Error
-from glitch.analysis.design.smell_checker import DesignSmellChecker
-from glitch.analysis.design.visitor import DesignVisitor
+from glitch.analysis.design.smell_checker import DesignContext, DesignSmellChecker
 from glitch.repr.inter import *
 
 
 class TooManyVariables(DesignSmellChecker):
-    def check(self, element: CodeElement, file: str) -> List[Error]:
-        if isinstance(element, AtomicUnit) and element.type in DesignVisitor.EXEC:
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
+        if isinstance(element, AtomicUnit) and element.type in self.visitor.EXEC:
             lines = 0
             for attr in element.attributes:
                 for line in attr.code.split("\n"):
@@ -1,6 +1,6 @@
 from typing import List, Optional
 from glitch.analysis.rules import Error
-from glitch.analysis.design.smell_checker import DesignSmellChecker
+from glitch.analysis.design.smell_checker import DesignContext, DesignSmellChecker
 from glitch.tech import Tech
 from glitch.repr.inter import *
 
@@ -10,7 +10,7 @@ class ChefMisplacedAttribute(DesignSmellChecker):
     def tech() -> Optional[Tech]:
         return Tech.chef
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
         if isinstance(element, AtomicUnit):
             order: List[int] = []
             for attribute in element.attributes:
@@ -35,7 +35,7 @@ class PuppetMisplacedAttribute(DesignSmellChecker):
     def tech() -> Optional[Tech]:
         return Tech.puppet
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
         if isinstance(element, AtomicUnit):
             for i, attr in enumerate(element.attributes):
                 if attr.name == "ensure" and i != 0:
@@ -1,13 +1,38 @@
-from typing import Optional, List
-from glitch.analysis.rules import SmellChecker
+from abc import abstractmethod
+from cmath import inf
+from typing import Optional, Dict, List, Sequence, Tuple, TYPE_CHECKING
+from glitch.analysis.rules import Context, Error, SmellChecker
+from glitch.repr.inter import *
+from glitch.repr.source import LineMetrics, Source, get_source
 from glitch.tech import Tech
 
+if TYPE_CHECKING:
+    from glitch.analysis.design.visitor import DesignVisitor
+
+
+class DesignContext(Context):
+    def __init__(self, code: Project | Module | UnitBlock) -> None:
+        super().__init__(code)
+        # Lines of the unit block being checked
+        self.code_lines: Sequence[str] = []
+        self.line_metrics: LineMetrics = Source("").get_line_metrics("")
+        self.first_non_comm_line = inf
+        # Names of the variables defined in the scope being checked
+        self.variables_names: List[str] = []
+        self.variable_stack: List[int] = []
+        # Fingerprints of the blocks of the files checked in this run, with
+        # the file and line where they were first found
+        self.block_fingerprints: Dict[int, Tuple[str, int]] = {}
+
+    def get_file_lines(self, file: str) -> Sequence[str]:
+        return get_source(file)
+
 
 class DesignSmellChecker(SmellChecker):
-    def __init__(self) -> None:
+    def __init__(self, visitor: "DesignVisitor") -> None:
         super().__init__()
-        self.code_lines: List[str] = []
-        self.variables_names: List[str] = []
+        # The config of the checkers is kept by the visitor
+        self.visitor = visitor
 
     @staticmethod
     def tech() -> Optional[Tech]:
@@ -16,3 +41,9 @@ class DesignSmellChecker(SmellChecker):
     @staticmethod
     def ignore_techs() -> List[Tech]:
         return []
+
+    @abstractmethod
+    def check(  # type: ignore
+        self, element: CodeElement, file: str, ctx: DesignContext
+    ) -> List[Error]:
+        pass
@@ -1,6 +1,6 @@
 from typing import List
 from glitch.analysis.rules import Error
-from glitch.analysis.design.smell_checker import DesignSmellChecker
+from glitch.analysis.design.smell_checker import DesignContext, DesignSmellChecker
 from glitch.repr.inter import *
 
 
@@ -14,12 +14,12 @@ class TooManyVariables(DesignSmellChecker):
                 count += 1
         return count
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
         if isinstance(element, UnitBlock) and element.type != UnitBlockType.vars:
             # The UnitBlock should not be of type vars, because these files are supposed to only
             # have variables
             if (
-                self.__count_variables(element.variables) / max(len(self.code_lines), 1) > 0.3  # type: ignore
+                self.__count_variables(element.variables) / max(ctx.line_metrics.loc, 1) > 0.3  # type: ignore
             ):
                 return [
                     Error(
@@ -1,29 +1,39 @@
 import re
+from collections import Counter
 from typing import List
 from glitch.analysis.rules import Error
-from glitch.analysis.design.smell_checker import DesignSmellChecker
-from glitch.analysis.design.visitor import DesignVisitor
+from glitch.analysis.design.smell_checker import DesignContext, DesignSmellChecker
+from glitch.helpers import KeywordAutomaton
 from glitch.repr.inter import *
 
 
 class UnguardedVariable(DesignSmellChecker):
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    __STRING = re.compile(r"(\'([^\\]|(\\(\n|.)))*?\')|(\"([^\\]|(\\(\n|.)))*?\")")
+
+    def check(self, element: CodeElement, file: str, ctx: DesignContext) -> List[Error]:
         errors: List[Error] = []
 
-        if (
-            isinstance(element, UnitBlock)
-            and DesignVisitor.VAR_REFER_SYMBOL is not None
-        ):
+        if isinstance(element, UnitBlock) and self.visitor.VAR_REFER_SYMBOL is not None:
+            symbol = self.visitor.VAR_REFER_SYMBOL
+            # References to the variables in scope, with the number of times
+            # each one is in scope (an error is reported for each)
+            references = Counter(
+                symbol + var
+                for var in ctx.variables_names + self.visitor.DEFAULT_VARIABLES
+            )
+            if len(references) == 0:
+                return errors
+            # The references are searched in each string at the same time
+            automaton = KeywordAutomaton(references)
+
             # FIXME could be improved if we considered strings as part of the model
-            for i, l in enumerate(self.code_lines):
-                for tuple in re.findall(
-                    r"(\'([^\\]|(\\(\n|.)))*?\')|(\"([^\\]|(\\(\n|.)))*?\")", l
-                ):
+            for i, l in enumerate(ctx.code_lines):
+                for tuple in UnguardedVariable.__STRING.findall(l):
                     for string in (tuple[0], tuple[4]):
-                        for var in (
-                            self.variables_names + DesignVisitor.DEFAULT_VARIABLES
-                        ):
-                            if (DesignVisitor.VAR_REFER_SYMBOL + var) in string[1:-1]:
+                        if symbol not in string[1:-1]:
+                            continue
+                        for reference in automaton.search(string[1:-1]):
+                            for _ in range(references[reference]):
                                 error = Error(
                                     "implementation_unguarded_variable",
                                     element,
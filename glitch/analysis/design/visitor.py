@@ -4,9 +4,11 @@ import configparser
 from cmath import inf
 from glitch.analysis.rules import Error, RuleVisitor
 from glitch.tech import Tech
+from glitch.profiler import profile
 from glitch.repr.inter import *
+from glitch.repr.source import Source, get_source
 from typing import List
-from glitch.analysis.design.smell_checker import DesignSmellChecker
+from glitch.analysis.design.smell_checker import DesignContext, DesignSmellChecker
 
 
 class DesignVisitor(RuleVisitor):
@@ -18,124 +20,108 @@ class DesignVisitor(RuleVisitor):
             if (child.tech() is None and tech not in child.ignore_techs()) or (
                 child.tech() is not None and child.tech() == tech
             ):
-                self.checkers.append(child())
+                self.checkers.append(child(self))
 
         if tech in [Tech.chef, Tech.puppet, Tech.ansible]:
             self.comment = "#"
         else:
             self.comment = "//"
 
-        self.variable_stack: List[int] = []
-        self.variables_names: List[str] = []
-        self.first_code_line = inf
-
     @staticmethod
     def get_name() -> str:
         return "design"
 
+    def create_context(self, code: Project | Module | UnitBlock) -> DesignContext:
+        return DesignContext(code)
+
     def config(self, config_path: str) -> None:
         config = configparser.ConfigParser()
         config.read(config_path)
-        DesignVisitor.EXEC = json.loads(config["design"]["exec_atomic_units"])
-        DesignVisitor.DEFAULT_VARIABLES = json.loads(
-            config["design"]["default_variables"]
-        )
+        self.EXEC = json.loads(config["design"]["exec_atomic_units"])
+        self.DEFAULT_VARIABLES = json.loads(config["design"]["default_variables"])
         if "var_refer_symbol" not in config["design"]:
-            DesignVisitor.VAR_REFER_SYMBOL = None
+            self.VAR_REFER_SYMBOL = None
         else:
-            DesignVisitor.VAR_REFER_SYMBOL = json.loads(  # type: ignore
+            self.VAR_REFER_SYMBOL = json.loads(  # type: ignore
                 config["design"]["var_refer_symbol"]
             )
 
-    def check_module(self, m: Module) -> list[Error]:
-        errors = super().check_module(m)
+    def check_module(self, m: Module, ctx: DesignContext) -> list[Error]:
         # FIXME Needs to consider more things
         # if len(m.blocks) == 0:
         #     errors.append(Error('design_unnecessary_abstraction', m, m.path, repr(m)))
-        return errors
+        return []
 
-    def check_unitblock(self, u: UnitBlock, file: str) -> List[Error]:
+    def enter_unitblock(self, u: UnitBlock, file: str, ctx: DesignContext) -> bool:
+        source = Source("")
         if u.path != "":
-            with open(u.path, "r") as f:
-                try:
-                    code_lines = f.readlines()
-                    f.seek(0, 0)
-                except UnicodeDecodeError:
-                    return []
-        else:
-            code_lines = []
+            try:
+                source = get_source(u.path)
+            except UnicodeDecodeError:
+                return False
 
-        self.first_non_comm_line = inf
-        for i, line in enumerate(code_lines):
-            if not line.startswith(self.comment):
-                self.first_non_comm_line = i + 1
-                break
+        ctx.code_lines = source
+        # The lines are scanned once for all the checkers
+        ctx.line_metrics = source.get_line_metrics(self.comment)
+        ctx.first_non_comm_line = ctx.line_metrics.first_code_line or inf
 
-        self.variable_stack.append(len(self.variables_names))
+        ctx.variable_stack.append(len(ctx.variables_names))
         for attr in u.attributes:
-            self.variables_names.append(attr.name)
-
-        errors: List[Error] = []
-        # The order is important
-        for au in u.atomic_units:
-            errors += self.check_atomicunit(au, file)
-        for v in u.variables:
-            errors += self.check_variable(v, file)
-        for a in u.attributes:
-            errors += self.check_attribute(a, file)
-        for d in u.dependencies:
-            errors += self.check_dependency(d, file)
-        for s in u.statements:
-            errors += self.check_element(s, file)
-        for c in u.comments:
-            errors += self.check_comment(c, file)
+            ctx.variables_names.append(attr.name)
+        return True
 
+    def check_unitblock(
+        self, u: UnitBlock, file: str, ctx: DesignContext
+    ) -> List[Error]:
         # FIXME Needs to consider more things
         # if (len(u.statements) == 0 and len(u.atomic_units) == 0 and
         #         len(u.variables) == 0 and len(u.unit_blocks) == 0 and
         #             len(u.attributes) == 0):
         #     errors.append(Error('design_unnecessary_abstraction', u, file, repr(u)))
 
+        # The checkers run after the elements of the unit block, so that the
+        # variables are known, and before the unit blocks inside it
+        errors: List[Error] = []
         for checker in self.checkers:
-            checker.code_lines = code_lines
-            checker.variables_names = self.variables_names
-            errors += checker.check(u, file)
-
-        # The unit blocks inside should only be considered after in order to
-        # have the correct variables
-        for ub in u.unit_blocks:
-            errors += self.check_unitblock(ub, file)
+            with profile("checker", type(checker).__name__):
+                errors += checker.check(u, file, ctx)
+        return errors
 
-        variable_size = self.variable_stack.pop()
+    def leave_unitblock(self, u: UnitBlock, file: str, ctx: DesignContext) -> None:
+        variable_size = ctx.variable_stack.pop()
         if variable_size == 0:
-            self.variables_names = []
+            ctx.variables_names = []
         else:
-            self.variables_names = self.variables_names[:variable_size]
+            ctx.variables_names = ctx.variables_names[:variable_size]
 
-        return errors
-
-    def check_condition(self, c: ConditionalStatement, file: str) -> list[Error]:
-        return super().check_condition(c, file)
-
-    def check_atomicunit(self, au: AtomicUnit, file: str) -> list[Error]:
-        errors = super().check_atomicunit(au, file)
+    def enter_atomicunit(
+        self, au: AtomicUnit, file: str, ctx: DesignContext
+    ) -> list[Error]:
+        # The checkers only look at the atomic unit, so they run before other
+        # visitors (e.g. the security visitor) change its attributes
+        errors: List[Error] = []
         for checker in self.checkers:
-            errors += checker.check(au, file)
+            with profile("checker", type(checker).__name__):
+                errors += checker.check(au, file, ctx)
         return errors
 
-    def check_dependency(self, d: Dependency, file: str) -> list[Error]:
+    def check_dependency(
+        self, d: Dependency, file: str, ctx: DesignContext
+    ) -> list[Error]:
         return []
 
-    def check_attribute(self, a: Attribute, file: str) -> list[Error]:
+    def check_attribute(
+        self, a: Attribute, file: str, ctx: DesignContext
+    ) -> list[Error]:
         return []
 
-    def check_variable(self, v: Variable, file: str) -> list[Error]:
-        self.variables_names.append(v.name)
+    def check_variable(self, v: Variable, file: str, ctx: DesignContext) -> list[Error]:
+        ctx.variables_names.append(v.name)
         return []
 
-    def check_comment(self, c: Comment, file: str) -> list[Error]:
+    def check_comment(self, c: Comment, file: str, ctx: DesignContext) -> list[Error]:
         errors: List[Error] = []
-        if c.line >= self.first_non_comm_line:
+        if c.line >= ctx.first_non_comm_line:
             errors.append(Error("design_avoid_comments", c, file, repr(c)))
         return errors
 
@@ -1,7 +1,9 @@
-from typing import Dict, Optional, Union, List, Any
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union, List, Any
 from abc import ABC, abstractmethod
 from glitch.tech import Tech
 from glitch.repr.inter import *
+from glitch.repr.source import get_source
+from glitch.profiler import profile
 
 ErrorValue = Dict[Tech | str, Dict[str, str] | str]
 ErrorDict = Dict[str, ErrorValue]
@@ -100,18 +102,23 @@ class Error:
             return f"{self.path},{self.line},{self.code},{repr},-"
 
     def __repr__(self) -> str:
-        with open(self.path) as f:
-            line = (
-                f.readlines()[self.line - 1].strip()
-                if self.line != -1
-                else self.repr.split("\n")[0]
-            )
-            if self.opt_msg:
-                line += f"\n-> {self.opt_msg}"
-            return (
-                f"{self.path}\nIssue on line {self.line}: {Error.ALL_ERRORS[self.code]}\n"
-                + f"{line}\n"
-            )
+        line = (
+            get_source(self.path)[self.line - 1].strip()
+            if self.line != -1
+            else self.repr.split("\n")[0]
+        )
+        if self.opt_msg:
+            line += f"\n-> {self.opt_msg}"
+        return (
+            f"{self.path}\nIssue on line {self.line}: {Error.ALL_ERRORS[self.code]}\n"
+            + f"{line}\n"
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The element is not pickled, since errors are sent between processes
+        # and the element would carry its whole subtree of the representation.
+        # The information needed to report the error is kept in the other fields.
+        return {**self.__dict__, "el": None}
 
     def __hash__(self):
         return hash((self.code, self.path, self.line, self.opt_msg))
@@ -129,41 +136,101 @@ class Error:
 Error.agglomerate_errors()
 
 
+class Context:
+    """State of a single run of a visitor, i.e. of a call to RuleVisitor.check.
+
+    The visitors and their checkers only keep their configuration, which is
+    shared by every run. The state of a run is kept in a context passed to
+    every check, so that a visitor can check several files at the same time
+    (e.g. in different threads) without being copied.
+    """
+
+    def __init__(self, code: Project | Module | UnitBlock) -> None:
+        self.code = code
+
+
+Handler = Callable[[Any, str, Context], List[Error]]
+
+
+def _lookup(table: Dict[type, Any], t: type, default: Any) -> Any:
+    """Returns the value of a type in a table keyed by types. Types missing
+    from the table (e.g. subclasses) get the value of the first base class in
+    their MRO that has one, which is added to the table for the next lookups."""
+    value = table.get(t)
+    if value is None:
+        value = default
+        for base in t.__mro__[1:]:
+            if base in table:
+                value = table[base]
+                break
+        table[t] = value
+    return value
+
+
+def _check_nothing(c: Any, file: str, ctx: Context) -> List[Error]:
+    return []
+
+
 class RuleVisitor(ABC):
+    """A family of smells found in the intermediate representation.
+
+    The representation is walked by RuleVisitor.check_all, once for all the
+    visitors: each element is handed to the handler of its type of every
+    visitor, after the elements inside it, with the context of the visitor.
+    The handlers only check the element they receive, not the elements inside
+    it. Unit blocks and atomic units also have hooks that are called before
+    the elements inside them.
+    """
+
+    # If the key-values inside key-values, and the values of key-values that
+    # are code elements, are handed to the visitor
+    visit_keyvalue_children = False
+
     def __init__(self, tech: Tech) -> None:
         super().__init__()
         self.tech = tech
-        self.code = None
+        # check_element dispatches on the type of the element with this table
+        self.__handlers: Dict[type, Handler] = {
+            AtomicUnit: self.check_atomicunit,
+            Dependency: self.check_dependency,
+            Attribute: self.check_attribute,
+            Variable: self.check_variable,
+            ConditionalStatement: self.check_condition,
+            Comment: self.check_comment,
+        }
 
     def check(self, code: Project | Module | UnitBlock) -> List[Error]:
-        self.code = code
-        if isinstance(code, Project):
-            return self.check_project(code)
-        elif isinstance(code, Module):
-            return self.check_module(code)
-        else:
-            return self.check_unitblock(code, code.path)
-
-    def check_element(self, c: CodeElement, file: str) -> list[Error]:
-        if isinstance(c, AtomicUnit):
-            return self.check_atomicunit(c, file)
-        elif isinstance(c, Dependency):
-            return self.check_dependency(c, file)
-        elif isinstance(c, Attribute):
-            return self.check_attribute(c, file)
-        elif isinstance(c, Variable):
-            return self.check_variable(c, file)
-        elif isinstance(c, ConditionalStatement):
-            return self.check_condition(c, file)
-        elif isinstance(c, Comment):
-            return self.check_comment(c, file)
-        elif isinstance(c, dict):
-            errors: List[Error] = []
-            for k, v in c.items():  # type: ignore
-                errors += self.check_element(k, file) + self.check_element(v, file)  # type: ignore
-            return errors
-        else:
-            return []
+        return RuleVisitor.check_all([self], code)
+
+    @staticmethod
+    def check_all(
+        visitors: Sequence["RuleVisitor"], code: Project | Module | UnitBlock
+    ) -> List[Error]:
+        """Checks the code with several visitors, walking it once. Each
+        element is handed to every visitor (in order), and each visitor keeps
+        its own context. The errors are the same as calling check for each
+        visitor.
+
+        Args:
+            visitors (Sequence[RuleVisitor]): The visitors.
+            code (Project | Module | UnitBlock): The code to check.
+
+        Returns:
+            List[Error]: The errors found by the visitors.
+        """
+        contexts = [(v, v.create_context(code)) for v in visitors]
+        with profile("analysis", ", ".join(v.get_name() for v in visitors)):
+            return _Walk(contexts).walk(code)
+
+    def check_element(self, c: Any, file: str, ctx: Context) -> List[Error]:
+        """Checks an element, without the elements inside it."""
+        handler = self.__handlers.get(type(c))
+        if handler is None:
+            handler = _lookup(self.__handlers, type(c), _check_nothing)
+        return handler(c, file, ctx)
+
+    def create_context(self, code: Project | Module | UnitBlock) -> Context:
+        return Context(code)
 
     @staticmethod
     @abstractmethod
@@ -174,82 +241,206 @@ class RuleVisitor(ABC):
     def config(self, config_path: str):
         pass
 
-    def check_project(self, p: Project) -> list[Error]:
-        errors: List[Error] = []
-        for m in p.modules:
-            errors += self.check_module(m)
+    def check_project(self, p: Project, ctx: Context) -> list[Error]:
+        return []
 
-        for u in p.blocks:
-            errors += self.check_unitblock(u, u.path)
+    def check_module(self, m: Module, ctx: Context) -> list[Error]:
+        return []
 
-        return errors
+    def enter_unitblock(self, u: UnitBlock, file: str, ctx: Context) -> bool:
+        """Called before the elements of the unit block are checked.
 
-    def check_module(self, m: Module) -> list[Error]:
-        errors: List[Error] = []
-        for u in m.blocks:
-            errors += self.check_unitblock(u, u.path)
+        Returns:
+            bool: False if the unit block (and the unit blocks inside it)
+                should not be checked by the visitor.
+        """
+        return True
 
-        return errors
+    def check_unitblock(self, u: UnitBlock, file: str, ctx: Context) -> list[Error]:
+        """Called after the elements of the unit block are checked, but before
+        the unit blocks inside it."""
+        return []
 
-    def check_unitblock(self, u: UnitBlock, file: str) -> list[Error]:
-        errors: List[Error] = []
-        for au in u.atomic_units:
-            errors += self.check_atomicunit(au, file)
-        for c in u.comments:
-            errors += self.check_comment(c, file)
-        for v in u.variables:
-            errors += self.check_variable(v, file)
-        for ub in u.unit_blocks:
-            errors += self.check_unitblock(ub, file)
-        for a in u.attributes:
-            errors += self.check_attribute(a, file)
-        for s in u.statements:
-            errors += self.check_element(s, file)
+    def leave_unitblock(self, u: UnitBlock, file: str, ctx: Context) -> None:
+        """Called after the unit blocks inside the unit block are checked."""
+        pass
 
-        return errors
+    def enter_atomicunit(self, au: AtomicUnit, file: str, ctx: Context) -> list[Error]:
+        """Called before the attributes and statements of the atomic unit are
+        checked."""
+        return []
 
-    def check_atomicunit(self, au: AtomicUnit, file: str) -> list[Error]:
-        errors: List[Error] = []
-        for a in au.attributes:
-            errors += self.check_attribute(a, file)
+    def check_atomicunit(self, au: AtomicUnit, file: str, ctx: Context) -> list[Error]:
+        return []
 
-        for s in au.statements:
-            errors += self.check_element(s, file)
-
-        return errors
+    @abstractmethod
+    def check_dependency(self, d: Dependency, file: str, ctx: Context) -> list[Error]:
+        pass
 
     @abstractmethod
-    def check_dependency(self, d: Dependency, file: str) -> list[Error]:
+    def check_attribute(self, a: Attribute, file: str, ctx: Context) -> list[Error]:
         pass
 
     @abstractmethod
-    def check_attribute(self, a: Attribute, file: str) -> list[Error]:
+    def check_variable(self, v: Variable, file: str, ctx: Context) -> list[Error]:
         pass
 
+    def check_condition(
+        self, c: ConditionalStatement, file: str, ctx: Context
+    ) -> list[Error]:
+        return []
+
     @abstractmethod
-    def check_variable(self, v: Variable, file: str) -> list[Error]:
+    def check_comment(self, c: Comment, file: str, ctx: Context) -> list[Error]:
         pass
 
-    def check_condition(self, c: ConditionalStatement, file: str) -> list[Error]:
+
+class _Walk:
+    """A single walk of the code for several visitors, each with its context.
+    The elements inside an element are found with a table keyed by its type,
+    like the handlers of the visitors."""
+
+    def __init__(self, contexts: Sequence[Tuple[RuleVisitor, Context]]) -> None:
+        self.contexts = contexts
+        self.__keyvalue_contexts = [
+            (v, ctx) for v, ctx in contexts if v.visit_keyvalue_children
+        ]
+        self.__children: Dict[
+            type,
+            Callable[[Any, str, Sequence[Tuple[RuleVisitor, Context]]], List[Error]],
+        ] = {
+            AtomicUnit: self.__walk_atomicunit,
+            KeyValue: self.__walk_keyvalue,
+            ConditionalStatement: self.__walk_condition,
+            dict: self.__walk_dict,
+        }
+
+    def walk(self, code: Project | Module | UnitBlock) -> List[Error]:
+        errors: List[Error] = []
+        if isinstance(code, Project):
+            for m in code.modules:
+                errors += self.walk(m)
+            for u in code.blocks:
+                errors += self.__walk_unitblock(u, u.path, self.contexts)
+            for visitor, ctx in self.contexts:
+                errors += visitor.check_project(code, ctx)
+        elif isinstance(code, Module):
+            for u in code.blocks:
+                errors += self.__walk_unitblock(u, u.path, self.contexts)
+            for visitor, ctx in self.contexts:
+                errors += visitor.check_module(code, ctx)
+        else:
+            errors += self.__walk_unitblock(code, code.path, self.contexts)
+        return errors
+
+    def __walk_unitblock(
+        self,
+        u: UnitBlock,
+        file: str,
+        contexts: Sequence[Tuple[RuleVisitor, Context]],
+    ) -> List[Error]:
+        entered = [(v, ctx) for v, ctx in contexts if v.enter_unitblock(u, file, ctx)]
+        if len(entered) < len(contexts):
+            contexts = entered
         errors: List[Error] = []
+        # The order is important, e.g. the design visitor collects the names of
+        # the variables for its checkers
+        for elements in [
+            u.atomic_units,
+            u.variables,
+            u.attributes,
+            u.dependencies,
+            u.statements,
+            u.comments,
+        ]:
+            for el in elements:
+                errors += self.__walk_element(el, file, contexts)
+        for visitor, ctx in contexts:
+            errors += visitor.check_unitblock(u, file, ctx)
 
-        for s in c.statements:
-            errors += self.check_element(s, file)
+        for ub in u.unit_blocks:
+            errors += self.__walk_unitblock(ub, file, contexts)
+        for visitor, ctx in contexts:
+            visitor.leave_unitblock(u, file, ctx)
+        return errors
 
+    def __walk_element(
+        self, el: Any, file: str, contexts: Sequence[Tuple[RuleVisitor, Context]]
+    ) -> List[Error]:
+        walk_children = self.__children.get(type(el))
+        if walk_children is None:
+            walk_children = _lookup(self.__children, type(el), self.__walk_nothing)
+        errors = walk_children(el, file, contexts)
+        for visitor, ctx in contexts:
+            errors += visitor.check_element(el, file, ctx)
         return errors
 
-    @abstractmethod
-    def check_comment(self, c: Comment, file: str) -> list[Error]:
-        pass
+    def __walk_atomicunit(
+        self,
+        au: AtomicUnit,
+        file: str,
+        contexts: Sequence[Tuple[RuleVisitor, Context]],
+    ) -> List[Error]:
+        errors: List[Error] = []
+        for visitor, ctx in contexts:
+            errors += visitor.enter_atomicunit(au, file, ctx)
+        for a in au.attributes:
+            errors += self.__walk_element(a, file, contexts)
+        for s in au.statements:
+            errors += self.__walk_element(s, file, contexts)
+        return errors
+
+    def __walk_keyvalue(
+        self, kv: KeyValue, file: str, contexts: Sequence[Tuple[RuleVisitor, Context]]
+    ) -> List[Error]:
+        if contexts is self.contexts:
+            contexts = self.__keyvalue_contexts
+        else:
+            contexts = [(v, ctx) for v, ctx in contexts if v.visit_keyvalue_children]
+        errors: List[Error] = []
+        if len(contexts) == 0:
+            return errors
+        if kv.value is None:
+            for child in kv.keyvalues:
+                errors += self.__walk_element(child, file, contexts)
+        elif not isinstance(kv.value, str):
+            errors += self.__walk_element(kv.value, file, contexts)
+        return errors
+
+    def __walk_condition(
+        self,
+        c: ConditionalStatement,
+        file: str,
+        contexts: Sequence[Tuple[RuleVisitor, Context]],
+    ) -> List[Error]:
+        errors: List[Error] = []
+        for s in c.statements:
+            errors += self.__walk_element(s, file, contexts)
+        return errors
+
+    @staticmethod
+    def __walk_nothing(
+        el: Any, file: str, contexts: Sequence[Tuple[RuleVisitor, Context]]
+    ) -> List[Error]:
+        return []
+
+    def __walk_dict(
+        self,
+        c: Dict[Any, Any],
+        file: str,
+        contexts: Sequence[Tuple[RuleVisitor, Context]],
+    ) -> List[Error]:
+        errors: List[Error] = []
+        for k, v in c.items():
+            errors += self.__walk_element(k, file, contexts)
+            errors += self.__walk_element(v, file, contexts)
+        return errors
 
 
 Error.agglomerate_errors()
 
 
 class SmellChecker(ABC):
-    def __init__(self) -> None:
-        self.code: Optional[Project | UnitBlock | Module] = None
-
     @abstractmethod
-    def check(self, element: CodeElement, file: str) -> list[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> list[Error]:
         pass
@@ -4,25 +4,84 @@ import json
 import glitch
 import configparser
 from urllib.parse import urlparse
-from glitch.analysis.rules import Error, RuleVisitor, SmellChecker
-from nltk.tokenize import WordPunctTokenizer  # type: ignore
-from typing import Tuple, List, Optional
+from glitch.analysis.rules import Context, Error, RuleVisitor, SmellChecker
+from typing import Dict, Set, Tuple, List, Optional
 
 from glitch.tech import Tech
+from glitch.helpers import KeywordAutomaton
+from glitch.profiler import profile
 from glitch.repr.inter import *
 
-from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
+from glitch.analysis.terraform.smell_checker import (
+    TerraformContext,
+    TerraformSmellChecker,
+)
 
 
 class SecurityVisitor(RuleVisitor):
     __URL_REGEX = r"^(http:\/\/www\.|https:\/\/www\.|http:\/\/|https:\/\/)?[a-z0-9]+([_\-\.]{1}[a-z0-9]+)*\.[a-z]{2,5}(:[0-9]{1,5})?(\/.*)?$"
 
+    __SECRET_REGEX = r"[_A-Za-z0-9$\/\.\[\]-]*{text}\b"
+    __MISC_SECRET_REGEX = r"([_A-Za-z0-9$-]*[-_]{text}([-_].*)?$)|(^{text}([-_].*)?$)"
+    # Splits text into words and punctuation, like nltk's WordPunctTokenizer
+    __TOKEN = re.compile(r"\w+|[^\w\s]+")
+
+    # The values of the key-values are checked, so the code elements inside
+    # them are also checked
+    visit_keyvalue_children = True
+
+    class KeywordList:
+        """A list of keywords looked for in the names of key-values, as
+        substrings or, if a regex is given, with the regex of each keyword. The
+        names are first searched for all the keywords with a KeywordAutomaton,
+        so only the regexes of the keywords in the name are matched."""
+
+        def __init__(self, items: List[str], regex: Optional[str] = None) -> None:
+            self.items = items
+            self.patterns = (
+                [re.compile(regex.format(text=item)) for item in items]
+                if regex is not None
+                else []
+            )
+            # keyword -> positions in the list
+            self.keywords: Dict[str, List[int]] = {}
+            # Items with special characters are regexes themselves, so they
+            # are always matched
+            self.regex_items: List[int] = []
+            for i, item in enumerate(items):
+                if regex is not None and any(c in ".^$*+?{}[]\\|()" for c in item):
+                    self.regex_items.append(i)
+                else:
+                    self.keywords.setdefault(item, []).append(i)
+
+        def match(self, name: str, found: Set[str]) -> List[str]:
+            """Returns the items that match the name, in the order of the list.
+
+            Args:
+                name (str): The name of the key-value.
+                found (Set[str]): The keywords found in the name.
+
+            Returns:
+                List[str]: The items that match the name.
+            """
+            positions = list(self.regex_items)
+            for keyword in found:
+                positions += self.keywords.get(keyword, [])
+            positions.sort()
+            if len(self.patterns) > 0:
+                positions = [i for i in positions if self.patterns[i].match(name)]
+            return [self.items[i] for i in positions]
+
     class NonOfficialImageSmell(SmellChecker):
-        def check(self, element: CodeElement, file: str) -> List[Error]:
+        def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
             return []
 
     class DockerNonOfficialImageSmell(SmellChecker):
-        def check(self, element: CodeElement, file: str) -> List[Error]:
+        def __init__(self, visitor: "SecurityVisitor") -> None:
+            super().__init__()
+            self.visitor = visitor
+
+        def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
             if (
                 not isinstance(element, UnitBlock)
                 or element.name is None
@@ -30,20 +89,23 @@ class SecurityVisitor(RuleVisitor):
             ):
                 return []
             image = element.name.split(":")
-            if image[0] not in SecurityVisitor._DOCKER_OFFICIAL_IMAGES:
+            if image[0] not in self.visitor._DOCKER_OFFICIAL_IMAGES:
                 return [Error("sec_non_official_image", element, file, repr(element))]
             return []
 
     def __init__(self, tech: Tech) -> None:
         super().__init__(tech)
-        self.checkers: List[SmellChecker] = []
+        self.checkers: List[TerraformSmellChecker] = []
+        # Checkers to call for each type of atomic unit (see __dispatch_checkers)
+        self.__au_checkers: Dict[str, List[TerraformSmellChecker]] = {}
+        self.__any_au_checkers: List[TerraformSmellChecker] = self.checkers
 
         if tech == Tech.terraform:
             for child in TerraformSmellChecker.__subclasses__():
-                self.checkers.append(child())
+                self.checkers.append(child(self))
 
         if tech == Tech.docker:
-            self.non_off_img = SecurityVisitor.DockerNonOfficialImageSmell()
+            self.non_off_img = SecurityVisitor.DockerNonOfficialImageSmell(self)
         else:
             self.non_off_img = SecurityVisitor.NonOfficialImageSmell()
 
@@ -51,129 +113,142 @@ class SecurityVisitor(RuleVisitor):
     def get_name() -> str:
         return "security"
 
+    def create_context(self, code: Project | Module | UnitBlock) -> Context:
+        if self.tech == Tech.terraform:
+            return TerraformContext(code)
+        return super().create_context(code)
+
     def config(self, config_path: str) -> None:
         config = configparser.ConfigParser()
         config.read(config_path)
-        SecurityVisitor.__WRONG_WORDS = json.loads(
-            config["security"]["suspicious_words"]
-        )
-        SecurityVisitor.__PASSWORDS = json.loads(config["security"]["passwords"])
-        SecurityVisitor.__USERS = json.loads(config["security"]["users"])
-        SecurityVisitor.__PROFILE = json.loads(config["security"]["profile"])
-        SecurityVisitor.__SECRETS = json.loads(config["security"]["secrets"])
-        SecurityVisitor.__MISC_SECRETS = json.loads(config["security"]["misc_secrets"])
-        SecurityVisitor.__ROLES = json.loads(config["security"]["roles"])
-        SecurityVisitor.__DOWNLOAD = json.loads(
-            config["security"]["download_extensions"]
+        self.__WRONG_WORDS = json.loads(config["security"]["suspicious_words"])
+        self.__WRONG_WORDS_ORDER: Dict[str, int] = {}
+        for i, word in enumerate(self.__WRONG_WORDS):
+            self.__WRONG_WORDS_ORDER.setdefault(word, i)
+        self.__PASSWORDS = json.loads(config["security"]["passwords"])
+        self.__USERS = json.loads(config["security"]["users"])
+        self.__PROFILE = json.loads(config["security"]["profile"])
+        self.__SECRETS = json.loads(config["security"]["secrets"])
+        self.__MISC_SECRETS = json.loads(config["security"]["misc_secrets"])
+        self.__ROLES = json.loads(config["security"]["roles"])
+        self.__DOWNLOAD = json.loads(config["security"]["download_extensions"])
+        self.__SSH_DIR = json.loads(config["security"]["ssh_dirs"])
+        self.__ADMIN = json.loads(config["security"]["admin"])
+        self.__CHECKSUM = json.loads(config["security"]["checksum"])
+        self.__CRYPT = json.loads(config["security"]["weak_crypt"])
+        self.__CRYPT_WHITELIST = json.loads(config["security"]["weak_crypt_whitelist"])
+        self.__URL_WHITELIST = json.loads(config["security"]["url_http_white_list"])
+        self.__SECRETS_WHITELIST = json.loads(config["security"]["secrets_white_list"])
+        self.__SENSITIVE_DATA = json.loads(config["security"]["sensitive_data"])
+        self.__SECRET_ASSIGN = json.loads(config["security"]["secret_value_assign"])
+        self.__GITHUB_ACTIONS = json.loads(
+            config["security"]["github_actions_resources"]
         )
-        SecurityVisitor.__SSH_DIR = json.loads(config["security"]["ssh_dirs"])
-        SecurityVisitor.__ADMIN = json.loads(config["security"]["admin"])
-        SecurityVisitor.__CHECKSUM = json.loads(config["security"]["checksum"])
-        SecurityVisitor.__CRYPT = json.loads(config["security"]["weak_crypt"])
-        SecurityVisitor.__CRYPT_WHITELIST = json.loads(
-            config["security"]["weak_crypt_whitelist"]
+
+        self.__ROLE_USER_KEYWORDS = SecurityVisitor.KeywordList(
+            self.__ROLES + self.__USERS, SecurityVisitor.__SECRET_REGEX
         )
-        SecurityVisitor.__URL_WHITELIST = json.loads(
-            config["security"]["url_http_white_list"]
+        self.__SECRET_KEYWORDS = SecurityVisitor.KeywordList(
+            self.__PASSWORDS + self.__SECRETS + self.__USERS,
+            SecurityVisitor.__SECRET_REGEX,
         )
-        SecurityVisitor.__SECRETS_WHITELIST = json.loads(
-            config["security"]["secrets_white_list"]
+        self.__MISC_SECRET_KEYWORDS = SecurityVisitor.KeywordList(
+            self.__MISC_SECRETS, SecurityVisitor.__MISC_SECRET_REGEX
         )
-        SecurityVisitor.__SENSITIVE_DATA = json.loads(
-            config["security"]["sensitive_data"]
+        self.__SSH_DIR_KEYWORDS = SecurityVisitor.KeywordList(
+            [item.lower() for item in self.__SSH_DIR]
         )
-        SecurityVisitor.__SECRET_ASSIGN = json.loads(
-            config["security"]["secret_value_assign"]
+        self.__SENSITIVE_DATA_KEYWORDS = SecurityVisitor.KeywordList(
+            [item.lower() for item in self.__SENSITIVE_DATA]
         )
-        SecurityVisitor.__GITHUB_ACTIONS = json.loads(
-            config["security"]["github_actions_resources"]
+        self.__CHECKSUM_KEYWORDS = SecurityVisitor.KeywordList(self.__CHECKSUM)
+        # The names are searched for the keywords of all the lists at once
+        self.__KEYWORDS = KeywordAutomaton(
+            keyword
+            for keywords in [
+                self.__ROLE_USER_KEYWORDS,
+                self.__SECRET_KEYWORDS,
+                self.__MISC_SECRET_KEYWORDS,
+                self.__SSH_DIR_KEYWORDS,
+                self.__SENSITIVE_DATA_KEYWORDS,
+                self.__CHECKSUM_KEYWORDS,
+            ]
+            for keyword in keywords.keywords
         )
 
         if self.tech == Tech.terraform:
-            SecurityVisitor.INTEGRITY_POLICY = json.loads(
-                config["security"]["integrity_policy"]
-            )
-            SecurityVisitor.HTTPS_CONFIGS = json.loads(
-                config["security"]["ensure_https"]
-            )
-            SecurityVisitor.SSL_TLS_POLICY = json.loads(
-                config["security"]["ssl_tls_policy"]
-            )
-            SecurityVisitor.DNSSEC_CONFIGS = json.loads(
-                config["security"]["ensure_dnssec"]
-            )
-            SecurityVisitor.PUBLIC_IP_CONFIGS = json.loads(
-                config["security"]["use_public_ip"]
-            )
-            SecurityVisitor.POLICY_KEYWORDS = json.loads(
-                config["security"]["policy_keywords"]
-            )
-            SecurityVisitor.ACCESS_CONTROL_CONFIGS = json.loads(
+            self.INTEGRITY_POLICY = json.loads(config["security"]["integrity_policy"])
+            self.HTTPS_CONFIGS = json.loads(config["security"]["ensure_https"])
+            self.SSL_TLS_POLICY = json.loads(config["security"]["ssl_tls_policy"])
+            self.DNSSEC_CONFIGS = json.loads(config["security"]["ensure_dnssec"])
+            self.PUBLIC_IP_CONFIGS = json.loads(config["security"]["use_public_ip"])
+            self.POLICY_KEYWORDS = json.loads(config["security"]["policy_keywords"])
+            self.ACCESS_CONTROL_CONFIGS = json.loads(
                 config["security"]["insecure_access_control"]
             )
-            SecurityVisitor.AUTHENTICATION = json.loads(
-                config["security"]["authentication"]
-            )
-            SecurityVisitor.POLICY_ACCESS_CONTROL = json.loads(
+            self.AUTHENTICATION = json.loads(config["security"]["authentication"])
+            self.POLICY_ACCESS_CONTROL = json.loads(
                 config["security"]["policy_insecure_access_control"]
             )
-            SecurityVisitor.POLICY_AUTHENTICATION = json.loads(
+            self.POLICY_AUTHENTICATION = json.loads(
                 config["security"]["policy_authentication"]
             )
-            SecurityVisitor.MISSING_ENCRYPTION = json.loads(
+            self.MISSING_ENCRYPTION = json.loads(
                 config["security"]["missing_encryption"]
             )
-            SecurityVisitor.CONFIGURATION_KEYWORDS = json.loads(
+            self.CONFIGURATION_KEYWORDS = json.loads(
                 config["security"]["configuration_keywords"]
             )
-            SecurityVisitor.ENCRYPT_CONFIG = json.loads(
+            self.ENCRYPT_CONFIG = json.loads(
                 config["security"]["encrypt_configuration"]
             )
-            SecurityVisitor.FIREWALL_CONFIGS = json.loads(
-                config["security"]["firewall"]
-            )
-            SecurityVisitor.MISSING_THREATS_DETECTION_ALERTS = json.loads(
+            self.FIREWALL_CONFIGS = json.loads(config["security"]["firewall"])
+            self.MISSING_THREATS_DETECTION_ALERTS = json.loads(
                 config["security"]["missing_threats_detection_alerts"]
             )
-            SecurityVisitor.PASSWORD_KEY_POLICY = json.loads(
+            self.PASSWORD_KEY_POLICY = json.loads(
                 config["security"]["password_key_policy"]
             )
-            SecurityVisitor.KEY_MANAGEMENT = json.loads(
-                config["security"]["key_management"]
-            )
-            SecurityVisitor.NETWORK_SECURITY_RULES = json.loads(
+            self.KEY_MANAGEMENT = json.loads(config["security"]["key_management"])
+            self.NETWORK_SECURITY_RULES = json.loads(
                 config["security"]["network_security_rules"]
             )
-            SecurityVisitor.PERMISSION_IAM_POLICIES = json.loads(
+            self.PERMISSION_IAM_POLICIES = json.loads(
                 config["security"]["permission_iam_policies"]
             )
-            SecurityVisitor.GOOGLE_IAM_MEMBER = json.loads(
+            self.GOOGLE_IAM_MEMBER = json.loads(
                 config["security"]["google_iam_member_resources"]
             )
-            SecurityVisitor.LOGGING = json.loads(config["security"]["logging"])
-            SecurityVisitor.GOOGLE_SQL_DATABASE_LOG_FLAGS = json.loads(
+            self.LOGGING = json.loads(config["security"]["logging"])
+            self.GOOGLE_SQL_DATABASE_LOG_FLAGS = json.loads(
                 config["security"]["google_sql_database_log_flags"]
             )
-            SecurityVisitor.POSSIBLE_ATTACHED_RESOURCES = json.loads(
+            self.POSSIBLE_ATTACHED_RESOURCES = json.loads(
                 config["security"]["possible_attached_resources_aws_route53"]
             )
-            SecurityVisitor.VERSIONING = json.loads(config["security"]["versioning"])
-            SecurityVisitor.NAMING = json.loads(config["security"]["naming"])
-            SecurityVisitor.REPLICATION = json.loads(config["security"]["replication"])
-
-        SecurityVisitor.__FILE_COMMANDS = json.loads(
-            config["security"]["file_commands"]
-        )
-        SecurityVisitor.__SHELL_RESOURCES = json.loads(
-            config["security"]["shell_resources"]
-        )
-        SecurityVisitor.__IP_BIND_COMMANDS = json.loads(
-            config["security"]["ip_binding_commands"]
-        )
-        SecurityVisitor.__OBSOLETE_COMMANDS = self._load_data_file("obsolete_commands")
-        SecurityVisitor._DOCKER_OFFICIAL_IMAGES = self._load_data_file(
-            "official_docker_images"
-        )
+            self.VERSIONING = json.loads(config["security"]["versioning"])
+            self.NAMING = json.loads(config["security"]["naming"])
+            self.REPLICATION = json.loads(config["security"]["replication"])
+            self.__dispatch_checkers()
+
+        self.__FILE_COMMANDS = json.loads(config["security"]["file_commands"])
+        self.__SHELL_RESOURCES = json.loads(config["security"]["shell_resources"])
+        self.__IP_BIND_COMMANDS = json.loads(config["security"]["ip_binding_commands"])
+        self.__OBSOLETE_COMMANDS = self._load_data_file("obsolete_commands")
+        self._DOCKER_OFFICIAL_IMAGES = self._load_data_file("official_docker_images")
+
+    def __dispatch_checkers(self) -> None:
+        """Builds the table with the checkers that can find smells in each type
+        of atomic unit, so each atomic unit only goes through those. The order
+        of the checkers is kept."""
+        au_types = [(c, c.get_au_types()) for c in self.checkers]
+        self.__any_au_checkers = [c for c, types in au_types if types is None]
+        self.__au_checkers = {}
+        for _, types in au_types:
+            for type in types or set():
+                self.__au_checkers[type] = [
+                    c for c, t in au_types if t is None or type in t
+                ]
 
     @staticmethod
     def _load_data_file(file: str) -> List[str]:
@@ -182,10 +257,10 @@ class SecurityVisitor(RuleVisitor):
             content = f.readlines()
             return [c.strip() for c in content]
 
-    def check_atomicunit(self, au: AtomicUnit, file: str) -> List[Error]:
-        errors = super().check_atomicunit(au, file)
+    def check_atomicunit(self, au: AtomicUnit, file: str, ctx: Context) -> List[Error]:
+        errors: List[Error] = []
 
-        for item in SecurityVisitor.__FILE_COMMANDS:
+        for item in self.__FILE_COMMANDS:
             if item not in au.type:
                 continue
             for a in au.attributes:
@@ -201,26 +276,23 @@ class SecurityVisitor(RuleVisitor):
                         )
 
         for attribute in au.attributes:
-            if (
-                au.type in SecurityVisitor.__GITHUB_ACTIONS
-                and attribute.name == "plaintext_value"
-            ):
+            if au.type in self.__GITHUB_ACTIONS and attribute.name == "plaintext_value":
                 errors.append(Error("sec_hard_secr", attribute, file, repr(attribute)))
 
-        if au.type in SecurityVisitor.__OBSOLETE_COMMANDS:
+        if au.type in self.__OBSOLETE_COMMANDS:
             errors.append(Error("sec_obsolete_command", au, file, repr(au)))
-        elif any(au.type.endswith(res) for res in SecurityVisitor.__SHELL_RESOURCES):
+        elif any(au.type.endswith(res) for res in self.__SHELL_RESOURCES):
             for attr in au.attributes:
                 if (
                     isinstance(attr.value, str)
-                    and attr.value.split(" ")[0] in SecurityVisitor.__OBSOLETE_COMMANDS
+                    and attr.value.split(" ")[0] in self.__OBSOLETE_COMMANDS
                 ):
                     errors.append(Error("sec_obsolete_command", attr, file, repr(attr)))
                     break
 
-        for checker in self.checkers:
-            checker.code = self.code
-            errors += checker.check(au, file)
+        for checker in self.__au_checkers.get(au.type, self.__any_au_checkers):
+            with profile("checker", type(checker).__name__):
+                errors += checker.check(au, file, ctx)
 
         if self.__is_http_url(au.name):
             errors.append(Error("sec_https", au, file, repr(au)))
@@ -229,21 +301,19 @@ class SecurityVisitor(RuleVisitor):
 
         return errors
 
-    def check_dependency(self, d: Dependency, file: str) -> List[Error]:
+    def check_dependency(self, d: Dependency, file: str, ctx: Context) -> List[Error]:
         return []
 
-    def __check_keyvalue(self, c: KeyValue, file: str) -> List[Error]:
+    def __check_keyvalue(self, c: KeyValue, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         c.name = c.name.strip().lower()
 
+        # The key-values and code elements inside were already checked
         if isinstance(c.value, type(None)):
-            for child in c.keyvalues:
-                errors += self.check_element(child, file)
             return errors
         elif isinstance(c.value, str):  # type: ignore
             c.value = c.value.strip().lower()
         else:
-            errors += self.check_element(c.value, file)
             c.value = repr(c.value)
 
         if self.__is_http_url(c.value):
@@ -253,7 +323,7 @@ class SecurityVisitor(RuleVisitor):
             re.match(r"(?:https?://|^)0.0.0.0", c.value)
             or (c.name == "ip" and c.value in {"*", "::"})
             or (
-                c.name in SecurityVisitor.__IP_BIND_COMMANDS
+                c.name in self.__IP_BIND_COMMANDS
                 and (c.value == True or c.value in {"*", "::"})  # type: ignore
             )
         ):
@@ -262,56 +332,42 @@ class SecurityVisitor(RuleVisitor):
         if self.__is_weak_crypt(c.value, c.name):
             errors.append(Error("sec_weak_crypt", c, file, repr(c)))
 
-        for check in SecurityVisitor.__CHECKSUM:
-            if check in c.name and (c.value == "no" or c.value == "false"):
+        keywords = self.__KEYWORDS.search(c.name)
+
+        for _ in self.__CHECKSUM_KEYWORDS.match(c.name, keywords):
+            if c.value == "no" or c.value == "false":
                 errors.append(Error("sec_no_int_check", c, file, repr(c)))
                 break
 
-        for item in SecurityVisitor.__ROLES + SecurityVisitor.__USERS:
-            if re.match(r"[_A-Za-z0-9$\/\.\[\]-]*{text}\b".format(text=item), c.name):
-                if len(c.value) > 0 and not c.has_variable:
-                    for admin in SecurityVisitor.__ADMIN:
-                        if admin in c.value:
-                            errors.append(Error("sec_def_admin", c, file, repr(c)))
-                            break
+        for _ in self.__ROLE_USER_KEYWORDS.match(c.name, keywords):
+            if len(c.value) > 0 and not c.has_variable:
+                for admin in self.__ADMIN:
+                    if admin in c.value:
+                        errors.append(Error("sec_def_admin", c, file, repr(c)))
+                        break
+
+        def get_symbols(
+            c: Project | Module | UnitBlock | None,
+        ) -> SymbolIndex | None:
+            if isinstance(c, Project):
+                return get_symbols(
+                    c.get_module(os.path.basename(os.path.dirname(file)))
+                )
+            elif isinstance(c, (Module, UnitBlock)):
+                return c.get_symbols()
+            return None
 
         def get_au(
             c: Project | Module | UnitBlock | None, name: str, type: str
         ) -> AtomicUnit | None:
-            if isinstance(c, Project):
-                module_name = os.path.basename(os.path.dirname(file))
-                for m in c.modules:
-                    if m.name == module_name:
-                        return get_au(m, name, type)
-            elif isinstance(c, Module):
-                for ub in c.blocks:
-                    au = get_au(ub, name, type)
-                    if au is not None:
-                        return au
-            elif isinstance(c, UnitBlock):
-                for au in c.atomic_units:
-                    if au.type == type and au.name == name:
-                        return au
-            return None
+            symbols = get_symbols(c)
+            return symbols.get_atomic_unit(type, name) if symbols else None
 
         def get_module_var(
             c: Project | Module | UnitBlock | None, name: str
         ) -> Variable | None:
-            if isinstance(c, Project):
-                module_name = os.path.basename(os.path.dirname(file))
-                for m in c.modules:
-                    if m.name == module_name:
-                        return get_module_var(m, name)
-            elif isinstance(c, Module):
-                for ub in c.blocks:
-                    var = get_module_var(ub, name)
-                    if var is not None:
-                        return var
-            elif isinstance(c, UnitBlock):
-                for var in c.variables:
-                    if var.name == name:
-                        return var
-            return None
+            symbols = get_symbols(c)
+            return symbols.get_variable(name) if symbols else None
 
         # only for terraform
         var = None
@@ -320,32 +376,24 @@ class SecurityVisitor(RuleVisitor):
             if value.startswith(
                 "var."
             ):  # input variable (atomic unit with type variable)
-                au = get_au(self.code, value.strip("var."), "variable")
+                au = get_au(ctx.code, value.strip("var."), "variable")
                 if au != None:
                     for attribute in au.attributes:
                         if attribute.name == "default":
                             var = attribute
             elif value.startswith("local."):  # local value (variable)
-                var = get_module_var(self.code, value.strip("local."))
+                var = get_module_var(ctx.code, value.strip("local."))
 
-        for item in (
-            SecurityVisitor.__PASSWORDS
-            + SecurityVisitor.__SECRETS
-            + SecurityVisitor.__USERS
-        ):
-            if (
-                re.match(r"[_A-Za-z0-9$\/\.\[\]-]*{text}\b".format(text=item), c.name)
-                and c.name.split("[")[0]
-                not in SecurityVisitor.__SECRETS_WHITELIST + SecurityVisitor.__PROFILE
-            ):
+        for item in self.__SECRET_KEYWORDS.match(c.name, keywords):
+            if c.name.split("[")[0] not in self.__SECRETS_WHITELIST + self.__PROFILE:
                 if not c.has_variable or var:
                     if not c.has_variable:
-                        if item in SecurityVisitor.__PASSWORDS and len(c.value) == 0:
+                        if item in self.__PASSWORDS and len(c.value) == 0:
                             errors.append(Error("sec_empty_pass", c, file, repr(c)))
                             break
                     if var is not None:
                         if (
-                            item in SecurityVisitor.__PASSWORDS
+                            item in self.__PASSWORDS
                             and var.value != None
                             and len(var.value) == 0
                         ):
@@ -353,72 +401,63 @@ class SecurityVisitor(RuleVisitor):
                             break
 
                     errors.append(Error("sec_hard_secr", c, file, repr(c)))
-                    if item in SecurityVisitor.__PASSWORDS:
+                    if item in self.__PASSWORDS:
                         errors.append(Error("sec_hard_pass", c, file, repr(c)))
-                    elif item in SecurityVisitor.__USERS:
+                    elif item in self.__USERS:
                         errors.append(Error("sec_hard_user", c, file, repr(c)))
 
                     break
 
-        for item in SecurityVisitor.__SSH_DIR:
-            if item.lower() in c.name:
-                if len(c.value) > 0 and "/id_rsa" in c.value:
-                    errors.append(Error("sec_hard_secr", c, file, repr(c)))
+        for _ in self.__SSH_DIR_KEYWORDS.match(c.name, keywords):
+            if len(c.value) > 0 and "/id_rsa" in c.value:
+                errors.append(Error("sec_hard_secr", c, file, repr(c)))
 
-        for item in SecurityVisitor.__MISC_SECRETS:
-            if (
-                re.match(
-                    r"([_A-Za-z0-9$-]*[-_]{text}([-_].*)?$)|(^{text}([-_].*)?$)".format(
-                        text=item
-                    ),
-                    c.name,
-                )
-                and len(c.value) > 0
-                and not c.has_variable
-            ):
+        for _ in self.__MISC_SECRET_KEYWORDS.match(c.name, keywords):
+            if len(c.value) > 0 and not c.has_variable:
                 errors.append(Error("sec_hard_secr", c, file, repr(c)))
 
-        for item in SecurityVisitor.__SENSITIVE_DATA:
-            if item.lower() in c.name:
-                for item_value in SecurityVisitor.__SECRET_ASSIGN:
-                    if item_value in c.value.lower():
-                        errors.append(Error("sec_hard_secr", c, file, repr(c)))
-                        if "password" in item_value:
-                            errors.append(Error("sec_hard_pass", c, file, repr(c)))
+        for _ in self.__SENSITIVE_DATA_KEYWORDS.match(c.name, keywords):
+            for item_value in self.__SECRET_ASSIGN:
+                if item_value in c.value.lower():
+                    errors.append(Error("sec_hard_secr", c, file, repr(c)))
+                    if "password" in item_value:
+                        errors.append(Error("sec_hard_pass", c, file, repr(c)))
 
         if c.has_variable and var is not None:
             c.has_variable = var.has_variable
             c.value = var.value
 
-        for checker in self.checkers:
-            checker.code = self.code
-            errors += checker.check(c, file)
-
         return errors
 
-    def check_attribute(self, a: Attribute, file: str) -> list[Error]:
-        return self.__check_keyvalue(a, file)
+    def check_attribute(self, a: Attribute, file: str, ctx: Context) -> list[Error]:
+        return self.__check_keyvalue(a, file, ctx)
 
-    def check_variable(self, v: Variable, file: str) -> list[Error]:
-        return self.__check_keyvalue(v, file)
+    def check_variable(self, v: Variable, file: str, ctx: Context) -> list[Error]:
+        return self.__check_keyvalue(v, file, ctx)
 
-    def check_comment(self, c: Comment, file: str) -> List[Error]:
+    def check_comment(self, c: Comment, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         lines = c.content.split("\n")
-        stop = False
-        for word in SecurityVisitor.__WRONG_WORDS:
-            for line in lines:
-                tokenizer = WordPunctTokenizer()
-                tokens = tokenizer.tokenize(line.lower())  # type: ignore
-                if word in tokens:
+        tokens = [set(SecurityVisitor.__TOKEN.findall(line.lower())) for line in lines]
+        # The first suspicious word (in the order of the config) found in the
+        # comment is reported in every line where it is found
+        found = [
+            self.__WRONG_WORDS_ORDER[word]
+            for line_tokens in tokens
+            for word in line_tokens
+            if word in self.__WRONG_WORDS_ORDER
+        ]
+        if len(found) > 0:
+            word = self.__WRONG_WORDS[min(found)]
+            for line, line_tokens in zip(lines, tokens):
+                if word in line_tokens:
                     errors.append(Error("sec_susp_comm", c, file, line))
-                    stop = True
-            if stop:
-                break
         return errors
 
-    def check_condition(self, c: ConditionalStatement, file: str) -> List[Error]:
-        errors = super().check_condition(c, file)
+    def check_condition(
+        self, c: ConditionalStatement, file: str, ctx: Context
+    ) -> List[Error]:
+        errors: List[Error] = []
         if c.type != ConditionalStatement.ConditionType.SWITCH:
             return errors
 
@@ -436,8 +475,8 @@ class SecurityVisitor(RuleVisitor):
 
         return errors
 
-    def check_unitblock(self, u: UnitBlock, file: str) -> List[Error]:
-        errors = super().check_unitblock(u, file)
+    def check_unitblock(self, u: UnitBlock, file: str, ctx: Context) -> List[Error]:
+        errors: List[Error] = []
 
         # Missing integrity check changed to unit block since in Docker the integrity check is not an attribute of the
         # atomic unit but can be done on another atomic unit inside the same unit block.
@@ -447,19 +486,20 @@ class SecurityVisitor(RuleVisitor):
             if result is not None:
                 missing_integrity_checks[result[0]] = result[1]
                 continue
-            f = SecurityVisitor.check_has_checksum(au)
+            f = self.check_has_checksum(au)
             if f is not None:
                 if f in missing_integrity_checks:
                     del missing_integrity_checks[f]
 
         errors += missing_integrity_checks.values()
-        errors += self.non_off_img.check(u, file)
+        errors += self.non_off_img.check(u, file, ctx)
 
         return errors
 
-    @staticmethod
-    def check_integrity_check(au: AtomicUnit, path: str) -> Optional[Tuple[str, Error]]:
-        for item in SecurityVisitor.__DOWNLOAD:
+    def check_integrity_check(
+        self, au: AtomicUnit, path: str
+    ) -> Optional[Tuple[str, Error]]:
+        for item in self.__DOWNLOAD:
             if not isinstance(au.name, str):
                 continue
 
@@ -467,7 +507,7 @@ class SecurityVisitor(RuleVisitor):
                 r"(http|https|www)[^ ,]*\.{text}".format(text=item), au.name
             ):
                 continue
-            if SecurityVisitor.__has_integrity_check(au.attributes):
+            if self.__has_integrity_check(au.attributes):
                 return None
             return os.path.basename(au.name), Error(
                 "sec_no_int_check", au, path, repr(au)
@@ -480,23 +520,22 @@ class SecurityVisitor(RuleVisitor):
                 else repr(a.value).strip().lower()
             )
 
-            for item in SecurityVisitor.__DOWNLOAD:
+            for item in self.__DOWNLOAD:
                 if not re.search(
                     r"(http|https|www)[^ ,]*\.{text}".format(text=item), value
                 ):
                     continue
-                if SecurityVisitor.__has_integrity_check(au.attributes):
+                if self.__has_integrity_check(au.attributes):
                     return None
                 return os.path.basename(a.value), Error(  # type: ignore
                     "sec_no_int_check", au, path, repr(a)
                 )  # type: ignore
         return None
 
-    @staticmethod
-    def check_has_checksum(au: AtomicUnit) -> Optional[str]:
-        if au.type not in SecurityVisitor.__CHECKSUM or au.name is None:
+    def check_has_checksum(self, au: AtomicUnit) -> Optional[str]:
+        if au.type not in self.__CHECKSUM or au.name is None:
             return None
-        if any(d in au.name for d in SecurityVisitor.__DOWNLOAD):
+        if any(d in au.name for d in self.__DOWNLOAD):
             return os.path.basename(au.name)
 
         for a in au.attributes:
@@ -505,20 +544,18 @@ class SecurityVisitor(RuleVisitor):
                 if isinstance(a.value, str)
                 else repr(a.value).strip().lower()
             )
-            if any(d in value for d in SecurityVisitor.__DOWNLOAD):
+            if any(d in value for d in self.__DOWNLOAD):
                 return os.path.basename(au.name)
         return None
 
-    @staticmethod
-    def __has_integrity_check(attributes: List[Attribute]) -> bool:
+    def __has_integrity_check(self, attributes: List[Attribute]) -> bool:
         for attr in attributes:
             name = attr.name.strip().lower()
-            if any([check in name for check in SecurityVisitor.__CHECKSUM]):
+            if any([check in name for check in self.__CHECKSUM]):
                 return True
         return False
 
-    @staticmethod
-    def __is_http_url(value: str | None) -> bool:
+    def __is_http_url(self, value: str | None) -> bool:
         if value is None:
             return False
 
@@ -532,20 +569,18 @@ class SecurityVisitor(RuleVisitor):
             parsed_url = urlparse(value)
             return (
                 parsed_url.scheme == "http"
-                and parsed_url.hostname not in SecurityVisitor.__URL_WHITELIST
+                and parsed_url.hostname not in self.__URL_WHITELIST
             )
         except ValueError:
             return False
 
-    @staticmethod
-    def __is_weak_crypt(value: str, name: str | None) -> bool:
+    def __is_weak_crypt(self, value: str, name: str | None) -> bool:
         if name is None:
             return False
 
-        if any(crypt in value for crypt in SecurityVisitor.__CRYPT):
+        if any(crypt in value for crypt in self.__CRYPT):
             whitelist = any(
-                word in name or word in value
-                for word in SecurityVisitor.__CRYPT_WHITELIST
+                word in name or word in value for word in self.__CRYPT_WHITELIST
             )
             return not whitelist
         return False
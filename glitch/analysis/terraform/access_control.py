@@ -1,22 +1,26 @@
 import re
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformAccessControl(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        # The policies in POLICY_KEYWORDS are checked in every atomic unit
+        return None
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for item in SecurityVisitor.POLICY_KEYWORDS:
+        for item in self.visitor.POLICY_KEYWORDS:
             if item.lower() == attribute.name:
-                for config in SecurityVisitor.POLICY_ACCESS_CONTROL:
+                for config in self.visitor.POLICY_ACCESS_CONTROL:
                     expr = config["keyword"].lower() + "\\s*" + config["value"].lower()
                     pattern = re.compile(rf"{expr}")
                     allow_expr = '"effect":' + "\\s*" + '"allow"'
@@ -61,7 +65,7 @@ class TerraformAccessControl(TerraformSmellChecker):
         ):
             return [Error("sec_access_control", attribute, file, repr(attribute))]
 
-        for config in SecurityVisitor.ACCESS_CONTROL_CONFIGS:
+        for config in self.visitor.ACCESS_CONTROL_CONFIGS:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -75,15 +79,15 @@ class TerraformAccessControl(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type == "resource.aws_api_gateway_method":
                 http_method = self.check_required_attribute(
-                    element.attributes, [""], "http_method"
+                    element, [""], "http_method"
                 )
                 authorization = self.check_required_attribute(
-                    element.attributes, [""], "authorization"
+                    element, [""], "authorization"
                 )
                 if (
                     isinstance(http_method, KeyValue)
@@ -96,7 +100,7 @@ class TerraformAccessControl(TerraformSmellChecker):
                         and authorization.value.lower() == "none"
                     ):
                         api_key_required = self.check_required_attribute(
-                            element.attributes, [""], "api_key_required"
+                            element, [""], "api_key_required"
                         )
                         if (
                             isinstance(api_key_required, KeyValue)
@@ -132,9 +136,7 @@ class TerraformAccessControl(TerraformSmellChecker):
                         )
                     )
             elif element.type == "resource.github_repository":
-                visibility = self.check_required_attribute(
-                    element.attributes, [""], "visibility"
-                )
+                visibility = self.check_required_attribute(element, [""], "visibility")
                 if isinstance(visibility, KeyValue) and isinstance(
                     visibility.value, str
                 ):
@@ -145,9 +147,7 @@ class TerraformAccessControl(TerraformSmellChecker):
                             )
                         )
                 else:
-                    private = self.check_required_attribute(
-                        element.attributes, [""], "private"
-                    )
+                    private = self.check_required_attribute(element, [""], "private")
                     if isinstance(private, KeyValue) and isinstance(private.value, str):
                         if f"{private.value}".lower() != "true":
                             errors.append(
@@ -174,15 +174,14 @@ class TerraformAccessControl(TerraformSmellChecker):
                     "off",
                 )
             elif element.type == "resource.aws_s3_bucket":
-                expr = "\\${aws_s3_bucket\\." + f"{element.name}\\."
-                pattern = re.compile(rf"{expr}")
                 if (
-                    self.get_associated_au(
+                    self.get_referencing_au(
                         file,
                         "resource.aws_s3_bucket_public_access_block",
                         "bucket",
-                        pattern,
-                        [""],
+                        "aws_s3_bucket",
+                        element.name,
+                        ctx,
                     )
                     is None
                 ):
@@ -197,12 +196,12 @@ class TerraformAccessControl(TerraformSmellChecker):
                         )
                     )
 
-            for config in SecurityVisitor.ACCESS_CONTROL_CONFIGS:
+            for config in self.visitor.ACCESS_CONTROL_CONFIGS:
                 if (
                     config["required"] == "yes"
                     and element.type in config["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                 ):
                     errors.append(
@@ -215,6 +214,6 @@ class TerraformAccessControl(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
@@ -1,12 +1,14 @@
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, CodeElement, KeyValue, Attribute
 
 
 class TerraformAttachedResource(TerraformSmellChecker):
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {"resource.aws_route53_record"}
+
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
 
         if isinstance(element, AtomicUnit):
@@ -22,7 +24,10 @@ class TerraformAttachedResource(TerraformSmellChecker):
                             ) or f"{a.value}".lower().startswith(f"{resource_type}."):
                                 resource_name = a.value.lower().split(".")[1]
                                 if self.get_au(
-                                    file, resource_name, f"resource.{resource_type}"
+                                    file,
+                                    resource_name,
+                                    f"resource.{resource_type}",
+                                    ctx.code,
                                 ):
                                     return True
                     elif a.value == None:
@@ -32,11 +37,9 @@ class TerraformAttachedResource(TerraformSmellChecker):
                 return False
 
             if element.type == "resource.aws_route53_record":
-                type_A = self.check_required_attribute(
-                    element.attributes, [""], "type", "a"
-                )
+                type_A = self.check_required_attribute(element, [""], "type", "a")
                 if type_A and not check_attached_resource(
-                    element.attributes, SecurityVisitor.POSSIBLE_ATTACHED_RESOURCES
+                    element.attributes, self.visitor.POSSIBLE_ATTACHED_RESOURCES
                 ):
                     errors.append(
                         Error("sec_attached_resource", element, file, repr(element))
@@ -1,22 +1,30 @@
 import re
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformAuthentication(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {
+            "resource.google_sql_database_instance",
+            "resource.aws_iam_group",
+        } | self._get_config_au_types(
+            self.visitor.AUTHENTICATION, self.visitor.POLICY_AUTHENTICATION
+        )
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for item in SecurityVisitor.POLICY_KEYWORDS:
+        for item in self.visitor.POLICY_KEYWORDS:
             if item.lower() == attribute.name:
-                for config in SecurityVisitor.POLICY_AUTHENTICATION:
+                for config in self.visitor.POLICY_AUTHENTICATION:
                     if atomic_unit.type in config["au_type"]:
                         expr = (
                             config["keyword"].lower() + "\\s*" + config["value"].lower()
@@ -34,7 +42,7 @@ class TerraformAuthentication(TerraformSmellChecker):
                                 )
                             ]
 
-        for config in SecurityVisitor.AUTHENTICATION:
+        for config in self.visitor.AUTHENTICATION:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -48,7 +56,7 @@ class TerraformAuthentication(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
 
         if isinstance(element, AtomicUnit):
@@ -61,10 +69,13 @@ class TerraformAuthentication(TerraformSmellChecker):
                     "off",
                 )
             elif element.type == "resource.aws_iam_group":
-                expr = "\\${aws_iam_group\\." + f"{element.name}\\."
-                pattern = re.compile(rf"{expr}")
-                if not self.get_associated_au(
-                    file, "resource.aws_iam_group_policy", "group", pattern, [""]
+                if not self.get_referencing_au(
+                    file,
+                    "resource.aws_iam_group_policy",
+                    "group",
+                    "aws_iam_group",
+                    element.name,
+                    ctx,
                 ):
                     errors.append(
                         Error(
@@ -77,12 +88,12 @@ class TerraformAuthentication(TerraformSmellChecker):
                         )
                     )
 
-            for config in SecurityVisitor.AUTHENTICATION:
+            for config in self.visitor.AUTHENTICATION:
                 if (
                     config["required"] == "yes"
                     and element.type in config["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                 ):
                     errors.append(
@@ -95,6 +106,6 @@ class TerraformAuthentication(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
@@ -1,19 +1,22 @@
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformHttpWithoutTls(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {"data.http"} | self._get_config_au_types(self.visitor.HTTPS_CONFIGS)
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for config in SecurityVisitor.HTTPS_CONFIGS:
+        for config in self.visitor.HTTPS_CONFIGS:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -26,11 +29,11 @@ class TerraformHttpWithoutTls(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type == "data.http":
-                url = self.check_required_attribute(element.attributes, [""], "url")
+                url = self.check_required_attribute(element, [""], "url")
                 if (
                     isinstance(url, KeyValue)
                     and isinstance(url.value, str)
@@ -50,15 +53,17 @@ class TerraformHttpWithoutTls(TerraformSmellChecker):
                         type = "resource"
                         resource_type = r.split(".")[0]
                         resource_name = r.split(".")[1]
-                    if self.get_au(file, resource_name, type + "." + resource_type):
+                    if self.get_au(
+                        file, resource_name, type + "." + resource_type, ctx.code
+                    ):
                         errors.append(Error("sec_https", url, file, repr(url)))
 
-            for config in SecurityVisitor.HTTPS_CONFIGS:
+            for config in self.visitor.HTTPS_CONFIGS:
                 if (
                     config["required"] == "yes"
                     and element.type in config["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                 ):
                     errors.append(
@@ -71,6 +76,6 @@ class TerraformHttpWithoutTls(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
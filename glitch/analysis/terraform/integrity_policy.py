@@ -1,19 +1,22 @@
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformIntegrityPolicy(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return self._get_config_au_types(self.visitor.INTEGRITY_POLICY)
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for policy in SecurityVisitor.INTEGRITY_POLICY:
+        for policy in self.visitor.INTEGRITY_POLICY:
             if (
                 attribute.name == policy["attribute"]
                 and atomic_unit.type in policy["au_type"]
@@ -26,15 +29,15 @@ class TerraformIntegrityPolicy(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
-            for policy in SecurityVisitor.INTEGRITY_POLICY:
+            for policy in self.visitor.INTEGRITY_POLICY:
                 if (
                     policy["required"] == "yes"
                     and element.type in policy["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, policy["parents"], policy["attribute"]
+                        element, policy["parents"], policy["attribute"]
                     )
                 ):
                     errors.append(
@@ -47,6 +50,6 @@ class TerraformIntegrityPolicy(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
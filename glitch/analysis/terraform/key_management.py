@@ -1,20 +1,28 @@
 import re
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformKeyManagement(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {
+            "resource.azurerm_storage_account",
+            "resource.google_kms_crypto_key",
+            "resource.aws_sqs_queue",
+            "resource.aws_sns_queue",
+        } | self._get_config_au_types(self.visitor.KEY_MANAGEMENT)
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for config in SecurityVisitor.KEY_MANAGEMENT:
+        for config in self.visitor.KEY_MANAGEMENT:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -68,18 +76,17 @@ class TerraformKeyManagement(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type == "resource.azurerm_storage_account":
-                expr = "\\${azurerm_storage_account\\." + f"{element.name}\\."
-                pattern = re.compile(rf"{expr}")
-                if not self.get_associated_au(
+                if not self.get_referencing_au(
                     file,
                     "resource.azurerm_storage_account_customer_managed_key",
                     "storage_account_id",
-                    pattern,
-                    [""],
+                    "azurerm_storage_account",
+                    element.name,
+                    ctx,
                 ):
                     errors.append(
                         Error(
@@ -91,12 +98,12 @@ class TerraformKeyManagement(TerraformSmellChecker):
                             + f"associated to an 'azurerm_storage_account' resource.",
                         )
                     )
-            for config in SecurityVisitor.KEY_MANAGEMENT:
+            for config in self.visitor.KEY_MANAGEMENT:
                 if (
                     config["required"] == "yes"
                     and element.type in config["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                 ):
                     errors.append(
@@ -109,6 +116,6 @@ class TerraformKeyManagement(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
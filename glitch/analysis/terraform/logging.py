@@ -1,13 +1,32 @@
 import re
 
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformLogging(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {
+            "resource.aws_cloudtrail",
+            "resource.azurerm_mssql_database_extended_auditing_policy",
+            "resource.azurerm_mssql_server_extended_auditing_policy",
+            "resource.azurerm_network_watcher_flow_log",
+            "resource.azurerm_monitor_log_profile",
+            "resource.aws_eks_cluster",
+            "resource.aws_msk_cluster",
+            "resource.aws_neptune_cluster",
+            "resource.aws_docdb_cluster",
+            "resource.azurerm_mssql_server",
+            "resource.azurerm_mssql_database",
+            "resource.azurerm_postgresql_configuration",
+            "resource.google_sql_database_instance",
+            "resource.azurerm_storage_container",
+            "resource.aws_ecs_cluster",
+            "resource.aws_vpc",
+        } | self._get_config_au_types(self.visitor.LOGGING)
+
     def __check_log_attribute(
         self,
         element: AtomicUnit,
@@ -17,15 +36,13 @@ class TerraformLogging(TerraformSmellChecker):
         all: bool = False,
     ) -> List[Error]:
         errors: List[Error] = []
-        attribute = self.check_required_attribute(
-            element.attributes, [""], f"{attribute_name}[0]"
-        )
+        attribute = self.check_required_attribute(element, [""], f"{attribute_name}[0]")
 
         if all:
             active = True
             for v in values[:]:
                 attribute_checked, _ = self.iterate_required_attributes(
-                    element.attributes,
+                    element,
                     attribute_name,
                     lambda x: isinstance(x.value, str) and x.value.lower() == v,
                 )
@@ -34,7 +51,7 @@ class TerraformLogging(TerraformSmellChecker):
                 active = active and attribute_checked
         else:
             active, _ = self.iterate_required_attributes(
-                element.attributes,
+                element,
                 attribute_name,
                 lambda x: isinstance(x.value, str) and x.value.lower() in values,
             )
@@ -64,11 +81,13 @@ class TerraformLogging(TerraformSmellChecker):
 
         return errors
 
-    def __check_azurerm_storage_container(self, element: AtomicUnit, file: str):
+    def __check_azurerm_storage_container(
+        self, element: AtomicUnit, file: str, ctx: Context
+    ):
         errors: List[Error] = []
 
         container_access_type = self.check_required_attribute(
-            element.attributes, [""], "container_access_type"
+            element, [""], "container_access_type"
         )
         if (
             container_access_type
@@ -90,7 +109,7 @@ class TerraformLogging(TerraformSmellChecker):
             )
 
         storage_account_name = self.check_required_attribute(
-            element.attributes, [""], "storage_account_name"
+            element, [""], "storage_account_name"
         )
         if not (
             storage_account_name is not None
@@ -113,7 +132,9 @@ class TerraformLogging(TerraformSmellChecker):
             return errors
 
         name = storage_account_name.value.lower().split(".")[1]
-        storage_account_au = self.get_au(file, name, "resource.azurerm_storage_account")
+        storage_account_au = self.get_au(
+            file, name, "resource.azurerm_storage_account", ctx.code
+        )
         if storage_account_au is None:
             errors.append(
                 Error(
@@ -127,14 +148,13 @@ class TerraformLogging(TerraformSmellChecker):
             )
             return errors
 
-        expr = "\\${azurerm_storage_account\\." + f"{name}\\."
-        pattern = re.compile(rf"{expr}")
-        assoc_au = self.get_associated_au(
+        assoc_au = self.get_referencing_au(
             file,
             "resource.azurerm_log_analytics_storage_insights",
             "storage_account_id",
-            pattern,
-            [""],
+            "azurerm_storage_account",
+            name,
+            ctx,
         )
         if assoc_au is None:
             errors.append(
@@ -150,7 +170,7 @@ class TerraformLogging(TerraformSmellChecker):
             return errors
 
         blob_container_names = self.check_required_attribute(
-            assoc_au.attributes, [""], "blob_container_names[0]"
+            assoc_au, [""], "blob_container_names[0]"
         )
         if blob_container_names is None:
             errors.append(
@@ -165,7 +185,7 @@ class TerraformLogging(TerraformSmellChecker):
             return errors
 
         contains_blob_name, _ = self.iterate_required_attributes(
-            assoc_au.attributes, "blob_container_names", lambda x: x.value  # type: ignore
+            assoc_au, "blob_container_names", lambda x: x.value  # type: ignore
         )
         if not contains_blob_name:
             errors.append(
@@ -185,6 +205,7 @@ class TerraformLogging(TerraformSmellChecker):
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
         if (
             attribute.name == "cloud_watch_logs_group_arn"
@@ -198,6 +219,7 @@ class TerraformLogging(TerraformSmellChecker):
                     file,
                     aws_cloudwatch_log_group_name,
                     "resource.aws_cloudwatch_log_group",
+                    ctx.code,
                 ):
                     return [
                         Error(
@@ -248,7 +270,7 @@ class TerraformLogging(TerraformSmellChecker):
         ):
             return [Error("sec_logging", attribute, file, repr(attribute))]
 
-        for config in SecurityVisitor.LOGGING:
+        for config in self.visitor.LOGGING:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -271,7 +293,7 @@ class TerraformLogging(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type == "resource.aws_eks_cluster":
@@ -292,7 +314,7 @@ class TerraformLogging(TerraformSmellChecker):
                 )
             elif element.type == "resource.aws_msk_cluster":
                 broker_logs = self.check_required_attribute(
-                    element.attributes, ["logging_info"], "broker_logs"
+                    element, ["logging_info"], "broker_logs"
                 )
                 if isinstance(broker_logs, KeyValue):
                     active = False
@@ -357,14 +379,13 @@ class TerraformLogging(TerraformSmellChecker):
                     )
                 )
             elif element.type == "resource.azurerm_mssql_server":
-                expr = "\\${azurerm_mssql_server\\." + f"{element.name}\\."
-                pattern = re.compile(rf"{expr}")
-                assoc_au = self.get_associated_au(
+                assoc_au = self.get_referencing_au(
                     file,
                     "resource.azurerm_mssql_server_extended_auditing_policy",
                     "server_id",
-                    pattern,
-                    [""],
+                    "azurerm_mssql_server",
+                    element.name,
+                    ctx,
                 )
                 if not assoc_au:
                     errors.append(
@@ -378,14 +399,13 @@ class TerraformLogging(TerraformSmellChecker):
                         )
                     )
             elif element.type == "resource.azurerm_mssql_database":
-                expr = "\\${azurerm_mssql_database\\." + f"{element.name}\\."
-                pattern = re.compile(rf"{expr}")
-                assoc_au = self.get_associated_au(
+                assoc_au = self.get_referencing_au(
                     file,
                     "resource.azurerm_mssql_database_extended_auditing_policy",
                     "database_id",
-                    pattern,
-                    [""],
+                    "azurerm_mssql_database",
+                    element.name,
+                    ctx,
                 )
                 if not assoc_au:
                     errors.append(
@@ -399,8 +419,8 @@ class TerraformLogging(TerraformSmellChecker):
                         )
                     )
             elif element.type == "resource.azurerm_postgresql_configuration":
-                name = self.check_required_attribute(element.attributes, [""], "name")
-                value = self.check_required_attribute(element.attributes, [""], "value")
+                name = self.check_required_attribute(element, [""], "name")
+                value = self.check_required_attribute(element, [""], "value")
                 if (
                     isinstance(name, KeyValue)
                     and isinstance(name.value, str)
@@ -422,7 +442,7 @@ class TerraformLogging(TerraformSmellChecker):
                     )
                 )
             elif element.type == "resource.google_sql_database_instance":
-                for flag in SecurityVisitor.GOOGLE_SQL_DATABASE_LOG_FLAGS:
+                for flag in self.visitor.GOOGLE_SQL_DATABASE_LOG_FLAGS:
                     required_flag = True
                     if flag["required"] == "no":
                         required_flag = False
@@ -435,14 +455,14 @@ class TerraformLogging(TerraformSmellChecker):
                         required_flag,
                     )
             elif element.type == "resource.azurerm_storage_container":
-                errors += self.__check_azurerm_storage_container(element, file)
+                errors += self.__check_azurerm_storage_container(element, file, ctx)
             elif element.type == "resource.aws_ecs_cluster":
                 name = self.check_required_attribute(
-                    element.attributes, ["setting"], "name", "containerinsights"
+                    element, ["setting"], "name", "containerinsights"
                 )
                 if name is not None:
                     enabled = self.check_required_attribute(
-                        element.attributes, ["setting"], "value"
+                        element, ["setting"], "value"
                     )
                     if isinstance(enabled, KeyValue):
                         if (
@@ -473,10 +493,13 @@ class TerraformLogging(TerraformSmellChecker):
                         )
                     )
             elif element.type == "resource.aws_vpc":
-                expr = "\\${aws_vpc\\." + f"{element.name}\\."
-                pattern = re.compile(rf"{expr}")
-                assoc_au = self.get_associated_au(
-                    file, "resource.aws_flow_log", "vpc_id", pattern, [""]
+                assoc_au = self.get_referencing_au(
+                    file,
+                    "resource.aws_flow_log",
+                    "vpc_id",
+                    "aws_vpc",
+                    element.name,
+                    ctx,
                 )
                 if not assoc_au:
                     errors.append(
@@ -490,12 +513,12 @@ class TerraformLogging(TerraformSmellChecker):
                         )
                     )
 
-            for config in SecurityVisitor.LOGGING:
+            for config in self.visitor.LOGGING:
                 if (
                     config["required"] == "yes"
                     and element.type in config["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                 ):
                     errors.append(
@@ -508,6 +531,6 @@ class TerraformLogging(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
@@ -1,20 +1,31 @@
 import re
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformMissingEncryption(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {
+            "resource.aws_s3_bucket",
+            "resource.aws_eks_cluster",
+            "resource.aws_instance",
+            "resource.aws_launch_configuration",
+            "resource.aws_ecs_task_definition",
+        } | self._get_config_au_types(
+            self.visitor.MISSING_ENCRYPTION, self.visitor.ENCRYPT_CONFIG
+        )
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for config in SecurityVisitor.MISSING_ENCRYPTION:
+        for config in self.visitor.MISSING_ENCRYPTION:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -42,9 +53,9 @@ class TerraformMissingEncryption(TerraformSmellChecker):
                             "sec_missing_encryption", attribute, file, repr(attribute)
                         )
                     ]
-        for item in SecurityVisitor.CONFIGURATION_KEYWORDS:
+        for item in self.visitor.CONFIGURATION_KEYWORDS:
             if item.lower() == attribute.name:
-                for config in SecurityVisitor.ENCRYPT_CONFIG:
+                for config in self.visitor.ENCRYPT_CONFIG:
                     if atomic_unit.type in config["au_type"]:
                         expr = (
                             config["keyword"].lower() + "\\s*" + config["value"].lower()
@@ -79,18 +90,17 @@ class TerraformMissingEncryption(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type == "resource.aws_s3_bucket":
-                expr = "\\${aws_s3_bucket\\." + f"{element.name}\\."
-                pattern = re.compile(rf"{expr}")
-                r = self.get_associated_au(
+                r = self.get_referencing_au(
                     file,
                     "resource.aws_s3_bucket_server_side_encryption_configuration",
                     "bucket",
-                    pattern,
-                    [""],
+                    "aws_s3_bucket",
+                    element.name,
+                    ctx,
                 )
                 if not r:
                     errors.append(
@@ -105,7 +115,7 @@ class TerraformMissingEncryption(TerraformSmellChecker):
                     )
             elif element.type == "resource.aws_eks_cluster":
                 resources = self.check_required_attribute(
-                    element.attributes, ["encryption_config"], "resources[0]"
+                    element, ["encryption_config"], "resources[0]"
                 )
                 if isinstance(resources, KeyValue):
                     i = 0
@@ -120,7 +130,7 @@ class TerraformMissingEncryption(TerraformSmellChecker):
                             break
                         i += 1
                         resources = self.check_required_attribute(
-                            element.attributes, ["encryption_config"], f"resources[{i}]"
+                            element, ["encryption_config"], f"resources[{i}]"
                         )
                     if not valid:
                         errors.append(Error("sec_missing_encryption", a, file, repr(a)))  # type: ignore
@@ -139,7 +149,7 @@ class TerraformMissingEncryption(TerraformSmellChecker):
                 "resource.aws_launch_configuration",
             ]:
                 ebs_block_device = self.check_required_attribute(
-                    element.attributes, [""], "ebs_block_device"
+                    element, [""], "ebs_block_device"
                 )
                 if isinstance(ebs_block_device, KeyValue):
                     encrypted = self.check_required_attribute(
@@ -156,9 +166,7 @@ class TerraformMissingEncryption(TerraformSmellChecker):
                             )
                         )
             elif element.type == "resource.aws_ecs_task_definition":
-                volume = self.check_required_attribute(
-                    element.attributes, [""], "volume"
-                )
+                volume = self.check_required_attribute(element, [""], "volume")
                 if isinstance(volume, KeyValue):
                     efs_volume_config = self.check_required_attribute(
                         volume.keyvalues, [""], "efs_volume_configuration"
@@ -179,12 +187,12 @@ class TerraformMissingEncryption(TerraformSmellChecker):
                                 )
                             )
 
-            for config in SecurityVisitor.MISSING_ENCRYPTION:
+            for config in self.visitor.MISSING_ENCRYPTION:
                 if (
                     config["required"] == "yes"
                     and element.type in config["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                 ):
                     errors.append(
@@ -197,6 +205,6 @@ class TerraformMissingEncryption(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
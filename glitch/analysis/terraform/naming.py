@@ -1,18 +1,25 @@
 import re
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformNaming(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {
+            "resource.azurerm_storage_account",
+            "resource.aws_security_group",
+            "resource.google_container_cluster",
+        } | self._get_config_au_types(self.visitor.NAMING)
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
         if attribute.name == "name" and atomic_unit.type in [
             "resource.azurerm_storage_account"
@@ -23,7 +30,7 @@ class TerraformNaming(TerraformSmellChecker):
             ):
                 return [Error("sec_naming", attribute, file, repr(attribute))]
 
-        for config in SecurityVisitor.NAMING:
+        for config in self.visitor.NAMING:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -46,16 +53,12 @@ class TerraformNaming(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type == "resource.aws_security_group":
-                ingress = self.check_required_attribute(
-                    element.attributes, [""], "ingress"
-                )
-                egress = self.check_required_attribute(
-                    element.attributes, [""], "egress"
-                )
+                ingress = self.check_required_attribute(element, [""], "ingress")
+                egress = self.check_required_attribute(element, [""], "egress")
                 if isinstance(ingress, KeyValue) and not self.check_required_attribute(
                     ingress.keyvalues, [""], "description"
                 ):
@@ -82,7 +85,7 @@ class TerraformNaming(TerraformSmellChecker):
                     )
             elif element.type == "resource.google_container_cluster":
                 resource_labels = self.check_required_attribute(
-                    element.attributes, [""], "resource_labels", None
+                    element, [""], "resource_labels", None
                 )
                 if (
                     isinstance(resource_labels, KeyValue)
@@ -109,12 +112,12 @@ class TerraformNaming(TerraformSmellChecker):
                         )
                     )
 
-            for config in SecurityVisitor.NAMING:
+            for config in self.visitor.NAMING:
                 if (
                     config["required"] == "yes"
                     and element.type in config["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                 ):
                     errors.append(
@@ -127,6 +130,6 @@ class TerraformNaming(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
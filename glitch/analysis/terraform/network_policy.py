@@ -1,20 +1,26 @@
 import re
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformNetworkSecurityRules(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {
+            "resource.azurerm_network_security_rule",
+            "resource.azurerm_network_security_group",
+        } | self._get_config_au_types(self.visitor.NETWORK_SECURITY_RULES)
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for rule in SecurityVisitor.NETWORK_SECURITY_RULES:
+        for rule in self.visitor.NETWORK_SECURITY_RULES:
             if (
                 attribute.name == rule["attribute"]
                 and atomic_unit.type in rule["au_type"]
@@ -32,21 +38,17 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type == "resource.azurerm_network_security_rule":
-                access = self.check_required_attribute(
-                    element.attributes, [""], "access"
-                )
+                access = self.check_required_attribute(element, [""], "access")
                 if (
                     isinstance(access, KeyValue)
                     and isinstance(access.value, str)
                     and access.value.lower() == "allow"
                 ):
-                    protocol = self.check_required_attribute(
-                        element.attributes, [""], "protocol"
-                    )
+                    protocol = self.check_required_attribute(element, [""], "protocol")
                     if (
                         isinstance(protocol, KeyValue)
                         and isinstance(protocol.value, str)
@@ -63,7 +65,7 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
                         and protocol.value.lower() == "tcp"
                     ):
                         dest_port_range = self.check_required_attribute(
-                            element.attributes, [""], "destination_port_range"
+                            element, [""], "destination_port_range"
                         )
                         port = (
                             isinstance(dest_port_range, KeyValue)
@@ -76,7 +78,7 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
                             ]
                         )
                         port_ranges, _ = self.iterate_required_attributes(
-                            element.attributes,
+                            element,
                             "destination_port_ranges",
                             lambda x: (
                                 isinstance(x.value, str)
@@ -86,7 +88,7 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
 
                         if port or port_ranges:
                             source_address_prefix = self.check_required_attribute(
-                                element.attributes, [""], "source_address_prefix"
+                                element, [""], "source_address_prefix"
                             )
                             if (
                                 isinstance(source_address_prefix, KeyValue)
@@ -109,7 +111,7 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
                                 )
             elif element.type == "resource.azurerm_network_security_group":
                 access = self.check_required_attribute(
-                    element.attributes, ["security_rule"], "access"
+                    element, ["security_rule"], "access"
                 )
                 if (
                     isinstance(access, KeyValue)
@@ -117,7 +119,7 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
                     and access.value.lower() == "allow"
                 ):
                     protocol = self.check_required_attribute(
-                        element.attributes, ["security_rule"], "protocol"
+                        element, ["security_rule"], "protocol"
                     )
                     if (
                         isinstance(protocol, KeyValue)
@@ -135,7 +137,7 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
                         and protocol.value.lower() == "tcp"
                     ):
                         dest_port_range = self.check_required_attribute(
-                            element.attributes,
+                            element,
                             ["security_rule"],
                             "destination_port_range",
                         )
@@ -150,7 +152,7 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
                             ]
                         ):
                             source_address_prefix = self.check_required_attribute(
-                                element.attributes, [""], "source_address_prefix"
+                                element, [""], "source_address_prefix"
                             )
                             if (
                                 isinstance(source_address_prefix, KeyValue)
@@ -172,12 +174,12 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
                                     )
                                 )
 
-            for rule in SecurityVisitor.NETWORK_SECURITY_RULES:
+            for rule in self.visitor.NETWORK_SECURITY_RULES:
                 if (
                     rule["required"] == "yes"
                     and element.type in rule["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, rule["parents"], rule["attribute"]
+                        element, rule["parents"], rule["attribute"]
                     )
                 ):
                     errors.append(
@@ -190,6 +192,6 @@ class TerraformNetworkSecurityRules(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
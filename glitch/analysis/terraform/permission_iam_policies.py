@@ -1,22 +1,29 @@
 import re
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformPermissionIAMPolicies(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return (
+            {"resource.aws_iam_user"}
+            | self._get_config_au_types(self.visitor.PERMISSION_IAM_POLICIES)
+            | set(self.visitor.GOOGLE_IAM_MEMBER)
+        )
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
         if (
             (attribute.name == "member" or attribute.name.split("[")[0] == "members")
-            and atomic_unit.type in SecurityVisitor.GOOGLE_IAM_MEMBER
+            and atomic_unit.type in self.visitor.GOOGLE_IAM_MEMBER
             and isinstance(attribute.value, str)
             and (
                 re.search(r".-compute@developer.gserviceaccount.com", attribute.value)
@@ -28,7 +35,7 @@ class TerraformPermissionIAMPolicies(TerraformSmellChecker):
                 Error("sec_permission_iam_policies", attribute, file, repr(attribute))
             ]
 
-        for config in SecurityVisitor.PERMISSION_IAM_POLICIES:
+        for config in self.visitor.PERMISSION_IAM_POLICIES:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -56,23 +63,28 @@ class TerraformPermissionIAMPolicies(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type == "resource.aws_iam_user":
-                expr = "\\${aws_iam_user\\." + f"{element.name}\\."
-                pattern = re.compile(rf"{expr}")
-                assoc_au = self.get_associated_au(
-                    file, "resource.aws_iam_user_policy", "user", pattern, [""]
+                assoc_au = self.get_referencing_au(
+                    file,
+                    "resource.aws_iam_user_policy",
+                    "user",
+                    "aws_iam_user",
+                    element.name,
+                    ctx,
                 )
                 if assoc_au is not None:
+                    expr = "\\${aws_iam_user\\." + f"{element.name}\\."
+                    pattern = re.compile(rf"{expr}")
                     a = self.check_required_attribute(
-                        assoc_au.attributes, [""], "user", None, pattern
+                        assoc_au, [""], "user", None, pattern
                     )
                     errors.append(
                         Error("sec_permission_iam_policies", a, file, repr(a))
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
@@ -1,19 +1,22 @@
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformPublicIp(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return self._get_config_au_types(self.visitor.PUBLIC_IP_CONFIGS)
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for config in SecurityVisitor.PUBLIC_IP_CONFIGS:
+        for config in self.visitor.PUBLIC_IP_CONFIGS:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -27,15 +30,15 @@ class TerraformPublicIp(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
-            for config in SecurityVisitor.PUBLIC_IP_CONFIGS:
+            for config in self.visitor.PUBLIC_IP_CONFIGS:
                 if (
                     config["required"] == "yes"
                     and element.type in config["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                 ):
                     errors.append(
@@ -52,11 +55,11 @@ class TerraformPublicIp(TerraformSmellChecker):
                     and element.type in config["au_type"]
                 ):
                     a = self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                     if a is not None:
                         errors.append(Error("sec_public_ip", a, file, repr(a)))
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
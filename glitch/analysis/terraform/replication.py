@@ -1,20 +1,24 @@
-import re
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, CodeElement, KeyValue
 
 
 class TerraformReplication(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {"resource.aws_s3_bucket"} | self._get_config_au_types(
+            self.visitor.REPLICATION
+        )
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for config in SecurityVisitor.REPLICATION:
+        for config in self.visitor.REPLICATION:
             if (
                 attribute.name == config["attribute"]
                 and atomic_unit.type in config["au_type"]
@@ -28,18 +32,17 @@ class TerraformReplication(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type == "resource.aws_s3_bucket":
-                expr = "\\${aws_s3_bucket\\." + f"{element.name}\\."
-                pattern = re.compile(rf"{expr}")
-                if not self.get_associated_au(
+                if not self.get_referencing_au(
                     file,
                     "resource.aws_s3_bucket_replication_configuration",
                     "bucket",
-                    pattern,
-                    [""],
+                    "aws_s3_bucket",
+                    element.name,
+                    ctx,
                 ):
                     errors.append(
                         Error(
@@ -52,12 +55,12 @@ class TerraformReplication(TerraformSmellChecker):
                         )
                     )
 
-            for config in SecurityVisitor.REPLICATION:
+            for config in self.visitor.REPLICATION:
                 if (
                     config["required"] == "yes"
                     and element.type in config["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, config["parents"], config["attribute"]
+                        element, config["parents"], config["attribute"]
                     )
                 ):
                     errors.append(
@@ -70,6 +73,6 @@ class TerraformReplication(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
@@ -1,12 +1,21 @@
 import json
-from typing import List, Dict
+from typing import List, Dict, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, CodeElement, KeyValue
 
 
 class TerraformSensitiveIAMAction(TerraformSmellChecker):
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {
+            "data.aws_iam_policy_document",
+            "resource.aws_iam_role_policy",
+            "resource.aws_iam_policy",
+            "resource.aws_iam_user_policy",
+            "resource.aws_iam_group_policy",
+        }
+
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
 
         def convert_string_to_dict(input_string: str):
@@ -24,7 +33,7 @@ class TerraformSensitiveIAMAction(TerraformSmellChecker):
             return errors
 
         statements = self.check_required_attribute(
-            element.attributes, [""], "statement", return_all=True
+            element, [""], "statement", return_all=True
         )
         if isinstance(statements, list):
             for statement in statements:
@@ -69,7 +78,7 @@ class TerraformSensitiveIAMAction(TerraformSmellChecker):
             "resource.aws_iam_user_policy",
             "resource.aws_iam_group_policy",
         ]:
-            policy = self.check_required_attribute(element.attributes, [""], "policy")
+            policy = self.check_required_attribute(element, [""], "policy")
             if not isinstance(policy, KeyValue) or not isinstance(policy.value, str):
                 return errors
 
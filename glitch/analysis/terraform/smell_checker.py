@@ -2,110 +2,204 @@ import os
 import re
 
 from re import Pattern
-from typing import Optional, List, Callable, Any
+from typing import Optional, List, Callable, Any, Dict, Set, Tuple, TYPE_CHECKING
 from glitch.repr.inter import *
-from glitch.analysis.rules import Error, SmellChecker
+from glitch.analysis.rules import Context, Error, SmellChecker
+
+if TYPE_CHECKING:
+    from glitch.analysis.security import SecurityVisitor
+
+
+class ReferenceGraph:
+    """References between the atomic units of a module (or unit block). There
+    is an edge from an atomic unit to each resource referenced in the value of
+    one of its attributes, e.g. "${aws_s3_bucket.logs.id}" references the
+    resource "logs" of type aws_s3_bucket.
+
+    The security visitor normalizes the attributes while checking them, so the
+    graph is built over the normalized names and values: names and values are
+    stripped and lowercased, and references to input variables and local
+    values are replaced by their values."""
+
+    def __init__(self, code: Module | UnitBlock) -> None:
+        # (type of the atomic unit, name of the attribute, type of the
+        # referenced resource, name of the referenced resource) -> atomic units
+        self.edges: Dict[Tuple[str, str, str, str], List[AtomicUnit]] = {}
+        self.__symbols = code.get_symbols()
+        for atomic_units in self.__symbols.types.values():
+            for au in atomic_units:
+                self.__add_references(au)
+
+    def __resolve(self, kv: KeyValue) -> Any:
+        # Variables are resolved as in SecurityVisitor.__check_keyvalue
+        if not kv.has_variable or not isinstance(kv.value, str):
+            return kv.value
+        value = re.sub(r"^\${(.*)}$", r"\1", kv.value.strip().lower())
+        var = None
+        if value.startswith("var."):
+            au = self.__symbols.get_atomic_unit("variable", value.strip("var."))
+            if au is not None:
+                for attribute in au.attributes:
+                    if attribute.name.strip().lower() == "default":
+                        var = attribute
+        elif value.startswith("local."):
+            var = self.__symbols.get_variable(value.strip("local."))
+        return var.value if var is not None else kv.value
+
+    @staticmethod
+    def __get_reference(value: str) -> Optional[Tuple[str, str]]:
+        value = value.strip().lower()
+        if not value.startswith("${"):
+            return None
+        reference = value[2:].split(".", 2)
+        if len(reference) < 3:
+            return None
+        return reference[0], reference[1]
+
+    def __add_references(self, au: AtomicUnit) -> None:
+        # The attributes are searched as in get_attributes_with_name_and_value
+        for name, keyvalues in au.get_attribute_index().names.items():
+            for kv in keyvalues:
+                value = self.__resolve(kv)
+                if not isinstance(value, str):
+                    continue
+                reference = ReferenceGraph.__get_reference(value)
+                if reference is not None:
+                    edges = self.edges.setdefault((au.type, name, *reference), [])
+                    if len(edges) == 0 or edges[-1] is not au:
+                        edges.append(au)
+
+    def get_referencing_aus(
+        self, type: str, attribute_name: str, referenced_type: str, name: str
+    ) -> List[AtomicUnit]:
+        return self.edges.get((type, attribute_name, referenced_type, name), [])
+
+
+class TerraformContext(Context):
+    def __init__(self, code: Project | Module | UnitBlock) -> None:
+        super().__init__(code)
+        # Reference graphs of the modules (or unit blocks) checked in this run
+        self.__references: Dict[int, ReferenceGraph] = {}
+
+    def get_references(self, code: Module | UnitBlock) -> ReferenceGraph:
+        if id(code) not in self.__references:
+            self.__references[id(code)] = ReferenceGraph(code)
+        return self.__references[id(code)]
 
 
 class TerraformSmellChecker(SmellChecker):
+    def __init__(self, visitor: "SecurityVisitor") -> None:
+        super().__init__()
+        # The config of the checkers is kept by the visitor
+        self.visitor = visitor
+
+    def get_au_types(self) -> Optional[Set[str]]:
+        """Returns the types of the atomic units on which the checker can find
+        smells. The checkers only look for smells in atomic units (and their
+        attributes), so they are not called for other elements. The method is
+        called after the visitor is configured.
+
+        Returns:
+            Optional[Set[str]]: The types of the atomic units, or None if the
+                checker has to check every atomic unit.
+        """
+        return None
+
+    @staticmethod
+    def _get_config_au_types(*configs: List[Dict[str, Any]]) -> Set[str]:
+        return {
+            au_type for config in configs for c in config for au_type in c["au_type"]
+        }
+
     def get_au(
         self,
         file: str,
         name: str,
         type: str,
-        c: Project | Module | UnitBlock | None = None,
+        c: Project | Module | UnitBlock,
     ) -> Optional[AtomicUnit]:
-        c = self.code if c is None else c
         if isinstance(c, Project):
-            module_name = os.path.basename(os.path.dirname(file))
-            for m in c.modules:
-                if m.name == module_name:
-                    return self.get_au(file, name, type, c=m)
-        elif isinstance(c, Module):
-            for ub in c.blocks:
-                au = self.get_au(file, name, type, c=ub)
-                if au is not None:
-                    return au
-        elif isinstance(c, UnitBlock):
-            for au in c.atomic_units:
-                if au.type == type and au.name == name:
-                    return au
+            module = c.get_module(os.path.basename(os.path.dirname(file)))
+            if module is not None:
+                return self.get_au(file, name, type, c=module)
+        elif isinstance(c, (Module, UnitBlock)):
+            return c.get_symbols().get_atomic_unit(type, name)
         return None
 
-    def get_associated_au(
+    def get_referencing_au(
         self,
         file: str,
         type: str,
         attribute_name: str,
-        pattern: Pattern[str],
-        attribute_parents: List[str],
-        code: Project | Module | UnitBlock | None = None,
+        referenced_type: str,
+        referenced_name: str,
+        ctx: Context,
     ) -> Optional[AtomicUnit]:
-        code = self.code if code is None else code
+        """Returns the first atomic unit of the type with an attribute (at any
+        depth) that references a resource, e.g. the aws_s3_bucket_policy whose
+        attribute "bucket" is "${aws_s3_bucket.<name>.id}".
+
+        Args:
+            file (str): The file being checked.
+            type (str): The type of the atomic unit, e.g. "resource.aws_s3_bucket_policy".
+            attribute_name (str): The name of the attribute with the reference.
+            referenced_type (str): The type of the resource referenced, e.g. "aws_s3_bucket".
+            referenced_name (str): The name of the resource referenced.
+            ctx (Context): The context of the run.
+
+        Returns:
+            Optional[AtomicUnit]: The atomic unit, if there is one.
+        """
+        code = ctx.code
         if isinstance(code, Project):
-            module_name = os.path.basename(os.path.dirname(file))
-            for m in code.modules:
-                if m.name == module_name:
-                    return self.get_associated_au(
-                        file, type, attribute_name, pattern, attribute_parents, code=m
-                    )
-        elif isinstance(code, Module):
-            for ub in code.blocks:
-                au = self.get_associated_au(
-                    file, type, attribute_name, pattern, attribute_parents, code=ub
-                )
-                if au is not None:
-                    return au
-        elif isinstance(code, UnitBlock):
-            for au in code.atomic_units:
-                if au.type == type and self.check_required_attribute(
-                    au.attributes, attribute_parents, attribute_name, None, pattern
-                ):
-                    return au
-        return None
+            code = code.get_module(os.path.basename(os.path.dirname(file)))
+            if code is None:
+                return None
+
+        if isinstance(ctx, TerraformContext):
+            references = ctx.get_references(code)
+        else:
+            references = ReferenceGraph(code)
+        aus = references.get_referencing_aus(
+            type, attribute_name, referenced_type, referenced_name
+        )
+        return aus[0] if len(aus) > 0 else None
+
+    @staticmethod
+    def _get_attribute_index(
+        attributes: AtomicUnit | List[KeyValue] | List[Attribute],
+    ) -> AttributeIndex:
+        # The index of an atomic unit is kept, so the attributes are only
+        # traversed once for all the checkers
+        if isinstance(attributes, AtomicUnit):
+            return attributes.get_attribute_index()
+        return AttributeIndex(attributes)
 
     def get_attributes_with_name_and_value(
         self,
-        attributes: List[KeyValue] | List[Attribute],
+        attributes: AtomicUnit | List[KeyValue] | List[Attribute],
         parents: List[str],
         name: str,
         value: Optional[Any] = None,
         pattern: Optional[Pattern[str]] = None,
     ) -> List[KeyValue]:
         aux: List[KeyValue] = []
-        for a in attributes:
-            if a.name.split("dynamic.")[-1] == name and parents == [""]:
-                if (
-                    value and isinstance(a.value, str) and a.value.lower() == value
-                ) or (
+        for a in self._get_attribute_index(attributes).get(parents, name):
+            if (
+                (value and isinstance(a.value, str) and a.value.lower() == value)
+                or (
                     pattern
                     and isinstance(a.value, str)
                     and re.match(pattern, a.value.lower())
-                ):
-                    aux.append(a)
-                elif (
-                    value and isinstance(a.value, str) and a.value.lower() != value
-                ) or (
-                    pattern
-                    and isinstance(a.value, str)
-                    and not re.match(pattern, a.value.lower())
-                ):
-                    continue
-                elif not value and not pattern:
-                    aux.append(a)
-            elif a.name.split("dynamic.")[-1] in parents:
-                aux += self.get_attributes_with_name_and_value(
-                    a.keyvalues, [""], name, value, pattern
-                )
-            elif a.keyvalues != []:
-                aux += self.get_attributes_with_name_and_value(
-                    a.keyvalues, parents, name, value, pattern
                 )
+                or (not value and not pattern)
+            ):
+                aux.append(a)
         return aux
 
     def check_required_attribute(
         self,
-        attributes: List[Attribute] | List[KeyValue],
+        attributes: AtomicUnit | List[Attribute] | List[KeyValue],
         parents: List[str],
         name: str,
         value: Optional[Any] = None,
@@ -132,7 +226,7 @@ class TerraformSmellChecker(SmellChecker):
         required_flag: bool = True,
     ) -> List[Error]:
         database_flags = self.get_attributes_with_name_and_value(
-            au.attributes, ["settings"], "database_flags"
+            au, ["settings"], "database_flags"
         )
         found_flag = False
         errors: List[Error] = []
@@ -176,18 +270,19 @@ class TerraformSmellChecker(SmellChecker):
 
     def iterate_required_attributes(
         self,
-        attributes: List[KeyValue] | List[Attribute],
+        attributes: AtomicUnit | List[KeyValue] | List[Attribute],
         name: str,
         check: Callable[[KeyValue], bool],
     ):
+        index = self._get_attribute_index(attributes)
         i = 0
-        attribute = self.check_required_attribute(attributes, [""], f"{name}[{i}]")
+        attribute = index.get([""], f"{name}[{i}]")
 
-        while isinstance(attribute, KeyValue):
-            if check(attribute):
-                return True, attribute
+        while len(attribute) > 0:
+            if check(attribute[0]):
+                return True, attribute[0]
             i += 1
-            attribute = self.check_required_attribute(attributes, [""], f"{name}[{i}]")
+            attribute = index.get([""], f"{name}[{i}]")
 
         return False, None
 
@@ -197,6 +292,7 @@ class TerraformSmellChecker(SmellChecker):
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
         return []
 
@@ -206,17 +302,20 @@ class TerraformSmellChecker(SmellChecker):
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
         errors: List[Error] = []
-        errors += self._check_attribute(attribute, atomic_unit, parent_name, file)
+        errors += self._check_attribute(attribute, atomic_unit, parent_name, file, ctx)
         for attr_child in attribute.keyvalues:
             errors += self.__check_attribute(
-                attr_child, atomic_unit, attribute.name, file
+                attr_child, atomic_unit, attribute.name, file, ctx
             )
         return errors
 
-    def _check_attributes(self, atomic_unit: AtomicUnit, file: str) -> List[Error]:
+    def _check_attributes(
+        self, atomic_unit: AtomicUnit, file: str, ctx: Context
+    ) -> List[Error]:
         errors: List[Error] = []
         for attribute in atomic_unit.attributes:
-            errors += self.__check_attribute(attribute, atomic_unit, "", file)
+            errors += self.__check_attribute(attribute, atomic_unit, "", file, ctx)
         return errors
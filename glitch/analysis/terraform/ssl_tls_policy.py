@@ -1,19 +1,25 @@
-from typing import List
+from typing import List, Optional, Set
 from glitch.analysis.terraform.smell_checker import TerraformSmellChecker
-from glitch.analysis.rules import Error
-from glitch.analysis.security import SecurityVisitor
+from glitch.analysis.rules import Context, Error
 from glitch.repr.inter import AtomicUnit, Attribute, KeyValue, CodeElement
 
 
 class TerraformSslTlsPolicy(TerraformSmellChecker):
+    def get_au_types(self) -> Optional[Set[str]]:
+        return {
+            "resource.aws_alb_listener",
+            "resource.aws_lb_listener",
+        } | self._get_config_au_types(self.visitor.SSL_TLS_POLICY)
+
     def _check_attribute(
         self,
         attribute: Attribute | KeyValue,
         atomic_unit: AtomicUnit,
         parent_name: str,
         file: str,
+        ctx: Context,
     ) -> List[Error]:
-        for policy in SecurityVisitor.SSL_TLS_POLICY:
+        for policy in self.visitor.SSL_TLS_POLICY:
             if (
                 attribute.name == policy["attribute"]
                 and atomic_unit.type in policy["au_type"]
@@ -26,23 +32,21 @@ class TerraformSslTlsPolicy(TerraformSmellChecker):
 
         return []
 
-    def check(self, element: CodeElement, file: str) -> List[Error]:
+    def check(self, element: CodeElement, file: str, ctx: Context) -> List[Error]:
         errors: List[Error] = []
         if isinstance(element, AtomicUnit):
             if element.type in [
                 "resource.aws_alb_listener",
                 "resource.aws_lb_listener",
             ]:
-                protocol = self.check_required_attribute(
-                    element.attributes, [""], "protocol"
-                )
+                protocol = self.check_required_attribute(element, [""], "protocol")
                 if (
                     isinstance(protocol, KeyValue)
                     and isinstance(protocol.value, str)
                     and protocol.value.lower() in ["https", "tls"]
                 ):
                     ssl_policy = self.check_required_attribute(
-                        element.attributes, [""], "ssl_policy"
+                        element, [""], "ssl_policy"
                     )
                     if not ssl_policy:
                         errors.append(
@@ -55,12 +59,12 @@ class TerraformSslTlsPolicy(TerraformSmellChecker):
                             )
                         )
 
-            for policy in SecurityVisitor.SSL_TLS_POLICY:
+            for policy in self.visitor.SSL_TLS_POLICY:
                 if (
                     policy["required"] == "yes"
                     and element.type in policy["au_type"]
                     and not self.check_required_attribute(
-                        element.attributes, policy["parents"], policy["attribute"]
+                        element, policy["parents"], policy["attribute"]
                     )
                 ):
                     errors.append(
@@ -73,6 +77,6 @@ class TerraformSslTlsPolicy(TerraformSmellChecker):
                         )
                     )
 
-            errors += self._check_attributes(element, file)
+            errors += self._check_attributes(element, file, ctx)
 
         return errors
@@ -0,0 +1,152 @@
+from typing import Optional, Set, List, Tuple
+from pkg_resources import resource_filename
+from glitch.analysis.rules import Error, RuleVisitor
+from glitch.cache import FindingsCache, IRCache
+from glitch.parsers.parser import Parser
+from glitch.profiler import profile
+from glitch.parsers.ansible import AnsibleParser
+from glitch.parsers.chef import ChefParser
+from glitch.parsers.docker import DockerParser
+from glitch.parsers.puppet import PuppetParser
+from glitch.parsers.terraform import TerraformParser
+from glitch.parsers.gha import GithubActionsParser
+from glitch.repr.inter import Module, Project, UnitBlock, UnitBlockType
+from glitch.stats.stats import FileStats
+from glitch.tech import Tech
+
+# NOTE: These are necessary in order for python to load the visitors.
+# Otherwise, python will not consider these types of rules.
+from glitch.analysis.design.visitor import DesignVisitor  # type: ignore
+from glitch.analysis.security import SecurityVisitor  # type: ignore
+
+
+def get_parser(tech: Tech) -> Parser:
+    if tech == Tech.ansible:
+        return AnsibleParser()
+    elif tech == Tech.chef:
+        return ChefParser()
+    elif tech == Tech.puppet:
+        return PuppetParser()
+    elif tech == Tech.docker:
+        return DockerParser()
+    elif tech == Tech.terraform:
+        return TerraformParser()
+    elif tech == Tech.gha:
+        return GithubActionsParser()
+    else:
+        raise ValueError(f"Invalid tech: {tech}")
+
+
+def get_config(tech: Tech, config: Optional[str] = None) -> str:
+    """Get the path of the config file used to analyze the technology.
+
+    Args:
+        tech (Tech): The technology being analyzed.
+        config (Optional[str]): The path of the config file given by the user.
+            If None, the default config is used.
+
+    Returns:
+        str: The path of the config file.
+    """
+    if tech == Tech.terraform:
+        return resource_filename("glitch", "configs/terraform.ini")
+    elif config is None:
+        return resource_filename("glitch", "configs/default.ini")
+    return config
+
+
+def get_analyses(
+    tech: Tech, config: str, smell_types: Tuple[str, ...]
+) -> List[RuleVisitor]:
+    analyses: List[RuleVisitor] = []
+    rules = RuleVisitor.__subclasses__()
+    for r in rules:
+        if smell_types == () or r.get_name() in smell_types:
+            analysis = r(tech)
+            analysis.config(config)
+            analyses.append(analysis)
+    return analyses
+
+
+class Analyzer:
+    """Parses and analyzes paths of a given technology.
+
+    The parser and the configured analyses are built once, so that an analyzer
+    can be kept in memory to analyze several paths (e.g. by the CLI workers or
+    by a long-lived server) without reading the config files again.
+    """
+
+    def __init__(
+        self,
+        tech: Tech,
+        config: str,
+        smell_types: Tuple[str, ...] = (),
+        cache: Optional[FindingsCache] = None,
+        ir_cache: Optional[IRCache] = None,
+    ) -> None:
+        self.tech = tech
+        self.config = config
+        self.smell_types = smell_types
+        self.cache = cache
+        self.parser = get_parser(tech)
+        # The parsed files are cached separately from the findings, so that
+        # they are reused when the config changes
+        self.parser.cache = ir_cache
+        self.analyses = get_analyses(tech, config, smell_types)
+
+    def parse(
+        self, path: str, type: UnitBlockType, module: bool
+    ) -> Optional[Module | Project | UnitBlock]:
+        with profile("parse", self.tech.tech):
+            return self.parser.parse(path, type, module)
+
+    def check(self, inter: Module | Project | UnitBlock) -> Set[Error]:
+        # The state of each run is kept in its own context, so the analyses
+        # can be shared by multiple threads
+        return set(RuleVisitor.check_all(self.analyses, inter))
+
+    def analyze(
+        self,
+        path: str,
+        type: UnitBlockType = UnitBlockType.unknown,
+        module: bool = False,
+        stats: Optional[FileStats] = None,
+    ) -> Set[Error]:
+        """Parses and analyzes a file or folder.
+
+        Args:
+            path (str): The path of the file or folder.
+            type (UnitBlockType): The type of the unit blocks being analyzed.
+            module (bool): If the folder should be analyzed as a module.
+            stats (Optional[FileStats]): If given, the stats of the path are
+                added to these stats, which must not be shared by other threads.
+
+        Returns:
+            Set[Error]: The errors found.
+        """
+        key = ""
+        if self.cache is not None:
+            key = self.cache.key(path, type, module)
+            with profile("cache", "lookup"):
+                findings = self.cache.get_findings(key)
+            if findings is not None:
+                errors, cached_stats = findings
+                if stats is not None:
+                    stats.merge(cached_stats)
+                return errors
+
+        errors: Set[Error] = set()
+        # The stats of the path are computed separately so that they can be cached
+        path_stats = FileStats()
+        inter = self.parse(path, type, module)
+        if inter != None:
+            errors = self.check(inter)
+            with profile("stats", "FileStats.compute"):
+                path_stats.compute(inter)
+
+        if self.cache is not None:
+            with profile("cache", "store"):
+                self.cache.put_findings(key, errors, path_stats)
+        if stats is not None:
+            stats.merge(path_stats)
+        return errors
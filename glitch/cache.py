@@ -0,0 +1,338 @@
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+
+from importlib import metadata
+from typing import Any, Dict, Optional, Set, Tuple, List
+from glitch.analysis.rules import Error
+from glitch.repr.inter import UnitBlock, UnitBlockType
+from glitch.stats.stats import FileStats
+from glitch.tech import Tech
+
+
+def default_cache_dir() -> str:
+    """Get the default folder for the caches of GLITCH.
+
+    Returns:
+        str: $XDG_CACHE_HOME/glitch or ~/.cache/glitch.
+    """
+    root = os.environ.get("XDG_CACHE_HOME", os.path.join("~", ".cache"))
+    return os.path.join(os.path.expanduser(root), "glitch")
+
+
+def glitch_version() -> str:
+    """Get an identifier of the version of GLITCH being run.
+
+    Besides the package version, the identifier covers the size and
+    modification time of the source files of GLITCH, so that cached results
+    are not reused after the code changes without a new release.
+
+    Returns:
+        str: The version identifier.
+    """
+    try:
+        version = metadata.version("glitch")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+
+    sources = hashlib.sha256()
+    root = os.path.dirname(os.path.realpath(__file__))
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in ["tests", "__pycache__"])
+        for file in sorted(files):
+            if file.endswith((".py", ".ini", ".rb", ".template")):
+                stat = os.stat(os.path.join(folder, file))
+                sources.update(
+                    f"{os.path.relpath(os.path.join(folder, file), root)}:"
+                    f"{stat.st_size}:{stat.st_mtime_ns};".encode()
+                )
+    return f"{version}+{sources.hexdigest()[:16]}"
+
+
+VCS_FOLDERS = [".git", ".hg", ".svn"]
+
+
+def is_tech_file(path: str, tech: Tech) -> bool:
+    """Checks if a file is read by the parser of a technology.
+
+    Args:
+        path (str): The path of the file.
+        tech (Tech): The technology.
+
+    Returns:
+        bool: True if the file is read by the parser of the technology.
+    """
+    name = os.path.basename(path)
+    if tech == Tech.docker:
+        return "Dockerfile" in name
+    return name.split(".")[-1] in tech.extensions
+
+
+def hash_file(path: str) -> str:
+    """Hashes the content of a file.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        str: The hex digest of the content.
+    """
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def hash_path(path: str, tech: Tech, hashes: Optional["FileHashes"] = None) -> str:
+    """Hashes the content of a file or of every file inside a folder that is
+    read by the parser of the technology. The folders of version control
+    systems are ignored.
+
+    Args:
+        path (str): The path of the file or folder.
+        tech (Tech): The technology of the files.
+        hashes (Optional[FileHashes]): The index used to avoid reading files
+            which did not change since they were last hashed.
+
+    Returns:
+        str: The hex digest of the content.
+    """
+    hash_one = hash_file if hashes is None else hashes.hash_file
+    if os.path.isfile(path):
+        return hash_one(path)
+
+    digest = hashlib.sha256()
+    for folder, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d not in VCS_FOLDERS)
+        for file in sorted(files):
+            file_path = os.path.join(folder, file)
+            if (
+                os.path.islink(file_path)
+                or not os.path.isfile(file_path)
+                or not is_tech_file(file_path, tech)
+            ):
+                continue
+            digest.update(os.path.relpath(file_path, path).encode() + b"\0")
+            digest.update(hash_one(file_path).encode())
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """A cache of binary values stored in a folder, one file per entry.
+
+    Entries are written atomically, so the cache can be shared by several
+    threads and processes. The modification time of an entry is updated every
+    time it is read, which allows the least recently used entries to be evicted
+    when the cache grows over its maximum size. Since reads do not grow the
+    cache, the entries are only evicted after new entries are written.
+    """
+
+    # Created by the first write of each instance and removed by prune, so
+    # that prune knows if another process (e.g. a worker) wrote to the cache
+    WRITTEN = "written"
+
+    def __init__(self, folder: str, max_size: int) -> None:
+        self.folder = folder
+        self.max_size = max_size
+        self.__written = False
+
+    def __entry_path(self, key: str) -> str:
+        return os.path.join(self.folder, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.__entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = f.read()
+            os.utime(path)
+            return value
+        except OSError:
+            return None
+
+    def put(self, key: str, value: bytes) -> None:
+        path = self.__entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp, path)
+            if not self.__written:
+                open(os.path.join(self.folder, DiskCache.WRITTEN), "a").close()
+                self.__written = True
+        except OSError:
+            # The cache is only an optimization, so failing to write to it
+            # (e.g. due to a read-only folder) is not an error
+            pass
+
+    def prune(self) -> None:
+        """Evicts the least recently used entries until the size of the cache
+        is at most its maximum size. Nothing is done if no entries were written
+        since the last prune."""
+        try:
+            os.remove(os.path.join(self.folder, DiskCache.WRITTEN))
+        except OSError:
+            return
+        self.__written = False
+
+        entries: List[Tuple[int, int, str]] = []
+        total = 0
+        for folder, _, files in os.walk(self.folder):
+            if folder == self.folder:
+                # The entries are inside the subfolders
+                continue
+            for file in files:
+                path = os.path.join(folder, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+class FileHashes(DiskCache):
+    """Index of the hashes of the content of files, keyed on their path, size
+    and modification time, so that the content of a file is only read again
+    after the file changes.
+
+    Files modified in the last seconds are not indexed, since a second change
+    within the resolution of the modification time would not change their key.
+    """
+
+    RECENT_NS = 2 * 10**9
+
+    def __init__(self, folder: str, max_size: int) -> None:
+        super().__init__(os.path.join(folder, "hashes"), max_size)
+        self.__hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def hash_file(self, path: str) -> str:
+        stat = os.stat(path)
+        file = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self.__hashes.get(file)
+        if digest is not None:
+            return digest
+
+        key = hashlib.sha256(repr(file).encode()).hexdigest()
+        value = self.get(key)
+        if value is not None:
+            digest = value.decode()
+        else:
+            digest = hash_file(path)
+            if time.time_ns() - stat.st_mtime_ns > FileHashes.RECENT_NS:
+                self.put(key, digest.encode())
+        self.__hashes[file] = digest
+        return digest
+
+
+class FindingsCache(DiskCache):
+    """Cache of the errors found in a file or folder.
+
+    The key of an entry covers the content of the analyzed path, the
+    technology, the type of the unit blocks, the content of the config file,
+    the smell types enabled and the version of GLITCH, so that a hit is always
+    equivalent to running the analysis again.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        max_size: int,
+        tech: Tech,
+        config: str,
+        smell_types: Tuple[str, ...],
+        hashes: Optional[FileHashes] = None,
+    ) -> None:
+        super().__init__(os.path.join(folder, "findings"), max_size)
+        self.__tech = tech
+        self.__hashes = FileHashes(folder, max_size) if hashes is None else hashes
+        with open(config, "rb") as f:
+            config_hash = hashlib.sha256(f.read()).hexdigest()
+        self.__context = (
+            tech.tech,
+            config_hash,
+            tuple(sorted(smell_types)),
+            glitch_version(),
+        )
+
+    def key(self, path: str, type: UnitBlockType, module: bool) -> str:
+        key: Tuple[Any, ...] = (
+            hash_path(path, self.__tech, self.__hashes),
+            path,
+            type.value,
+            module,
+        ) + self.__context
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def get_findings(self, key: str) -> Optional[Tuple[Set[Error], FileStats]]:
+        value = self.get(key)
+        if value is None:
+            return None
+        try:
+            return pickle.loads(value)
+        except Exception:
+            # Corrupted or incompatible entries are handled as misses
+            return None
+
+    def put_findings(self, key: str, errors: Set[Error], stats: FileStats) -> None:
+        self.put(key, pickle.dumps((errors, stats), pickle.HIGHEST_PROTOCOL))
+
+
+class IRCache(DiskCache):
+    """Cache of the unit blocks parsed from files, i.e. of the intermediate
+    representation of each file.
+
+    The key of an entry covers the content of the file, its path, the
+    technology, the type of the unit block and the version of GLITCH (which
+    covers the parsers), so that a hit is always equivalent to parsing the
+    file again. Since the config is not part of the key, the entries are
+    reused when only the config of the analyses changes.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        max_size: int,
+        tech: Tech,
+        hashes: Optional[FileHashes] = None,
+    ) -> None:
+        super().__init__(os.path.join(folder, "ir"), max_size)
+        self.__tech = tech
+        self.__hashes = FileHashes(folder, max_size) if hashes is None else hashes
+        self.__context = (tech.tech, glitch_version())
+
+    def key(self, path: str, type: Optional[UnitBlockType]) -> str:
+        key: Tuple[Any, ...] = (
+            hash_path(path, self.__tech, self.__hashes),
+            path,
+            type,
+        ) + self.__context
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def get_unit_block(self, key: str) -> Optional[UnitBlock]:
+        value = self.get(key)
+        if value is None:
+            return None
+        try:
+            return pickle.loads(value)
+        except Exception:
+            # Corrupted or incompatible entries are handled as misses
+            return None
+
+    def put_unit_block(self, key: str, unit_block: UnitBlock) -> None:
+        try:
+            value = pickle.dumps(unit_block, pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            # The representation of deeply nested code can not be pickled
+            return
+        self.put(key, value)
@@ -1,4 +1,5 @@
-from typing import List, Tuple, Iterable
+from collections import deque
+from typing import Dict, List, Set, Tuple, Iterable
 from glitch.tech import Tech
 from glitch.analysis.rules import Error
 
@@ -59,6 +60,61 @@ def remove_unmatched_brackets(string: str):
     return res
 
 
+class KeywordAutomaton:
+    """Aho-Corasick automaton that finds which keywords of a set occur in a
+    text in a single pass over the text, regardless of the number of keywords."""
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.__goto: List[Dict[str, int]] = [{}]
+        self.__fail: List[int] = [0]
+        self.__output: List[List[str]] = [[]]
+
+        for keyword in keywords:
+            state = 0
+            for c in keyword:
+                if c not in self.__goto[state]:
+                    self.__goto.append({})
+                    self.__fail.append(0)
+                    self.__output.append([])
+                    self.__goto[state][c] = len(self.__goto) - 1
+                state = self.__goto[state][c]
+            if keyword not in self.__output[state]:
+                self.__output[state].append(keyword)
+
+        # The fail transition of a state goes to the state of the longest
+        # proper suffix of its prefix that is also a prefix of a keyword
+        queue = deque(self.__goto[0].values())
+        while len(queue) > 0:
+            state = queue.popleft()
+            for c, next in self.__goto[state].items():
+                queue.append(next)
+                fail = self.__fail[state]
+                while fail != 0 and c not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                self.__fail[next] = self.__goto[fail].get(c, 0)
+                self.__output[next] = (
+                    self.__output[next] + self.__output[self.__fail[next]]
+                )
+
+    def search(self, text: str) -> Set[str]:
+        """Finds the keywords that occur in the text.
+
+        Args:
+            text (str): The text to search.
+
+        Returns:
+            Set[str]: The keywords that occur in the text.
+        """
+        found: Set[str] = set(self.__output[0])
+        state = 0
+        for c in text:
+            while state != 0 and c not in self.__goto[state]:
+                state = self.__fail[state]
+            state = self.__goto[state].get(c, 0)
+            found.update(self.__output[state])
+        return found
+
+
 # Python program for KMP Algorithm (https://www.geeksforgeeks.org/python-program-for-kmp-algorithm-for-pattern-searching-2/)
 # Based on code by Bhavya Jain
 def kmp_search(pat: str, txt: str):
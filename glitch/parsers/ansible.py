@@ -13,6 +13,7 @@ from ruamel.yaml.nodes import (
 from ruamel.yaml.tokens import Token
 from glitch.exceptions import EXCEPTIONS, throw_exception
 from glitch.repr.inter import *
+from glitch.repr.source import get_source
 
 
 class AnsibleParser(YamlParser):
@@ -21,7 +22,7 @@ class AnsibleParser(YamlParser):
         unit_block: UnitBlock,
         cur_name: str,
         node: Node,
-        code: List[str],
+        code: Source,
         child: bool = False,
     ) -> List[Variable]:
         def create_variable(
@@ -35,11 +36,10 @@ class AnsibleParser(YamlParser):
             v = Variable(name, value, has_variable)
             v.line = token.start_mark.line + 1
             v.column = token.start_mark.column + 1
-            if value == None:
-                v.code = AnsibleParser._get_code(token, token, code)
-            else:
-                v.code = AnsibleParser._get_code(token, value, code)
-            v.code = "".join(code[token.start_mark.line : token.end_mark.line + 1])
+            v.set_span(
+                code,
+                *code.lines_span(token.start_mark.line, token.end_mark.line + 1),
+            )
 
             variables.append(v)
             if not child:
@@ -88,7 +88,7 @@ class AnsibleParser(YamlParser):
 
     @staticmethod
     def __parse_attribute(
-        cur_name: str, token: Token | Node, val: Any, code: List[str]
+        cur_name: str, token: Token | Node, val: Any, code: Source
     ) -> List[Attribute]:
         def create_attribute(token: Token | Node, name: str, value: Any) -> Attribute:
             has_variable = (
@@ -100,9 +100,9 @@ class AnsibleParser(YamlParser):
             a.line = token.start_mark.line + 1
             a.column = token.start_mark.column + 1
             if val == None:
-                a.code = AnsibleParser._get_code(token, token, code)
+                AnsibleParser._set_code(a, token, token, code)
             else:
-                a.code = AnsibleParser._get_code(token, val, code)
+                AnsibleParser._set_code(a, token, val, code)
             attributes.append(a)
 
             return a
@@ -134,7 +134,7 @@ class AnsibleParser(YamlParser):
         return attributes
 
     @staticmethod
-    def __parse_tasks(unit_block: UnitBlock, tasks: Node, code: List[str]) -> None:
+    def __parse_tasks(unit_block: UnitBlock, tasks: Node, code: Source) -> None:
         for task in tasks.value:
             atomic_units: List[AtomicUnit] = []
             attributes: List[Attribute] = []
@@ -147,7 +147,10 @@ class AnsibleParser(YamlParser):
                 if key.value == "include":
                     d = Dependency(val.value)
                     d.line = key.start_mark.line + 1
-                    d.code = "".join(code[key.start_mark.line : val.end_mark.line + 1])
+                    d.set_span(
+                        code,
+                        *code.lines_span(key.start_mark.line, val.end_mark.line + 1),
+                    )
                     unit_block.add_dependency(d)
                     break
                 if key.value in ["block", "always", "rescue"]:
@@ -191,9 +194,10 @@ class AnsibleParser(YamlParser):
                     au.line = line
                     au.attributes = attributes.copy()
                     if len(au.attributes) > 0:
-                        au.code = "".join(code[au.line - 1 : au.attributes[-1].line])
+                        end = au.attributes[-1].line
                     else:
-                        au.code = code[au.line - 1]
+                        end = au.line
+                    au.set_span(code, *code.lines_span(au.line - 1, end))
                     unit_block.add_atomic_unit(au)
 
             # Tasks without name
@@ -202,9 +206,10 @@ class AnsibleParser(YamlParser):
                 au.attributes = attributes
                 au.line = line
                 if len(au.attributes) > 0:
-                    au.code = "".join(code[au.line - 1 : au.attributes[-1].line])
+                    end = au.attributes[-1].line
                 else:
-                    au.code = code[au.line - 1]
+                    end = au.line
+                au.set_span(code, *code.lines_span(au.line - 1, end))
                 unit_block.add_atomic_unit(au)
 
     def __parse_playbook(
@@ -215,9 +220,7 @@ class AnsibleParser(YamlParser):
                 parsed_file = YAML().compose(file)
             unit_block = UnitBlock(name, UnitBlockType.script)
             unit_block.path = file.name
-            file.seek(0, 0)
-            code = file.readlines()
-            code.append("")  # HACK allows to parse code in the end of the file
+            code = get_source(file.name)
 
             if parsed_file is None:
                 return unit_block
@@ -241,10 +244,10 @@ class AnsibleParser(YamlParser):
 
                 unit_block.add_unit_block(play)
 
-            for comment in AnsibleParser._get_comments(parsed_file, file):
+            for comment in AnsibleParser._get_comments(parsed_file, code):
                 c = Comment(comment[1])
                 c.line = comment[0]
-                c.code = code[c.line - 1]
+                c.set_span(code, *code.lines_span(c.line - 1, c.line))
                 unit_block.add_comment(c)
 
             return unit_block
@@ -260,18 +263,16 @@ class AnsibleParser(YamlParser):
                 parsed_file = YAML().compose(file)
             unit_block = UnitBlock(name, UnitBlockType.tasks)
             unit_block.path = file.name
-            file.seek(0, 0)
-            code = file.readlines()
-            code.append("")  # HACK allows to parse code in the end of the file
+            code = get_source(file.name)
 
             if parsed_file is None:
                 return unit_block
 
             AnsibleParser.__parse_tasks(unit_block, parsed_file, code)
-            for comment in AnsibleParser._get_comments(parsed_file, file):
+            for comment in AnsibleParser._get_comments(parsed_file, code):
                 c = Comment(comment[1])
                 c.line = comment[0]
-                c.code = code[c.line - 1]
+                c.set_span(code, *code.lines_span(c.line - 1, c.line))
                 unit_block.add_comment(c)
 
             return unit_block
@@ -287,18 +288,16 @@ class AnsibleParser(YamlParser):
                 parsed_file = YAML().compose(file)
             unit_block = UnitBlock(name, UnitBlockType.vars)
             unit_block.path = file.name
-            file.seek(0, 0)
-            code = file.readlines()
-            code.append("")  # HACK allows to parse code in the end of the file
+            code = get_source(file.name)
 
             if parsed_file is None:
                 return unit_block
 
             AnsibleParser.__parse_vars(unit_block, "", parsed_file, code)
-            for comment in AnsibleParser._get_comments(parsed_file, file):
+            for comment in AnsibleParser._get_comments(parsed_file, code):
                 c = Comment(comment[1])
                 c.line = comment[0]
-                c.code = code[c.line - 1]
+                c.set_span(code, *code.lines_span(c.line - 1, c.line))
                 unit_block.add_comment(c)
 
             return unit_block
@@ -306,12 +305,17 @@ class AnsibleParser(YamlParser):
             throw_exception(EXCEPTIONS["ANSIBLE_VARS_FILE"], file.name)
             return None
 
-    @staticmethod
     def __apply_to_files(
+        self,
         module: Module | Project,
         path: str,
+        type: UnitBlockType,
         p_function: Callable[[str, TextIO], Optional[UnitBlock]],
     ) -> None:
+        def parse(f_path: str) -> Optional[UnitBlock]:
+            with open(f_path) as f:
+                return p_function(f_path, f)
+
         if os.path.exists(path) and os.path.isdir(path) and not os.path.islink(path):
             files = [
                 f
@@ -322,19 +326,27 @@ class AnsibleParser(YamlParser):
             ]
             for file in files:
                 f_path = os.path.join(path, file)
-                with open(f_path) as f:
-                    unit_block = p_function(f_path, f)
-                    if unit_block is not None:
-                        module.add_block(unit_block)
+                # The files are parsed as parse_file parses files of the type
+                unit_block = self._parse_cached(f_path, type, lambda: parse(f_path))
+                if unit_block is not None:
+                    module.add_block(unit_block)
 
     def parse_module(self, path: str) -> Module:
         res: Module = Module(os.path.basename(os.path.normpath(path)), path)
         super().parse_file_structure(res.folder, path)
 
-        AnsibleParser.__apply_to_files(res, f"{path}/tasks", self.__parse_tasks_file)
-        AnsibleParser.__apply_to_files(res, f"{path}/handlers", self.__parse_tasks_file)
-        AnsibleParser.__apply_to_files(res, f"{path}/vars", self.__parse_vars_file)
-        AnsibleParser.__apply_to_files(res, f"{path}/defaults", self.__parse_vars_file)
+        self.__apply_to_files(
+            res, f"{path}/tasks", UnitBlockType.tasks, self.__parse_tasks_file
+        )
+        self.__apply_to_files(
+            res, f"{path}/handlers", UnitBlockType.tasks, self.__parse_tasks_file
+        )
+        self.__apply_to_files(
+            res, f"{path}/vars", UnitBlockType.vars, self.__parse_vars_file
+        )
+        self.__apply_to_files(
+            res, f"{path}/defaults", UnitBlockType.vars, self.__parse_vars_file
+        )
 
         # Check subfolders
         subfolders = [
@@ -360,13 +372,21 @@ class AnsibleParser(YamlParser):
         res: Project = Project(os.path.basename(os.path.normpath(path)))
 
         if root:
-            AnsibleParser.__apply_to_files(res, f"{path}", self.__parse_playbook)
-        AnsibleParser.__apply_to_files(res, f"{path}/playbooks", self.__parse_playbook)
-        AnsibleParser.__apply_to_files(
-            res, f"{path}/group_vars", self.__parse_vars_file
+            self.__apply_to_files(
+                res, f"{path}", UnitBlockType.script, self.__parse_playbook
+            )
+        self.__apply_to_files(
+            res, f"{path}/playbooks", UnitBlockType.script, self.__parse_playbook
+        )
+        self.__apply_to_files(
+            res, f"{path}/group_vars", UnitBlockType.vars, self.__parse_vars_file
+        )
+        self.__apply_to_files(
+            res, f"{path}/host_vars", UnitBlockType.vars, self.__parse_vars_file
+        )
+        self.__apply_to_files(
+            res, f"{path}/tasks", UnitBlockType.tasks, self.__parse_tasks_file
         )
-        AnsibleParser.__apply_to_files(res, f"{path}/host_vars", self.__parse_vars_file)
-        AnsibleParser.__apply_to_files(res, f"{path}/tasks", self.__parse_tasks_file)
 
         if os.path.exists(f"{path}/roles") and not os.path.islink(f"{path}/roles"):
             subfolders = [
@@ -395,11 +415,10 @@ class AnsibleParser(YamlParser):
 
         return res
 
-    def parse_file(self, path: str, type: UnitBlockType) -> Optional[UnitBlock]:
+    def _parse_file(self, path: str, type: UnitBlockType) -> Optional[UnitBlock]:
         with open(path) as f:
             try:
-                parsed_file = YAML().compose(f)
-                f.seek(0, 0)
+                parsed_file = YAML().compose(get_source(path).text)
             except:
                 throw_exception(EXCEPTIONS["ANSIBLE_COULD_NOT_PARSE"], path)
                 return None
@@ -1,16 +1,16 @@
 import os
 import sys
 import re
-import tempfile
 import glitch.parsers.parser as p
 
-from string import Template
-from pkg_resources import resource_filename
 from typing import Any, List, Tuple, Callable
 from glitch.repr.inter import *
+from glitch.repr.source import get_source
 from glitch.parsers.ripper_parser import parser_yacc
+from glitch.parsers.ripper_worker import get_ripper_pool
 from glitch.helpers import remove_unmatched_brackets
 from glitch.exceptions import EXCEPTIONS, throw_exception
+from glitch.profiler import profile
 
 ChefValue = Tuple[str, str] | str | int | bool | List["ChefValue"]
 
@@ -55,7 +55,7 @@ class ChefParser(p.Parser):
             return ChefParser._check_id(ast, references)
 
     @staticmethod
-    def _get_content_bounds(ast: Any, source: List[str]) -> Tuple[int, int, int, int]:
+    def _get_content_bounds(ast: Any, source: Source) -> Tuple[int, int, int, int]:
         def is_bounds(l: Any) -> bool:
             return (
                 isinstance(l, list)
@@ -148,7 +148,7 @@ class ChefParser(p.Parser):
         return (start_line, start_column, end_line, end_column)
 
     @staticmethod
-    def _get_content(ast: Any, source: List[str]) -> str:
+    def _get_content(ast: Any, source: Source) -> str:
         empty_structures = {"string_literal": "", "hash": "{}", "array": "[]"}
 
         if isinstance(ast, list):
@@ -185,12 +185,12 @@ class ChefParser(p.Parser):
         return remove_unmatched_brackets(res)
 
     @staticmethod
-    def _get_source(ast: Any, source: List[str]) -> str:
+    def _set_source(element: CodeElement, ast: Any, source: Source) -> None:
         bounds = ChefParser._get_content_bounds(ast, source)
-        return "".join(source[bounds[0] - 1 : bounds[2]])
+        element.set_span(source, *source.lines_span(bounds[0] - 1, bounds[2]))
 
     class Checker:
-        def __init__(self, source: List[str]) -> None:
+        def __init__(self, source: Source) -> None:
             self.tests_ast_stack: List[Tuple[List[Callable[[Any], bool]], Any]] = []
             self.source = source
 
@@ -215,9 +215,7 @@ class ChefParser(p.Parser):
             return self.tests_ast_stack.pop()
 
     class ResourceChecker(Checker):
-        def __init__(
-            self, atomic_unit: AtomicUnit, source: List[str], ast: Any
-        ) -> None:
+        def __init__(self, atomic_unit: AtomicUnit, source: Source, ast: Any) -> None:
             super().__init__(source)
             self.push([self.is_block_resource, self.is_inline_resource], ast)
             self.atomic_unit = atomic_unit
@@ -349,7 +347,7 @@ class ChefParser(p.Parser):
                 )
                 a.line = ChefParser._get_content_bounds(ast, self.source)[0]
                 a.column = ChefParser._get_content_bounds(ast, self.source)[1]
-                a.code = ChefParser._get_source(ast, self.source)
+                ChefParser._set_source(a, ast, self.source)
                 self.atomic_unit.add_attribute(a)
             elif isinstance(ast, (ChefParser.Node, list)):
                 for arg in reversed(ast):  # type: ignore
@@ -358,7 +356,7 @@ class ChefParser(p.Parser):
             return True
 
     class VariableChecker(Checker):
-        def __init__(self, source: List[str], ast: Any) -> None:
+        def __init__(self, source: Source, ast: Any) -> None:
             super().__init__(source)
             self.variables: List[Variable] = []
             self.push([self.is_variable], ast)
@@ -370,7 +368,7 @@ class ChefParser(p.Parser):
                 variable = Variable(name, value, has_variable)
                 variable.line = ChefParser._get_content_bounds(key, self.source)[0]
                 variable.column = ChefParser._get_content_bounds(key, self.source)[1]
-                variable.code = ChefParser._get_source(ast, self.source)
+                ChefParser._set_source(variable, ast, self.source)
                 return variable
 
             def parse_variable(
@@ -441,10 +439,10 @@ class ChefParser(p.Parser):
             return False
 
     class IncludeChecker(Checker):
-        def __init__(self, source: List[str], ast: Any) -> None:
+        def __init__(self, source: Source, ast: Any) -> None:
             super().__init__(source)
             self.push([self.is_include], ast)
-            self.code = ""
+            self.dependency_ast: Any = None
 
         def is_include(self, ast: Any) -> bool:
             if (
@@ -454,7 +452,7 @@ class ChefParser(p.Parser):
             ):
                 self.push([self.is_include_name], ast.args[1])
                 self.push([self.is_include_type], ast.args[0])
-                self.code = ChefParser._get_source(ast, self.source)
+                self.dependency_ast = ast
                 return True
             return False
 
@@ -474,14 +472,14 @@ class ChefParser(p.Parser):
             ):
                 d = Dependency(ChefParser._get_content(ast.args[0][0], self.source))
                 d.line = ChefParser._get_content_bounds(ast, self.source)[0]
-                d.code = self.code
+                ChefParser._set_source(d, self.dependency_ast, self.source)
                 self.include = d
                 return True
             return False
 
     # FIXME only identifying case statement
     class ConditionChecker(Checker):
-        def __init__(self, source: List[str], ast: Any) -> None:
+        def __init__(self, source: Source, ast: Any) -> None:
             super().__init__(source)
             self.push([self.is_case], ast)
 
@@ -509,7 +507,7 @@ class ChefParser(p.Parser):
                         + ChefParser._get_content(ast.args[0][0], self.source),
                         ConditionalStatement.ConditionType.SWITCH,
                     )
-                    self.condition.code = ChefParser._get_source(ast, self.source)
+                    ChefParser._set_source(self.condition, ast, self.source)
                     self.condition.line = ChefParser._get_content_bounds(
                         ast, self.source
                     )[0]
@@ -522,9 +520,7 @@ class ChefParser(p.Parser):
                         ConditionalStatement.ConditionType.SWITCH,
                     )
                     self.current_condition = self.current_condition.else_statement
-                    self.current_condition.code = ChefParser._get_source(
-                        ast, self.source
-                    )
+                    ChefParser._set_source(self.current_condition, ast, self.source)
                     self.current_condition.line = ChefParser._get_content_bounds(
                         ast, self.source
                     )[0]
@@ -535,8 +531,8 @@ class ChefParser(p.Parser):
                 self.current_condition.else_statement = ConditionalStatement(
                     "", ConditionalStatement.ConditionType.SWITCH, is_default=True
                 )
-                self.current_condition.else_statement.code = ChefParser._get_source(
-                    ast, self.source
+                ChefParser._set_source(
+                    self.current_condition.else_statement, ast, self.source
                 )
                 self.current_condition.else_statement.line = (
                     ChefParser._get_content_bounds(ast, self.source)[0]
@@ -569,7 +565,7 @@ class ChefParser(p.Parser):
         return ChefParser.Node(l[0][1], args)  # type: ignore
 
     @staticmethod
-    def __transverse_ast(ast: Any, unit_block: UnitBlock, source: List[str]) -> None:
+    def __transverse_ast(ast: Any, unit_block: UnitBlock, source: Source) -> None:
         def get_var(parent_name: str, vars: List[Variable]):
             for var in vars:
                 if var.name == parent_name:
@@ -629,16 +625,6 @@ class ChefParser(p.Parser):
     @staticmethod
     def __parse_recipe(path: str, file: str) -> UnitBlock:
         with open(os.path.join(path, file)) as f:
-            ripper = resource_filename(
-                "glitch.parsers", "resources/comments.rb.template"
-            )
-            ripper = open(ripper, "r")
-            ripper_script = Template(ripper.read())
-            ripper.close()
-            ripper_script = ripper_script.substitute(
-                {"path": '"' + os.path.join(path, file) + '"'}
-            )
-
             if "/attributes/" in path:
                 unit_block: UnitBlock = UnitBlock(file, UnitBlockType.vars)
             else:
@@ -646,45 +632,43 @@ class ChefParser(p.Parser):
             unit_block.path = os.path.join(path, file)
 
             try:
-                source = f.readlines()
+                source = get_source(os.path.join(path, file))
             except:
                 throw_exception(
                     EXCEPTIONS["CHEF_COULD_NOT_PARSE"], os.path.join(path, file)
                 )
                 return unit_block
 
-            with tempfile.NamedTemporaryFile(mode="w+") as tmp:
-                tmp.write(ripper_script)
-                tmp.flush()
-
-                try:
-                    p = os.popen("ruby " + tmp.name)
-                    script_ast = p.read()
-                    p.close()
-                    comments, _ = parser_yacc(script_ast)
-                    if comments is not None:
-                        comments.reverse()
-
-                    for comment, line in comments:
-                        c = Comment(re.sub(r"\\n$", "", comment))
-                        c.code = source[line - 1]
-                        c.line = line
-                        unit_block.add_comment(c)
-                except:
-                    throw_exception(
-                        EXCEPTIONS["CHEF_COULD_NOT_PARSE"], os.path.join(path, file)
+            try:
+                with profile("parse", "ruby (ripper)"):
+                    comments_ast, script_ast = get_ripper_pool().ripper(
+                        os.path.join(path, file)
                     )
+            except:
+                throw_exception(
+                    EXCEPTIONS["CHEF_COULD_NOT_PARSE"], os.path.join(path, file)
+                )
+                return unit_block
 
             try:
-                p = os.popen(
-                    "ruby -r ripper -e 'file = \
-                    File.open(\""
-                    + os.path.join(path, file)
-                    + "\")\npp Ripper.sexp(file)'"
+                with profile("parse", "ripper_parser"):
+                    comments, _ = parser_yacc(comments_ast)
+                if comments is not None:
+                    comments.reverse()
+
+                for comment, line in comments:
+                    c = Comment(re.sub(r"\\n$", "", comment))
+                    c.set_span(source, *source.lines_span(line - 1, line))
+                    c.line = line
+                    unit_block.add_comment(c)
+            except:
+                throw_exception(
+                    EXCEPTIONS["CHEF_COULD_NOT_PARSE"], os.path.join(path, file)
                 )
-                script_ast = p.read()
-                p.close()
-                _, program = parser_yacc(script_ast)
+
+            try:
+                with profile("parse", "ripper_parser"):
+                    _, program = parser_yacc(script_ast)
                 ast = ChefParser.__create_ast(program)
                 ChefParser.__transverse_ast(ast, unit_block, source)
             except:
@@ -701,7 +685,15 @@ class ChefParser(p.Parser):
                     f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))
                 ]
                 for file in files:
-                    res.add_block(self.__parse_recipe(path, file))
+                    # The type of the files of a module depends on their
+                    # folder, so they are not cached as files parsed alone
+                    unit_block = self._parse_cached(
+                        os.path.join(path, file),
+                        None,
+                        lambda: self.__parse_recipe(path, file),
+                    )
+                    if unit_block is not None:
+                        res.add_block(unit_block)
 
         res: Module = Module(os.path.basename(os.path.normpath(path)), path)
         super().parse_file_structure(res.folder, path)
@@ -715,7 +707,7 @@ class ChefParser(p.Parser):
 
         return res
 
-    def parse_file(self, path: str, type: UnitBlockType) -> UnitBlock:
+    def _parse_file(self, path: str, type: UnitBlockType) -> UnitBlock:
         return self.__parse_recipe(os.path.dirname(path), os.path.basename(path))
 
     def parse_folder(self, path: str) -> Project:
@@ -1,4 +1,5 @@
 import ast
+import io
 import os.path
 import re
 from dataclasses import dataclass, field
@@ -23,12 +24,14 @@ class DFPStructure:
 
 
 class DockerParser(p.Parser):
-    def parse_file(self, path: str, type: UnitBlockType) -> UnitBlock:
+    def _parse_file(self, path: str, type: UnitBlockType) -> UnitBlock:
         try:
             with open(path) as f:
                 file_lines = list(f)
                 f.seek(0)
-                dfp = DockerfileParser()
+                # By default, the content is written to a Dockerfile in the
+                # current folder, which is shared by all the threads
+                dfp = DockerfileParser(fileobj=io.BytesIO())
                 dfp.content = f.read()
                 structure = [
                     DFPStructure(
@@ -97,7 +100,11 @@ class DockerParser(p.Parser):
             if os.path.isdir(f) and DockerParser._contains_dockerfiles(f)
         ]
 
-        blocks = [self.parse_file(f, UnitBlockType.script) for f in dockerfiles]
+        blocks: List[UnitBlock] = []
+        for f in dockerfiles:
+            unit_block = self.parse_file(f, UnitBlockType.script)
+            if unit_block is not None:
+                blocks.append(unit_block)
         modules = [self.parse_module(f) for f in modules]
         return blocks, modules
 
@@ -146,7 +153,7 @@ class DockerParser(p.Parser):
             except Exception:
                 throw_exception(EXCEPTIONS["SHELL_COULD_NOT_PARSE"], element.content)
         elif instruction == "ONBUILD":
-            dfp = DockerfileParser()
+            dfp = DockerfileParser(fileobj=io.BytesIO())
             dfp.content = element.value
             element = DFPStructure(
                 **dfp.structure[0], raw_content=dfp.structure[0]["content"]
@@ -4,6 +4,7 @@ import jsonschema
 from glitch.parsers.yaml import YamlParser
 from typing import Optional
 from glitch.repr.inter import *
+from glitch.repr.source import get_source
 from ruamel.yaml.main import YAML
 from ruamel.yaml.nodes import (
     Node,
@@ -36,7 +37,7 @@ class GithubActionsParser(YamlParser):
             return None
 
     @staticmethod
-    def __parse_variable(key: Node, value: Node, lines: List[str]) -> Variable:
+    def __parse_variable(key: Node, value: Node, lines: Source) -> Variable:
         vars: List[KeyValue] = []
 
         if isinstance(value, MappingNode):
@@ -50,14 +51,14 @@ class GithubActionsParser(YamlParser):
         if isinstance(var.value, str):
             var.has_variable = "${{" in var.value
         var.line, var.column = key.start_mark.line + 1, key.start_mark.column + 1
-        var.code = GithubActionsParser._get_code(key, value, lines)
+        GithubActionsParser._set_code(var, key, value, lines)
         for child in vars:
             var.keyvalues.append(child)
 
         return var
 
     @staticmethod
-    def __parse_attribute(key: Node, value: Node, lines: List[str]) -> Attribute:
+    def __parse_attribute(key: Node, value: Node, lines: Source) -> Attribute:
         attrs: List[KeyValue] = []
 
         if isinstance(value, MappingNode):
@@ -71,16 +72,16 @@ class GithubActionsParser(YamlParser):
         if isinstance(attr.value, str):
             attr.has_variable = "${{" in attr.value
         attr.line, attr.column = key.start_mark.line + 1, key.start_mark.column + 1
-        attr.code = GithubActionsParser._get_code(key, value, lines)
+        GithubActionsParser._set_code(attr, key, value, lines)
         for child in attrs:
             attr.keyvalues.append(child)
 
         return attr
 
-    def __parse_job(self, key: Node, value: Node, lines: List[str]) -> UnitBlock:
+    def __parse_job(self, key: Node, value: Node, lines: Source) -> UnitBlock:
         job = UnitBlock(key.value, UnitBlockType.block)
         job.line, job.column = key.start_mark.line + 1, key.start_mark.column + 1
-        job.code = GithubActionsParser._get_code(key, value, lines)
+        GithubActionsParser._set_code(job, key, value, lines)
 
         for attr_key, attr_value in value.value:
             if attr_key.value == "steps":
@@ -97,7 +98,7 @@ class GithubActionsParser(YamlParser):
                         step.start_mark.line + 1,
                         step.start_mark.column + 1,
                     )
-                    au.code = GithubActionsParser._get_code(step, step, lines)
+                    GithubActionsParser._set_code(au, step, step, lines)
 
                     for key, value in step.value:
                         if key.value in ["with", "env"]:
@@ -118,31 +119,28 @@ class GithubActionsParser(YamlParser):
 
         return job
 
-    def parse_file(self, path: str, type: UnitBlockType) -> Optional[UnitBlock]:
+    def _parse_file(self, path: str, type: UnitBlockType) -> Optional[UnitBlock]:
         schema = resource_filename("glitch.parsers", "resources/github_workflow.json")
 
-        with open(path) as f:
-            try:
-                parsed_file = YAML().compose(f)
-                f.seek(0, 0)
-                lines = f.readlines()
-            except:
-                throw_exception(EXCEPTIONS["GHA_COULD_NOT_PARSE"], path)
-                return None
+        try:
+            lines = get_source(path)
+            parsed_file = YAML().compose(lines.text)
+        except:
+            throw_exception(EXCEPTIONS["GHA_COULD_NOT_PARSE"], path)
+            return None
 
         if parsed_file is None or not isinstance(parsed_file, MappingNode):
             throw_exception(EXCEPTIONS["GHA_COULD_NOT_PARSE"], path)
             return None
 
-        with open(path) as f:
-            with open(schema) as f_schema:
-                schema = json.load(f_schema)
-                yaml = YAML()
-                try:
-                    jsonschema.validate(yaml.load(f.read()), schema)  # type: ignore
-                except jsonschema.ValidationError:
-                    throw_exception(EXCEPTIONS["GHA_COULD_NOT_PARSE"], path)
-                    return None
+        with open(schema) as f_schema:
+            schema = json.load(f_schema)
+            yaml = YAML()
+            try:
+                jsonschema.validate(yaml.load(lines.text), schema)  # type: ignore
+            except jsonschema.ValidationError:
+                throw_exception(EXCEPTIONS["GHA_COULD_NOT_PARSE"], path)
+                return None
 
         parsed_file_value = self.__get_value(parsed_file)
         if "name" not in parsed_file_value:
@@ -164,13 +162,12 @@ class GithubActionsParser(YamlParser):
             elif key.value != "name":
                 unit_block.add_attribute(self.__parse_attribute(key, value, lines))
 
-        with open(path) as f:
-            comments = list(GithubActionsParser._get_comments(parsed_file, f))
-            for comment in sorted(comments, key=lambda x: x[0]):
-                c = Comment(comment[1])
-                c.line = comment[0]
-                c.code = lines[c.line - 1]
-                unit_block.add_comment(c)
+        comments = list(GithubActionsParser._get_comments(parsed_file, lines))
+        for comment in sorted(comments, key=lambda x: x[0]):
+            c = Comment(comment[1])
+            c.line = comment[0]
+            c.set_span(lines, *lines.lines_span(c.line - 1, c.line))
+            unit_block.add_comment(c)
 
         return unit_block
 
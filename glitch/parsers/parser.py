@@ -1,12 +1,19 @@
 import os
 from glitch.repr.inter import *
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Callable, Optional, TYPE_CHECKING
 
 from glitch.repr.inter import UnitBlockType
 
+if TYPE_CHECKING:
+    from glitch.cache import IRCache
+
 
 class Parser(ABC):
+    # The cache of the unit blocks parsed from files. If None, the files are
+    # always parsed.
+    cache: Optional["IRCache"] = None
+
     def parse(
         self, path: str, type: UnitBlockType, is_module: bool
     ) -> Optional[Module | Project | UnitBlock]:
@@ -17,8 +24,42 @@ class Parser(ABC):
         else:
             return self.parse_folder(path)
 
-    @abstractmethod
     def parse_file(self, path: str, type: UnitBlockType) -> Optional[UnitBlock]:
+        """Parses a file. If the parser has a cache, the unit block of a file
+        is loaded from the cache when the file was already parsed.
+
+        Args:
+            path (str): The path of the file.
+            type (UnitBlockType): The type of the unit block.
+
+        Returns:
+            Optional[UnitBlock]: The unit block, if the file could be parsed.
+        """
+        return self._parse_cached(path, type, lambda: self._parse_file(path, type))
+
+    def _parse_cached(
+        self,
+        path: str,
+        type: Optional[UnitBlockType],
+        parse: Callable[[], Optional[UnitBlock]],
+    ) -> Optional[UnitBlock]:
+        """Returns the unit block of a file from the cache of the parser, or
+        parses it with the function given and stores it in the cache. The
+        parsers use this method for every file they parse (e.g. the files of
+        a module), so that the cache is also used when parsing folders."""
+        if self.cache is None:
+            return parse()
+
+        key = self.cache.key(path, type)
+        unit_block = self.cache.get_unit_block(key)
+        if unit_block is None:
+            unit_block = parse()
+            if unit_block is not None:
+                self.cache.put_unit_block(key, unit_block)
+        return unit_block
+
+    @abstractmethod
+    def _parse_file(self, path: str, type: UnitBlockType) -> Optional[UnitBlock]:
         pass
 
     @abstractmethod
@@ -1,6 +1,7 @@
 # type: ignore
 # TODO: The file needs a refactor so the types make sense
 import os
+import threading
 import traceback
 from puppetparser.parser import parse as parse_puppet
 import puppetparser.model as puppetmodel
@@ -8,8 +9,14 @@ from glitch.exceptions import EXCEPTIONS, throw_exception
 
 import glitch.parsers.parser as p
 from glitch.repr.inter import *
+from glitch.repr.source import get_source
 from typing import List, Any, Tuple, Dict
 
+# puppetparser builds a lexer for each script, but its parser reads the tokens
+# of the last lexer built by ply (a global), so the scripts are parsed one at a
+# time when the parser is shared by several threads
+_puppetparser_lock = threading.Lock()
+
 
 class PuppetParser(p.Parser):
     @staticmethod
@@ -51,21 +58,18 @@ class PuppetParser(p.Parser):
 
     @staticmethod
     def __process_codeelement(
-        codeelement: puppetmodel.CodeElement, path: str, code: List[str]
+        codeelement: puppetmodel.CodeElement, path: str, code: Source
     ):
-        def get_code(ce: puppetmodel.CodeElement):
+        def set_code(element: CodeElement, ce: puppetmodel.CodeElement):
             if ce.line == ce.end_line:
-                res = code[ce.line - 1][max(0, ce.col - 1) : ce.end_col - 1]
+                start_column = max(0, ce.col - 1)
             else:
-                res = code[ce.line - 1]
-
-            for line in range(ce.line, ce.end_line - 1):
-                res += code[line]
-
-            if ce.line != ce.end_line:
-                res += code[ce.end_line - 1][: ce.end_col - 1]
+                start_column = 0
 
-            return res
+            element.set_span(
+                code,
+                *code.span(ce.line - 1, start_column, ce.end_line - 1, ce.end_col - 1),
+            )
 
         def process_hash_value(
             name: str, temp_value: Any
@@ -112,7 +116,7 @@ class PuppetParser(p.Parser):
             has_variable = not isinstance(value, str) or value.startswith("$")
             attribute = Attribute(name, value, has_variable)
             attribute.line, attribute.column = codeelement.line, codeelement.col
-            attribute.code = get_code(codeelement)
+            set_code(attribute, codeelement)
             return attribute
         elif isinstance(codeelement, puppetmodel.Resource):
             resource: AtomicUnit = AtomicUnit(
@@ -124,7 +128,7 @@ class PuppetParser(p.Parser):
                     PuppetParser.__process_codeelement(attr, path, code)
                 )
             resource.line, resource.column = codeelement.line, codeelement.col
-            resource.code = get_code(codeelement)
+            set_code(resource, codeelement)
             return resource
         elif isinstance(codeelement, puppetmodel.ClassAsResource):
             resource: AtomicUnit = AtomicUnit(
@@ -136,7 +140,7 @@ class PuppetParser(p.Parser):
                     PuppetParser.__process_codeelement(attr, path, code)
                 )
             resource.line, resource.column = codeelement.line, codeelement.col
-            resource.code = get_code(codeelement)
+            set_code(resource, codeelement)
             return resource
         elif isinstance(codeelement, puppetmodel.ResourceDeclaration):
             unit_block: UnitBlock = UnitBlock(
@@ -160,7 +164,7 @@ class PuppetParser(p.Parser):
                 )
 
             unit_block.line, unit_block.column = codeelement.line, codeelement.col
-            unit_block.code = get_code(codeelement)
+            set_code(unit_block, codeelement)
 
             return unit_block
         elif isinstance(codeelement, puppetmodel.Parameter):
@@ -180,7 +184,7 @@ class PuppetParser(p.Parser):
             )
             attribute = Attribute(name, value, has_variable)
             attribute.line, attribute.column = codeelement.line, codeelement.col
-            attribute.code = get_code(codeelement)
+            set_code(attribute, codeelement)
             return attribute
         elif isinstance(codeelement, puppetmodel.Assignment):
             name = PuppetParser.__process_codeelement(codeelement.name, path, code)
@@ -197,12 +201,12 @@ class PuppetParser(p.Parser):
                 has_variable = not isinstance(value, str) or value.startswith("$")
                 variable: Variable = Variable(name, value, has_variable)
                 variable.line, variable.column = codeelement.line, codeelement.col
-                variable.code = get_code(codeelement)
+                set_code(variable, codeelement)
                 return variable
             else:
                 variable: Variable = Variable(name, None, False)
                 variable.line, variable.column = codeelement.line, codeelement.col
-                variable.code = get_code(codeelement)
+                set_code(variable, codeelement)
                 for key, value in temp_value.items():
                     variable.keyvalues.append(
                         PuppetParser.__process_codeelement(
@@ -243,7 +247,7 @@ class PuppetParser(p.Parser):
                 )
 
             unit_block.line, unit_block.column = codeelement.line, codeelement.col
-            unit_block.code = get_code(codeelement)
+            set_code(unit_block, codeelement)
             return unit_block
         elif isinstance(codeelement, puppetmodel.Node):
             # FIXME Nodes are not yet supported
@@ -383,7 +387,7 @@ class PuppetParser(p.Parser):
             for inc in codeelement.inc:
                 d = Dependency(PuppetParser.__process_codeelement(inc, path, code))
                 d.line, d.column = codeelement.line, codeelement.col
-                d.code = get_code(codeelement)
+                set_code(d, codeelement)
                 dependencies.append(d)
             return dependencies
         elif isinstance(codeelement, puppetmodel.Require):
@@ -391,7 +395,7 @@ class PuppetParser(p.Parser):
             for req in codeelement.req:
                 d = Dependency(PuppetParser.__process_codeelement(req, path, code))
                 d.line, d.column = codeelement.line, codeelement.col
-                d.code = get_code(codeelement)
+                set_code(d, codeelement)
                 dependencies.append(d)
             return dependencies
         elif isinstance(codeelement, puppetmodel.Contain):
@@ -399,7 +403,7 @@ class PuppetParser(p.Parser):
             for cont in codeelement.cont:
                 d = Dependency(PuppetParser.__process_codeelement(cont, path, code))
                 d.line, d.column = codeelement.line, codeelement.col
-                d.code = get_code(codeelement)
+                set_code(d, codeelement)
                 dependencies.append(d)
             return dependencies
         elif isinstance(
@@ -436,14 +440,14 @@ class PuppetParser(p.Parser):
                             False,
                         )
                         condition.line, condition.column = match.line, match.col
-                        condition.code = get_code(match)
+                        set_code(condition, match)
                         conditions.append(condition)
                     else:
                         condition = ConditionalStatement(
                             "", ConditionalStatement.ConditionType.SWITCH, True
                         )
                         condition.line, condition.column = match.line, match.col
-                        condition.code = get_code(match)
+                        set_code(condition, match)
                         conditions.append(condition)
 
             for i in range(1, len(conditions)):
@@ -472,12 +476,12 @@ class PuppetParser(p.Parser):
                         False,
                     )
                     condition.line, condition.column = key_element.line, key_element.col
-                    # HACK: the get_code function should be changed to receive a range
+                    # HACK: the set_code function should be changed to receive a range
                     key_element.end_line, key_element.end_col = (
                         value_element.end_line,
                         value_element.end_col,
                     )
-                    condition.code = get_code(key_element)
+                    set_code(condition, key_element)
                     conditions.append(condition)
                 else:
                     condition = ConditionalStatement(
@@ -488,7 +492,7 @@ class PuppetParser(p.Parser):
                         value_element.end_line,
                         value_element.end_col,
                     )
-                    condition.code = get_code(key_element)
+                    set_code(condition, key_element)
                     conditions.append(condition)
 
             for i in range(1, len(conditions)):
@@ -561,31 +565,31 @@ class PuppetParser(p.Parser):
             for name in files:
                 name_split = name.split(".")
                 if len(name_split) == 2 and name_split[-1] == "pp":
-                    res.add_block(self.parse_file(os.path.join(root, name), ""))
+                    unit_block = self.parse_file(os.path.join(root, name), "")
+                    if unit_block is not None:
+                        res.add_block(unit_block)
 
         return res
 
-    def parse_file(self, path: str, type: UnitBlockType) -> UnitBlock:
+    def _parse_file(self, path: str, type: UnitBlockType) -> UnitBlock:
         unit_block: UnitBlock = UnitBlock(os.path.basename(path), UnitBlockType.script)
         unit_block.path = path
 
         try:
-            with open(path) as f:
-                parsed_script, comments = parse_puppet(f.read())
-
-                f.seek(0, 0)
-                code = f.readlines()
-
-                for c in comments:
-                    comment = Comment(c.content)
-                    comment.line = c.line
-                    comment.code = "".join(code[c.line - 1 : c.end_line])
-                    unit_block.add_comment(comment)
-
-                PuppetParser.__process_unitblock_component(
-                    PuppetParser.__process_codeelement(parsed_script, path, code),
-                    unit_block,
-                )
+            code = get_source(path)
+            with _puppetparser_lock:
+                parsed_script, comments = parse_puppet(code.text)
+
+            for c in comments:
+                comment = Comment(c.content)
+                comment.line = c.line
+                comment.set_span(code, *code.lines_span(c.line - 1, c.end_line))
+                unit_block.add_comment(comment)
+
+            PuppetParser.__process_unitblock_component(
+                PuppetParser.__process_codeelement(parsed_script, path, code),
+                unit_block,
+            )
         except Exception:
             traceback.print_exc()
             throw_exception(EXCEPTIONS["PUPPET_COULD_NOT_PARSE"], path)
@@ -606,7 +610,9 @@ class PuppetParser(p.Parser):
         for f in os.scandir(path):
             name_split = f.name.split(".")
             if f.is_file() and len(name_split) == 2 and name_split[-1] == "pp":
-                res.add_block(self.parse_file(f.path, ""))
+                unit_block = self.parse_file(f.path, "")
+                if unit_block is not None:
+                    res.add_block(unit_block)
 
         subfolders = [
             f.path for f in os.scandir(f"{path}") if f.is_dir() and not f.is_symlink()
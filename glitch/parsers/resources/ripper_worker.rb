@@ -0,0 +1,42 @@
+require 'ripper'
+require 'json'
+require 'stringio'
+
+# Long-running worker used by the Chef parser. It reads the path of a file
+# (as a JSON string) per line from stdin and writes a JSON object per line to
+# stdout with the comments and the sexp of the file. The sexps are printed
+# with inspect, which is faster than pp and is read in the same way by
+# parser_yacc.
+
+class CommentRipper < Ripper::SexpBuilder
+    def initialize(src, out)
+        super(src)
+        @out = out
+    end
+
+    def on_comment(token)
+        super.tap { |result| @out.puts(result.inspect) }
+    end
+end
+
+$stdout.sync = true
+
+while (line = $stdin.gets)
+    begin
+        path = JSON.parse(line)
+        contents = File.read(path)
+
+        comments = StringIO.new
+        CommentRipper.new(contents, comments).parse
+        # Only the comments are read from this output, so the sexp built by
+        # CommentRipper is replaced by an empty one
+        comments.puts("[]")
+        sexp = StringIO.new
+        sexp.puts(Ripper.sexp(contents).inspect)
+
+        response = JSON.generate({ "comments" => comments.string, "sexp" => sexp.string })
+    rescue StandardError, ScriptError => e
+        response = JSON.generate({ "error" => e.message.scrub })
+    end
+    $stdout.write(response + "\n")
+end
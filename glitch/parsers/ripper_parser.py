@@ -1,9 +1,14 @@
 # pyright: reportUnusedFunction=false, reportUnusedVariable=false
-from ply.lex import lex, LexToken
-from ply.yacc import yacc, YaccProduction
+import os
+import threading
 
+from copy import copy
+from typing import Any, Optional, Tuple
+from ply.lex import lex, Lexer, LexToken
+from ply.yacc import yacc, LRParser, YaccProduction
 
-def parser_yacc(script_ast: str):
+
+def _build() -> Tuple[Lexer, LRParser]:
     tokens = (
         "LPAREN",
         "RPAREN",
@@ -60,8 +65,6 @@ def parser_yacc(script_ast: str):
         t.lexer.skip(1)
 
     lexer = lex()
-    # Give the lexer some input
-    lexer.input(script_ast)
 
     def p_program(p: YaccProduction) -> None:
         r"program : comments list"
@@ -129,6 +132,36 @@ def parser_yacc(script_ast: str):
     def p_error(p: YaccProduction) -> None:
         print(f"Syntax error at {p.value!r}")
 
-    # Build the parser
-    parser = yacc()
-    return parser.parse(script_ast)
+    # Build the parser. The tables are written to the folder of the module
+    # (if possible), so that other processes do not have to compute them.
+    outputdir = os.path.dirname(os.path.abspath(__file__))
+    parser = yacc(
+        debug=False, outputdir=outputdir, write_tables=os.access(outputdir, os.W_OK)
+    )
+    return lexer, parser
+
+
+# The lexer and the parser are built once per process. Since they keep the
+# state of the input being parsed, each thread uses its own copy of them.
+_parser: Optional[Tuple[Lexer, LRParser]] = None
+_parser_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_parser() -> Tuple[Lexer, LRParser]:
+    global _parser
+    if not hasattr(_local, "parser"):
+        with _parser_lock:
+            if _parser is None:
+                _parser = _build()
+        _local.parser = (_parser[0].clone(), copy(_parser[1]))
+    return _local.parser
+
+
+def parser_yacc(script_ast: str) -> Any:
+    lexer, parser = _get_parser()
+    # The lexer of the thread may have been left in the middle of a previous
+    # input (e.g. after a syntax error), so its state is reset
+    lexer.begin("INITIAL")
+    lexer.lineno = 1
+    return parser.parse(script_ast, lexer=lexer)
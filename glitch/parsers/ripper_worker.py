@@ -0,0 +1,150 @@
+import os
+import json
+import queue
+import atexit
+import threading
+import subprocess
+
+from pkg_resources import resource_filename
+from typing import IO, List, Optional, Tuple
+
+
+class RipperError(Exception):
+    pass
+
+
+class RipperWorker:
+    """A long-running Ruby process which returns the comments and the sexp
+    of Ruby files, as returned by Ripper.
+
+    Reusing the same process avoids starting a Ruby interpreter (twice) for
+    every file parsed."""
+
+    def __init__(self) -> None:
+        self.process = subprocess.Popen(
+            ["ruby", resource_filename("glitch.parsers", "resources/ripper_worker.rb")],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+        )
+
+    def ripper(self, path: str) -> Tuple[str, str]:
+        """Returns the output of Ripper for the file.
+
+        Returns:
+            Tuple[str, str]: The comments and the sexp of the file.
+        """
+        stdin: IO[str] = self.process.stdin  # type: ignore
+        stdout: IO[str] = self.process.stdout  # type: ignore
+        try:
+            stdin.write(json.dumps(path) + "\n")
+            stdin.flush()
+            response = json.loads(stdout.readline())
+        except (OSError, ValueError) as e:
+            # The worker is not reused, since its state is unknown
+            self.process.kill()
+            self.process.wait()
+            raise RipperError(f"Ruby worker failed while parsing {path}: {e!r}")
+
+        if "error" in response:
+            raise RipperError(response["error"])
+        return response["comments"], response["sexp"]
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self) -> None:
+        if self.process.stdin is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class RipperPool:
+    """A pool of Ruby workers shared by the threads of a process.
+
+    The workers are started when they are first needed, up to the size of the
+    pool. A worker that crashes (e.g. while parsing a file) is discarded and a
+    new one is started for the following files."""
+
+    def __init__(self, size: int) -> None:
+        self.size = max(1, size)
+        self.pid = os.getpid()
+        self.idle: queue.Queue[RipperWorker] = queue.Queue()
+        self.workers: List[RipperWorker] = []
+        self.lock = threading.Lock()
+
+    def __acquire(self) -> RipperWorker:
+        with self.lock:
+            if self.idle.empty() and len(self.workers) < self.size:
+                worker = RipperWorker()
+                self.workers.append(worker)
+                return worker
+        return self.idle.get()
+
+    def __release(self, worker: RipperWorker) -> None:
+        if worker.is_alive():
+            self.idle.put(worker)
+            return
+
+        with self.lock:
+            self.workers.remove(worker)
+            if len(self.workers) < self.size and self.idle.empty():
+                # Other threads may be waiting for a worker
+                worker = RipperWorker()
+                self.workers.append(worker)
+                self.idle.put(worker)
+
+    def ripper(self, path: str) -> Tuple[str, str]:
+        """Returns the comments and the sexp of the file, as returned by Ripper."""
+        worker = self.__acquire()
+        try:
+            return worker.ripper(path)
+        finally:
+            self.__release(worker)
+
+    def close(self) -> None:
+        with self.lock:
+            for worker in self.workers:
+                worker.close()
+            self.workers = []
+            self.idle = queue.Queue()
+
+
+# The pool of the current process. Processes created with fork do not share
+# the workers of their parent, since the pipes of the workers would be shared.
+_pool: Optional[RipperPool] = None
+_pool_size = 1
+_pool_lock = threading.Lock()
+
+
+def set_ripper_workers(size: int) -> None:
+    """Sets the number of Ruby workers used by the current process (e.g. the
+    number of threads parsing files)."""
+    global _pool, _pool_size
+    with _pool_lock:
+        _pool_size = size
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = None
+
+
+def get_ripper_pool() -> RipperPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = RipperPool(_pool_size)
+        return _pool
+
+
+@atexit.register
+def _close_pool() -> None:
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.close()
@@ -3,27 +3,31 @@
 import os
 import re
 import hcl2
+import threading
 import glitch.parsers.parser as p
 
 from glitch.exceptions import EXCEPTIONS, throw_exception
 from glitch.repr.inter import *
+from glitch.repr.source import get_source
 from typing import Sequence, List, Dict, Any
 
+# hcl2 collects the comments of the file being parsed in a global list, so the
+# files are parsed one at a time when the parser is shared by several threads
+_hcl2_lock = threading.Lock()
+
 
 class TerraformParser(p.Parser):
     @staticmethod
-    def __get_element_code(start_line: int, end_line: int, code: List[str]) -> str:
-        lines = code[start_line - 1 : end_line]
-        res = ""
-        for line in lines:
-            res += line
-        return res
+    def __set_element_code(
+        element: CodeElement, start_line: int, end_line: int, code: Source
+    ) -> None:
+        element.set_span(code, *code.lines_span(start_line - 1, end_line))
 
     def parse_keyvalues(
         self,
         unit_block: UnitBlock,
         keyvalues: Dict[Any, Any],
-        code: List[str],
+        code: Source,
         type: str,
     ) -> List[KeyValue]:
         def create_keyvalue(start_line: int, end_line: int, name: str, value: str):
@@ -46,9 +50,7 @@ class TerraformParser(p.Parser):
                 keyvalue = Variable(str(name), value, has_variable)
 
             keyvalue.line = start_line
-            keyvalue.code = TerraformParser.__get_element_code(
-                start_line, end_line, code
-            )
+            TerraformParser.__set_element_code(keyvalue, start_line, end_line, code)
 
             return keyvalue
 
@@ -127,14 +129,14 @@ class TerraformParser(p.Parser):
         return k_values
 
     def parse_atomic_unit(
-        self, type: str, unit_block: UnitBlock, dict, code: List[str]
+        self, type: str, unit_block: UnitBlock, dict, code: Source
     ) -> None:
         def create_atomic_unit(
-            start_line: int, end_line: int, type: str, name: str, code: List[str]
+            start_line: int, end_line: int, type: str, name: str, code: Source
         ) -> AtomicUnit:
             au = AtomicUnit(name, type)
             au.line = start_line
-            au.code = TerraformParser.__get_element_code(start_line, end_line, code)
+            TerraformParser.__set_element_code(au, start_line, end_line, code)
             return au
 
         def parse_resource() -> None:
@@ -172,12 +174,12 @@ class TerraformParser(p.Parser):
             parse_simple_unit()
 
     def parse_comments(
-        self, unit_block: UnitBlock, comments: Sequence[str], code: List[str]
+        self, unit_block: UnitBlock, comments: Sequence[str], code: Source
     ) -> None:
-        def create_comment(value: str, start_line: int, end_line: int, code: List[str]):
+        def create_comment(value: str, start_line: int, end_line: int, code: Source):
             c = Comment(value)
             c.line = start_line
-            c.code = TerraformParser.__get_element_code(start_line, end_line, code)
+            TerraformParser.__set_element_code(c, start_line, end_line, code)
             return c
 
         for comment in comments:
@@ -190,29 +192,28 @@ class TerraformParser(p.Parser):
                 )
             )
 
-    def parse_file(self, path: str, type: UnitBlockType) -> UnitBlock:
+    def _parse_file(self, path: str, type: UnitBlockType) -> UnitBlock:
         unit_block = UnitBlock(path, type)
         unit_block.path = path
         try:
-            with open(path) as f:
-                parsed_hcl = hcl2.load(f, True)
-                f.seek(0, 0)
-                code = f.readlines()
-                for key, value in parsed_hcl.items():
-                    if key in ["resource", "data", "variable", "module", "output"]:
-                        for v in value:
-                            self.parse_atomic_unit(key, unit_block, v, code)
-                    elif key == "__comments__":
-                        self.parse_comments(unit_block, value, code)
-                    elif key == "locals":
-                        for local in value:
-                            unit_block.variables += self.parse_keyvalues(
-                                unit_block, local, code, "variable"
-                            )
-                    elif key in ["provider", "terraform"]:
-                        continue
-                    else:
-                        throw_exception(EXCEPTIONS["TERRAFORM_COULD_NOT_PARSE"], path)
+            code = get_source(path)
+            with _hcl2_lock:
+                parsed_hcl = hcl2.loads(code.text, True)
+            for key, value in parsed_hcl.items():
+                if key in ["resource", "data", "variable", "module", "output"]:
+                    for v in value:
+                        self.parse_atomic_unit(key, unit_block, v, code)
+                elif key == "__comments__":
+                    self.parse_comments(unit_block, value, code)
+                elif key == "locals":
+                    for local in value:
+                        unit_block.variables += self.parse_keyvalues(
+                            unit_block, local, code, "variable"
+                        )
+                elif key in ["provider", "terraform"]:
+                    continue
+                else:
+                    throw_exception(EXCEPTIONS["TERRAFORM_COULD_NOT_PARSE"], path)
         except:
             throw_exception(EXCEPTIONS["TERRAFORM_COULD_NOT_PARSE"], path)
         return unit_block
@@ -226,7 +227,8 @@ class TerraformParser(p.Parser):
         ]
         for f in files:
             unit_block = self.parse_file(f, UnitBlockType.unknown)
-            res.add_block(unit_block)
+            if unit_block is not None:
+                res.add_block(unit_block)
 
         return res
 
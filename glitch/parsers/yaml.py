@@ -1,53 +1,47 @@
 import glitch.parsers.parser as p
 
-from typing import List, Tuple, TextIO, Union
+from typing import List, Sequence, Tuple, Union
 from ruamel.yaml.nodes import Node, MappingNode, SequenceNode, ScalarNode
 from ruamel.yaml.tokens import Token, CommentToken
 from abc import ABC
-
+from glitch.repr.inter import CodeElement, Source
 
 RecursiveTokenList = List[Union[Token, "RecursiveTokenList", None]]
 
 
 class YamlParser(p.Parser, ABC):
     @staticmethod
-    def _get_code(
+    def _set_code(
+        element: CodeElement,
         start_token: Token | Node,
         end_token: List[Token | Node] | Token | Node | str,
-        code: List[str],
-    ) -> str:
+        source: Source,
+    ) -> None:
         if isinstance(end_token, list) and len(end_token) > 0:
             end_token = end_token[-1]
         elif isinstance(end_token, list) or isinstance(end_token, str):
             end_token = start_token
 
-        if start_token.start_mark.line == end_token.end_mark.line:
-            res = code[start_token.start_mark.line][
-                start_token.start_mark.column : end_token.end_mark.column
-            ]
+        # If the code has more than one line, the first line is included
+        # from its beginning
+        start_line, end_line = start_token.start_mark.line, end_token.end_mark.line
+        if start_line == end_line:
+            start_column = start_token.start_mark.column
         else:
-            res = code[start_token.start_mark.line]
-
-        for line in range(start_token.start_mark.line + 1, end_token.end_mark.line):
-            res += code[line]
+            start_column = 0
 
-        # The end_mark.column > 0 avoids cases where the end token is in the last line
-        # leading to a index out of range error
-        if (
-            start_token.start_mark.line != end_token.end_mark.line
-            and end_token.end_mark.column > 0
-        ):
-            res += code[end_token.end_mark.line][: end_token.end_mark.column]
-
-        return res
+        element.set_span(
+            source,
+            *source.span(start_line, start_column, end_line, end_token.end_mark.column),
+        )
 
     @staticmethod
-    def _get_comments(d: Node, file: TextIO) -> set[Tuple[int, str]]:
+    def _get_comments(d: Node, lines: Sequence[str]) -> set[Tuple[int, str]]:
         """Extracts comments from a YAML file and returns a set of tuples with the line number and the comment itself.
 
         Args:
             d (Node): The root node of the YAML file.
-            file (TextIO): The file object of the YAML file.
+            lines (Sequence[str]): The lines of the YAML file.
 
         Returns:
             set[Tuple[int, str]]: A set of tuples with the line number and the comment itself.
@@ -87,9 +81,6 @@ class YamlParser(p.Parser, ABC):
 
             return res
 
-        file.seek(0, 0)
-        f_lines = file.readlines()
-
         comments: List[Tuple[int, str]] = []
         for c_group in yaml_comments(d):
             line = c_group[0]
@@ -101,11 +92,11 @@ class YamlParser(p.Parser, ABC):
                 aux = line + i
                 comment = comment.strip()
 
-                while comment not in f_lines[aux]:
+                while comment not in lines[aux]:
                     aux += 1
                 comments.append((aux + 1, comment))
 
-        for i, line in enumerate(f_lines):
+        for i, line in enumerate(lines):
             if line.strip().startswith("#"):
                 comments.append((i + 1, line.strip()))
 
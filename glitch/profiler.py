@@ -0,0 +1,133 @@
+import sys
+import json
+import threading
+import pandas as pd  # type: ignore
+
+from time import perf_counter
+from contextlib import contextmanager, nullcontext
+from prettytable import PrettyTable
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, TextIO, Tuple
+
+
+class Profiler:
+    """Records the wall time and the number of calls of each stage of a run.
+
+    The stages are identified by a phase (e.g. "parse" or "checker") and a
+    name (e.g. the technology or the class of the checker). Stages can be
+    nested, e.g. the time of a checker is also part of the time of the
+    analysis that runs it. The times measured by different threads are added.
+    """
+
+    def __init__(self) -> None:
+        self.records: Dict[Tuple[str, str], List[float]] = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The lock is not pickled, since profilers are sent between processes
+        return {"records": self.records}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.records = state["records"]
+        self.lock = threading.Lock()
+
+    def add(self, phase: str, name: str, elapsed: float, calls: int = 1) -> None:
+        with self.lock:
+            record = self.records.setdefault((phase, name), [0, 0.0])
+            record[0] += calls
+            record[1] += elapsed
+
+    @contextmanager
+    def measure(self, phase: str, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, name, perf_counter() - start)
+
+    def merge(self, other: "Profiler") -> None:
+        """Adds the records of other profiler (e.g. of a worker process)."""
+        for (phase, name), (calls, elapsed) in other.records.items():
+            self.add(phase, name, elapsed, int(calls))
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """Returns the records sorted by their total time."""
+        with self.lock:
+            records = sorted(self.records.items(), key=lambda r: -r[1][1])
+        return [
+            {
+                "phase": phase,
+                "name": name,
+                "calls": int(calls),
+                "total": elapsed,
+                "mean": elapsed / max(1, calls),
+            }
+            for (phase, name), (calls, elapsed) in records
+        ]
+
+    def print(self, format: str, file: Optional[TextIO] = None) -> None:
+        file = sys.stdout if file is None else file
+        rows = [
+            (
+                r["phase"],
+                r["name"],
+                r["calls"],
+                round(r["total"], 3),
+                round(r["mean"] * 1000, 3),
+            )
+            for r in self.as_list()
+        ]
+        columns = ["Phase", "Name", "Calls", "Total time (s)", "Mean time (ms)"]
+
+        if format == "prettytable":
+            table = PrettyTable()
+            table.field_names = columns
+            table.align["Phase"] = "l"  # type: ignore
+            table.align["Name"] = "l"  # type: ignore
+            table.align["Calls"] = "r"  # type: ignore
+            table.align["Total time (s)"] = "r"  # type: ignore
+            table.align["Mean time (ms)"] = "r"  # type: ignore
+            for row in rows:
+                table.add_row(row)  # type: ignore
+            print(table, file=file)
+        elif format == "latex":
+            table = pd.DataFrame(
+                rows, columns=[f"\\textbf{{{c}}}" for c in columns]  # type: ignore
+            )
+            print(
+                table.style.hide(axis="index")  # type: ignore
+                .format(escape="latex", precision=3, thousands=",")  # type: ignore
+                .to_latex(),  # type: ignore
+                file=file,
+            )
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.as_list(), f, indent=2)
+
+
+# The profiler of the current process. Profiling is disabled unless a
+# profiler is enabled (e.g. by the --profile option).
+_profiler: Optional[Profiler] = None
+
+
+def enable_profiler(profiler: Optional[Profiler] = None) -> Profiler:
+    global _profiler
+    _profiler = profiler if profiler is not None else Profiler()
+    return _profiler
+
+
+def disable_profiler() -> None:
+    global _profiler
+    _profiler = None
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+def profile(phase: str, name: str) -> ContextManager[None]:
+    """Measures the stage of the run inside the with statement, if profiling
+    is enabled."""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.measure(phase, name)
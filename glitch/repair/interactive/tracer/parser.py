@@ -1,10 +1,13 @@
 # pyright: reportUnusedFunction=false, reportUnusedVariable=false
+import os
 import logging
+import threading
+from copy import copy
 from enum import Enum
-from ply.lex import lex, LexToken
-from ply.yacc import yacc, YaccProduction
+from ply.lex import lex, Lexer, LexToken
+from ply.yacc import yacc, LRParser, YaccProduction
 from dataclasses import dataclass
-from typing import List, Any
+from typing import List, Any, Optional, Tuple
 
 
 @dataclass
@@ -60,7 +63,7 @@ class UnlinkFlag(Enum):
     AT_REMOVEDIR = 0
 
 
-def parse_tracer_output(tracer_output: str, debug: bool = False) -> Syscall:
+def _build() -> Tuple[Lexer, LRParser]:
     # Tokens defined as functions preserve order
     def t_ADDRESS(t: LexToken):
         r"0[xX][0-9a-fA-F]+"
@@ -116,13 +119,13 @@ def parse_tracer_output(tracer_output: str, debug: bool = False) -> Syscall:
 
     def t_ID(t: LexToken):
         r"[a-zA-Z][a-zA-Z0-9_]*"
-        if t.value in [flag.name for flag in OpenFlag]:
+        if t.value in OpenFlag.__members__:
             t.type = "OPEN_FLAG"
             t.value = OpenFlag[t.value]  # type: ignore
-        elif t.value in [flag.name for flag in ORedFlag]:
+        elif t.value in ORedFlag.__members__:
             t.type = "ORED_FLAG"
             t.value = ORedFlag[t.value]  # type: ignore
-        elif t.value in [flag.name for flag in UnlinkFlag]:
+        elif t.value in UnlinkFlag.__members__:
             t.type = "UNLINK_FLAG"
             t.value = UnlinkFlag[t.value]  # type: ignore
         return t
@@ -151,16 +154,6 @@ def parse_tracer_output(tracer_output: str, debug: bool = False) -> Syscall:
         t.lexer.skip(1)
 
     lexer = lex()
-    # Give the lexer some input
-    lexer.input(tracer_output)
-
-    # print tokens
-    if debug:
-        while True:
-            tok = lexer.token()
-            if not tok:
-                break
-            print(tok)
 
     def p_syscalls_pid(p: YaccProduction) -> None:
         r"syscalls : PID syscall"
@@ -294,6 +287,43 @@ def parse_tracer_output(tracer_output: str, debug: bool = False) -> Syscall:
     def p_error(p: YaccProduction) -> None:
         logging.error(f"Syntax error at {p.value!r}")
 
-    # Build the parser
-    parser = yacc()
-    return parser.parse(tracer_output)
+    # Build the parser. The tables are written to the folder of the module
+    # (if possible), so that other processes do not have to compute them.
+    outputdir = os.path.dirname(os.path.abspath(__file__))
+    parser = yacc(
+        debug=False, outputdir=outputdir, write_tables=os.access(outputdir, os.W_OK)
+    )
+    return lexer, parser
+
+
+# The lexer and the parser are built once per process, instead of once per
+# line traced. Since they keep the state of the input being parsed, each
+# thread uses its own copy of them.
+_parser: Optional[Tuple[Lexer, LRParser]] = None
+_parser_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_parser() -> Tuple[Lexer, LRParser]:
+    global _parser
+    if not hasattr(_local, "parser"):
+        with _parser_lock:
+            if _parser is None:
+                _parser = _build()
+        _local.parser = (_parser[0].clone(), copy(_parser[1]))
+    return _local.parser
+
+
+def parse_tracer_output(tracer_output: str, debug: bool = False) -> Syscall:
+    lexer, parser = _get_parser()
+
+    # print tokens
+    if debug:
+        lexer.input(tracer_output)
+        while True:
+            tok = lexer.token()
+            if not tok:
+                break
+            print(tok)
+
+    return parser.parse(tracer_output, lexer=lexer)
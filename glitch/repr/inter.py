@@ -1,13 +1,44 @@
+import sys
+
 from abc import ABC
 from enum import Enum
-from typing import List, Union, Dict, Any
+from typing import List, Union, Dict, Any, Optional, Sequence, Tuple
+from glitch.repr.source import Source
+
+
+# NOTE: The elements of the representation define __slots__, since the
+# representation of whole projects is kept in memory. Names and types are
+# interned, since the same names (e.g. of attributes) are repeated often.
+def _intern(s: Optional[str]) -> Optional[str]:
+    return sys.intern(s) if type(s) is str else s
 
 
 class CodeElement(ABC):
+    # The code is either a string or the source of the file, in which case the
+    # code is the span of the source packed in _span (see set_span)
+    __slots__ = ("line", "column", "_code", "_span")
+
     def __init__(self) -> None:
         self.line: int = -1
         self.column: int = -1
-        self.code: str = ""
+        self._code: str | Source = ""
+
+    @property
+    def code(self) -> str:
+        if isinstance(self._code, Source):
+            return self._code.text[self._span >> 32 : self._span & 0xFFFFFFFF]
+        return self._code
+
+    @code.setter
+    def code(self, code: str) -> None:
+        self._code = code
+
+    def set_span(self, source: Source, start: int, end: int) -> None:
+        """Sets the code of the element to a span of the source of the file.
+        The code is only copied from the source when it is accessed."""
+        self._code = source
+        # A single int takes less memory than the two offsets
+        self._span: int = start << 32 | end
 
     def __hash__(self) -> int:
         return hash(self.line) * hash(self.column)
@@ -30,6 +61,8 @@ class CodeElement(ABC):
 
 
 class Block(CodeElement):
+    __slots__ = ("statements",)
+
     def __init__(self) -> None:
         super().__init__()
         self.statements: List[CodeElement] = []
@@ -39,7 +72,7 @@ class Block(CodeElement):
 
     @staticmethod
     def __as_dict_statement(
-        stat: Dict[str, Any] | List[Any] | CodeElement | str
+        stat: Dict[str, Any] | List[Any] | CodeElement | str,
     ) -> Any:
         if isinstance(stat, CodeElement):
             return stat.as_dict()
@@ -66,6 +99,8 @@ class ConditionalStatement(Block):
         IF = 1
         SWITCH = 2
 
+    __slots__ = ("condition", "else_statement", "is_default", "type")
+
     def __init__(
         self,
         condition: str,
@@ -87,13 +122,15 @@ class ConditionalStatement(Block):
             "condition": self.condition,
             "type": self.type.name,
             "is_default": self.is_default,
-            "else_statement": self.else_statement.as_dict()
-            if self.else_statement
-            else None,
+            "else_statement": (
+                self.else_statement.as_dict() if self.else_statement else None
+            ),
         }
 
 
 class Comment(CodeElement):
+    __slots__ = ("content",)
+
     def __init__(self, content: str) -> None:
         super().__init__()
         self.content: str = content
@@ -109,8 +146,11 @@ class Comment(CodeElement):
 
 
 class KeyValue(CodeElement):
+    __slots__ = ("name", "value", "has_variable", "keyvalues")
+
     def __init__(self, name: str, value: str | None, has_variable: bool) -> None:
-        self.name: str = name
+        super().__init__()
+        self.name: str = _intern(name)  # type: ignore
         self.value: str | None = value
         self.has_variable: bool = has_variable
         self.keyvalues: List[KeyValue] = []
@@ -135,25 +175,39 @@ class KeyValue(CodeElement):
 
 
 class Variable(KeyValue):
+    __slots__ = ()
+
     def __init__(self, name: str, value: str | None, has_variable: bool) -> None:
         super().__init__(name, value, has_variable)
 
 
 class Attribute(KeyValue):
+    __slots__ = ()
+
     def __init__(self, name: str, value: str | None, has_variable: bool) -> None:
         super().__init__(name, value, has_variable)
 
 
 class AtomicUnit(Block):
+    __slots__ = ("name", "type", "attributes", "_attribute_index")
+
     def __init__(self, name: str | None, type: str) -> None:
         super().__init__()
         self.name: str | None = name
-        self.type: str = type
+        self.type: str = _intern(type)  # type: ignore
         self.attributes: list[Attribute] = []
+        self._attribute_index: Optional[AttributeIndex] = None
 
     def add_attribute(self, a: Attribute) -> None:
         self.attributes.append(a)
 
+    def get_attribute_index(self) -> "AttributeIndex":
+        """Returns the index of the attributes of the atomic unit (at any
+        depth). The index is built when it is first used, i.e. after parsing."""
+        if self._attribute_index is None:
+            self._attribute_index = AttributeIndex(self.attributes)
+        return self._attribute_index
+
     def __repr__(self) -> str:
         return f"{self.name} {self.type}"
 
@@ -167,9 +221,11 @@ class AtomicUnit(Block):
 
 
 class Dependency(CodeElement):
+    __slots__ = ("name",)
+
     def __init__(self, name: str) -> None:
         super().__init__()
-        self.name: str = name
+        self.name: str = _intern(name)  # type: ignore
 
     def __repr__(self) -> str:
         return self.name
@@ -190,6 +246,19 @@ class UnitBlockType(str, Enum):
 
 
 class UnitBlock(Block):
+    __slots__ = (
+        "dependencies",
+        "comments",
+        "variables",
+        "atomic_units",
+        "unit_blocks",
+        "attributes",
+        "name",
+        "path",
+        "type",
+        "_symbols",
+    )
+
     def __init__(self, name: str, type: UnitBlockType) -> None:
         super().__init__()
         self.dependencies: list[Dependency] = []
@@ -201,10 +270,18 @@ class UnitBlock(Block):
         self.name: str | None = name
         self.path: str = ""
         self.type: UnitBlockType = type
+        self._symbols: Optional[SymbolIndex] = None
 
     def __repr__(self) -> str:
         return self.name if self.name is not None else ""
 
+    def get_symbols(self) -> "SymbolIndex":
+        """Returns the index of the atomic units and variables of the unit
+        block. The index is built when it is first used, i.e. after parsing."""
+        if self._symbols is None:
+            self._symbols = SymbolIndex([self])
+        return self._symbols
+
     def add_dependency(self, d: Dependency) -> None:
         self.dependencies.append(d)
 
@@ -238,7 +315,113 @@ class UnitBlock(Block):
         }
 
 
+class SymbolIndex:
+    """Index of the atomic units and variables defined directly in a list of
+    unit blocks (e.g. the blocks of a module). When several elements have the
+    same key, the first one is returned, as a sequential search would."""
+
+    __slots__ = ("atomic_units", "types", "variables")
+
+    def __init__(self, blocks: List[UnitBlock]) -> None:
+        self.atomic_units: Dict[Tuple[str, str | None], AtomicUnit] = {}
+        self.types: Dict[str, List[AtomicUnit]] = {}
+        self.variables: Dict[str, Variable] = {}
+        for ub in blocks:
+            for au in ub.atomic_units:
+                self.atomic_units.setdefault((au.type, au.name), au)
+                self.types.setdefault(au.type, []).append(au)
+            for v in ub.variables:
+                self.variables.setdefault(v.name, v)
+
+    def get_atomic_unit(self, type: str, name: str) -> Optional[AtomicUnit]:
+        return self.atomic_units.get((type, name))
+
+    def get_atomic_units(self, type: str) -> List[AtomicUnit]:
+        return self.types.get(type, [])
+
+    def get_variable(self, name: str) -> Optional[Variable]:
+        return self.variables.get(name)
+
+
+class AttributeIndex:
+    """Index of the attributes (or key-values) in a list, at any depth, by name.
+    The names are normalized (stripped and lowercased, as the security visitor
+    does while checking the attributes), so the index stays valid after the
+    attributes are checked. The prefix "dynamic." of the names of (Terraform)
+    dynamic blocks is ignored.
+    Like a depth-first search that does not look inside the attributes it
+    finds, an attribute is only indexed under its name if none of the
+    attributes containing it has the same name, and the attributes are kept
+    in the order of the search."""
+
+    __slots__ = ("keyvalues", "names", "paths")
+
+    def __init__(self, keyvalues: Sequence[KeyValue]) -> None:
+        self.keyvalues = keyvalues
+        self.names: Dict[str, List[KeyValue]] = {}
+        # (parents, name) -> attributes, filled as the paths are looked up
+        self.paths: Dict[Tuple[Tuple[str, ...], str], List[KeyValue]] = {}
+        self.__add(keyvalues, [])
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.strip().lower().split("dynamic.")[-1]
+
+    @staticmethod
+    def get_name(kv: KeyValue) -> str:
+        return AttributeIndex.normalize(kv.name)
+
+    def __add(self, keyvalues: Sequence[KeyValue], parents: List[str]) -> None:
+        for kv in keyvalues:
+            name = AttributeIndex.get_name(kv)
+            if name not in parents:
+                self.names.setdefault(name, []).append(kv)
+            if len(kv.keyvalues) > 0:
+                parents.append(name)
+                self.__add(kv.keyvalues, parents)
+                parents.pop()
+
+    @staticmethod
+    def __get_parents(
+        keyvalues: Sequence[KeyValue], parents: Sequence[str]
+    ) -> List[KeyValue]:
+        res: List[KeyValue] = []
+        for kv in keyvalues:
+            if AttributeIndex.get_name(kv) in parents:
+                res.append(kv)
+            elif len(kv.keyvalues) > 0:
+                res += AttributeIndex.__get_parents(kv.keyvalues, parents)
+        return res
+
+    def get(self, parents: Sequence[str], name: str) -> List[KeyValue]:
+        """Returns the attributes with the name inside any of the parents, e.g.
+        get(["settings"], "database_flags"). The parents are attributes at any
+        depth, and [""] stands for the list itself.
+
+        Args:
+            parents (Sequence[str]): The names of the parents.
+            name (str): The name of the attributes.
+
+        Returns:
+            List[KeyValue]: The attributes found.
+        """
+        name = AttributeIndex.normalize(name)
+        if list(parents) == [""]:
+            return self.names.get(name, [])
+
+        parents = [AttributeIndex.normalize(p) for p in parents]
+        path = (tuple(parents), name)
+        if path not in self.paths:
+            res: List[KeyValue] = []
+            for parent in AttributeIndex.__get_parents(self.keyvalues, parents):
+                res += AttributeIndex(parent.keyvalues).get([""], name)
+            self.paths[path] = res
+        return self.paths[path]
+
+
 class File:
+    __slots__ = ("name",)
+
     def __init__(self, name: str) -> None:
         self.name: str = name
 
@@ -249,6 +432,8 @@ class File:
 
 
 class Folder:
+    __slots__ = ("content", "name")
+
     def __init__(self, name: str) -> None:
         self.content: List[Union["Folder", File]] = []
         self.name: str = name
@@ -273,6 +458,7 @@ class Module:
         self.blocks: list[UnitBlock] = []
         self.modules: list[Module] = []
         self.folder: Folder = Folder(name)
+        self._symbols: Optional[SymbolIndex] = None
 
     def __repr__(self) -> str:
         return self.name
@@ -280,6 +466,14 @@ class Module:
     def add_block(self, u: UnitBlock) -> None:
         self.blocks.append(u)
 
+    def get_symbols(self) -> SymbolIndex:
+        """Returns the index of the atomic units and variables of the blocks
+        of the module. The index is built when it is first used, i.e. after
+        parsing."""
+        if self._symbols is None:
+            self._symbols = SymbolIndex(self.blocks)
+        return self._symbols
+
     def as_dict(self) -> Dict[str, Any]:
         return {
             "name": self.name,
@@ -295,6 +489,7 @@ class Project:
         self.name: str = name
         self.modules: list[Module] = []
         self.blocks: list[UnitBlock] = []
+        self._modules_by_name: Optional[Dict[str, Module]] = None
 
     def __repr__(self) -> str:
         return self.name
@@ -302,6 +497,15 @@ class Project:
     def add_module(self, m: Module) -> None:
         self.modules.append(m)
 
+    def get_module(self, name: str) -> Optional[Module]:
+        """Returns the first module with the name. The modules are indexed
+        when this method is first used, i.e. after parsing."""
+        if self._modules_by_name is None:
+            self._modules_by_name = {}
+            for m in self.modules:
+                self._modules_by_name.setdefault(m.name, m)
+        return self._modules_by_name.get(name)
+
     def add_block(self, u: UnitBlock) -> None:
         self.blocks.append(u)
 
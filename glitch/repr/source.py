@@ -0,0 +1,194 @@
+import os
+import threading
+import numpy as np
+
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+
+class Source(Sequence[str]):
+    """The contents of a file, shared by the elements of its representation.
+
+    The elements keep the offsets of their code in the contents, instead of a
+    copy of the code (see CodeElement.code). The lines of the file are the
+    ones returned by readlines (i.e. they include the line break), and the
+    source can be used as the list of lines of the file."""
+
+    __slots__ = ("path", "text", "offsets", "_metrics")
+
+    def __init__(self, text: str, path: str = "") -> None:
+        self.path: str = path
+        self.text: str = text
+        # The offset where each line starts, followed by the length of the text.
+        # An array avoids an int object per line.
+        self.offsets: array[int] = array("q", [0])
+        i = text.find("\n")
+        while i != -1:
+            self.offsets.append(i + 1)
+            i = text.find("\n", i + 1)
+        if self.offsets[-1] != len(text):
+            self.offsets.append(len(text))
+        # The metrics of the lines for each comment symbol
+        self._metrics: Dict[str, LineMetrics] = {}
+
+    @staticmethod
+    def read(path: str) -> "Source":
+        with open(path) as f:
+            return Source(f.read(), path)
+
+    def __getstate__(self) -> Tuple[str, str, "array[int]"]:
+        # The metrics are computed again when needed
+        return self.path, self.text, self.offsets
+
+    def __setstate__(self, state: Tuple[str, str, "array[int]"]) -> None:
+        self.path, self.text, self.offsets = state
+        self._metrics = {}
+
+    def __len__(self) -> int:
+        """Returns the number of lines of the file."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, line: int) -> str:
+        """Returns a line (0-based) of the file, as lines[line]."""
+        n = len(self)
+        if not -n <= line < n:
+            raise IndexError("line index out of range")
+        line %= n
+        return self.text[self.offsets[line] : self.offsets[line + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self.text[self.offsets[i] : self.offsets[i + 1]]
+
+    def offset(self, line: int, column: int = 0) -> int:
+        """Returns the offset of a column of a line (both 0-based). The column
+        is bounded to the line as in line[:column]."""
+        n = len(self)
+        if line < 0:
+            line = max(0, line + n)
+        if line >= n:
+            return len(self.text)
+        start, end = self.offsets[line], self.offsets[line + 1]
+        return start + slice(column).indices(end - start)[1]
+
+    def lines_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Returns the span of the lines, as in "".join(lines[start:end])."""
+        start, end, _ = slice(start, end).indices(len(self))
+        if end <= start:
+            return self.offsets[start], self.offsets[start]
+        return self.offsets[start], self.offsets[end]
+
+    def get_line_metrics(self, comment: str) -> "LineMetrics":
+        """Returns the metrics of the lines of the file, which are computed
+        when they are first used and shared by the checks of the file.
+
+        Args:
+            comment (str): The symbol that starts a comment.
+
+        Returns:
+            LineMetrics: The metrics of the lines.
+        """
+        if comment not in self._metrics:
+            self._metrics[comment] = LineMetrics(self, comment)
+        return self._metrics[comment]
+
+    def span(
+        self, start_line: int, start_column: int, end_line: int, end_column: int
+    ) -> Tuple[int, int]:
+        """Returns the span between two positions (lines and columns are
+        0-based). An empty span is returned if the end is before the start."""
+        start = self.offset(start_line, start_column)
+        return start, max(start, self.offset(end_line, end_column))
+
+
+class LineMetrics:
+    """Metrics of the lines of a file, computed in a single pass over its
+    text. The metrics of each line are kept in arrays, so the lines of large
+    files can be checked without iterating over them."""
+
+    __slots__ = ("lengths", "tab_lines", "comment_lines", "first_code_line", "loc")
+
+    def __init__(self, source: Source, comment: str) -> None:
+        offsets = np.array(source.offsets, dtype=np.int64)
+        starts = offsets[:-1]
+        chars = np.frombuffer(
+            source.text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+        )
+
+        # The length of each line, including the line break
+        self.lengths: np.ndarray = np.diff(offsets)
+        # The lines (0-based) with a tab
+        tabs = np.flatnonzero(chars == ord("\t"))
+        self.tab_lines: np.ndarray = np.unique(
+            np.searchsorted(offsets, tabs, side="right") - 1
+        )
+        # If each line starts with a comment
+        self.comment_lines: np.ndarray = np.ones(len(starts), dtype=bool)
+        for i, c in enumerate(comment):
+            in_line = self.lengths > i
+            self.comment_lines &= in_line
+            self.comment_lines[in_line] &= chars[starts[in_line] + i] == ord(c)
+        # The first line (1-based) which does not start with a comment
+        code_lines = np.flatnonzero(~self.comment_lines)
+        self.first_code_line: Optional[int] = (
+            int(code_lines[0]) + 1 if len(code_lines) > 0 else None
+        )
+        self.loc: int = len(source)
+
+
+class SourceRegistry:
+    """A thread-safe cache of the sources of the files read during a run, so
+    that each file is read once by the parsers, the analyses and the output
+    of the errors.
+
+    The least recently used sources are discarded when the registry is full.
+    A file is read again if it was modified since it was read."""
+
+    def __init__(self, size: int = 512) -> None:
+        self.size = max(1, size)
+        self.sources: OrderedDict[str, Tuple[Tuple[int, int], Source]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path: str) -> Source:
+        """Returns the source of the file.
+
+        Raises:
+            OSError: If the file can not be read.
+            UnicodeDecodeError: If the file can not be decoded.
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.sources.get(key)
+            if entry is not None and entry[0] == version:
+                self.sources.move_to_end(key)
+                return entry[1]
+
+        # The file is read outside the lock, so that other threads are not
+        # blocked. The same file may be read twice in the meantime.
+        source = Source.read(path)
+        with self.lock:
+            self.sources[key] = (version, source)
+            self.sources.move_to_end(key)
+            while len(self.sources) > self.size:
+                self.sources.popitem(last=False)
+        return source
+
+    def clear(self) -> None:
+        with self.lock:
+            self.sources.clear()
+
+
+_registry = SourceRegistry()
+
+
+def get_source(path: str) -> Source:
+    """Returns the source of a file from the registry of the process.
+
+    Raises:
+        OSError: If the file can not be read.
+        UnicodeDecodeError: If the file can not be decoded.
+    """
+    return _registry.get(path)
@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import stat
+import click
+import tempfile
+import threading
+import socketserver
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+from glitch.analysis.rules import Error
+from glitch.analyzer import Analyzer, get_config
+from glitch.repr.inter import UnitBlockType
+from glitch.tech import Tech
+
+# Error codes defined by the JSON-RPC 2.0 specification
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def get_tech(tech: str) -> Tech:
+    for t in Tech:
+        if t.tech == tech:
+            return t
+    raise RPCError(INVALID_PARAMS, f"'{tech}' is not a valid technology.")
+
+
+def error_as_dict(error: Error) -> Dict[str, Any]:
+    return {
+        "code": error.code,
+        "description": Error.ALL_ERRORS[error.code],
+        "path": error.path,
+        "line": error.line,
+        "repr": error.repr.split("\n")[0].strip(),
+        "opt_msg": error.opt_msg,
+    }
+
+
+def write_buffer(folder: str, path: str, text: str) -> str:
+    """Writes the content of a file which is not saved to disk to a file
+    inside a folder, so that it can be parsed.
+
+    The file is created in a folder that mirrors the absolute path of the
+    file, since the parsers use the name of the file and of its folders (e.g.
+    to identify Dockerfiles or Ansible tasks files).
+
+    Returns:
+        str: The path of the written file.
+    """
+    abs_path = os.path.abspath(path)
+    buffer_path = os.path.join(folder, os.path.relpath(abs_path, os.path.sep))
+    os.makedirs(os.path.dirname(buffer_path), exist_ok=True)
+    with open(buffer_path, "w") as f:
+        f.write(text)
+    return buffer_path
+
+
+@contextmanager
+def buffer_file(path: str, text: str) -> Iterator[str]:
+    """Writes the content of a file which is not saved to disk to a temporary
+    file, so that it can be parsed. See write_buffer.
+
+    Yields:
+        str: The path of the temporary file.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        yield write_buffer(tmp, path, text)
+
+
+class AnalysisServer:
+    """Keeps analyzers in memory and answers requests to analyze paths or
+    in-memory buffers.
+
+    The analyzers are created the first time a combination of technology,
+    config and smell types is requested, and reused by the following requests.
+    """
+
+    def __init__(self) -> None:
+        self.analyzers: Dict[Tuple[Tech, str, Tuple[str, ...]], Analyzer] = {}
+        self.lock = threading.Lock()
+
+    def get_analyzer(
+        self, tech: Tech, config: Optional[str], smell_types: Tuple[str, ...]
+    ) -> Analyzer:
+        config = get_config(tech, config)
+        if not os.path.isfile(config):
+            raise RPCError(INVALID_PARAMS, f"Config file '{config}' does not exist.")
+
+        key = (tech, os.path.realpath(config), tuple(sorted(smell_types)))
+        with self.lock:
+            if key not in self.analyzers:
+                self.analyzers[key] = Analyzer(tech, config, smell_types)
+            return self.analyzers[key]
+
+    def analyze_buffer(
+        self,
+        analyzer: Analyzer,
+        path: str,
+        text: str,
+        type: UnitBlockType,
+    ) -> Set[Error]:
+        """Analyzes the content of a file which is not saved to disk. The
+        errors are reported for the original path."""
+        with buffer_file(path, text) as tmp_path:
+            errors = analyzer.analyze(tmp_path, type, False)
+            for error in errors:
+                if error.path == tmp_path:
+                    error.path = path
+            return errors
+
+    def analyze(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(params.get("tech"), str) or not isinstance(
+            params.get("path"), str
+        ):
+            raise RPCError(INVALID_PARAMS, "'tech' and 'path' must be strings.")
+
+        try:
+            type = UnitBlockType(params.get("type", UnitBlockType.unknown.value))
+        except ValueError:
+            raise RPCError(INVALID_PARAMS, f"'{params['type']}' is not a valid type.")
+
+        analyzer = self.get_analyzer(
+            get_tech(params["tech"]),
+            params.get("config"),
+            tuple(params.get("smell_types", ())),
+        )
+        path: str = params["path"]
+        text: Optional[str] = params.get("text")
+        if text is not None:
+            errors = self.analyze_buffer(analyzer, path, text, type)
+        elif not os.path.exists(path):
+            raise RPCError(INVALID_PARAMS, f"Path '{path}' does not exist.")
+        else:
+            errors = analyzer.analyze(path, type, params.get("module", False))
+
+        errors_sorted = sorted(errors, key=lambda e: (e.path, e.line, e.code))
+        return {"errors": [error_as_dict(e) for e in errors_sorted]}
+
+    def handle(self, request: Any) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Handles a JSON-RPC request.
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], bool]: The response (None for
+            notifications) and if the server should shutdown.
+        """
+        id = request.get("id") if isinstance(request, dict) else None
+        shutdown = False
+        try:
+            if (
+                not isinstance(request, dict)
+                or request.get("jsonrpc") != "2.0"
+                or not isinstance(request.get("method"), str)
+            ):
+                raise RPCError(INVALID_REQUEST, "Invalid request.")
+
+            method: str = request["method"]
+            params = request.get("params", {})
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "'params' must be an object.")
+
+            result: Any
+            if method == "analyze":
+                result = self.analyze(params)  # type: ignore
+            elif method == "ping":
+                result = "pong"
+            elif method == "shutdown":
+                result = None
+                shutdown = True
+            else:
+                raise RPCError(METHOD_NOT_FOUND, f"Method '{method}' not found.")
+            response = {"jsonrpc": "2.0", "id": id, "result": result}
+        except RPCError as e:
+            response = {
+                "jsonrpc": "2.0",
+                "id": id,
+                "error": {"code": e.code, "message": e.message},
+            }
+        except Exception as e:
+            response = {
+                "jsonrpc": "2.0",
+                "id": id,
+                "error": {"code": INTERNAL_ERROR, "message": repr(e)},
+            }
+
+        if isinstance(request, dict) and "id" not in request:
+            return None, shutdown
+        return response, shutdown
+
+    def handle_line(self, line: str) -> Tuple[Optional[str], bool]:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": PARSE_ERROR, "message": str(e)},
+            }
+            return json.dumps(response), False
+
+        response, shutdown = self.handle(request)
+        return (json.dumps(response) if response is not None else None), shutdown
+
+    def serve_stream(self, input: TextIO, output: TextIO) -> bool:
+        """Answers the requests read from input, one per line, until the end
+        of the input or a shutdown request.
+
+        Returns:
+            bool: If a shutdown was requested.
+        """
+        for line in input:
+            if line.strip() == "":
+                continue
+            response, shutdown = self.handle_line(line)
+            if response is not None:
+                output.write(response + "\n")
+                output.flush()
+            if shutdown:
+                return True
+        return False
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, server: AnalysisServer) -> None:
+        self.analysis_server = server
+        super().__init__(path, _UnixRequestHandler)
+
+
+class _UnixRequestHandler(socketserver.StreamRequestHandler):
+    server: _UnixServer
+
+    def handle(self) -> None:
+        reader = (line.decode() for line in self.rfile)
+        output = _SocketWriter(self.wfile)
+        if self.server.analysis_server.serve_stream(reader, output):  # type: ignore
+            threading.Thread(target=self.server.shutdown).start()
+
+
+class _SocketWriter:
+    def __init__(self, wfile: Any) -> None:
+        self.wfile = wfile
+
+    def write(self, s: str) -> None:
+        self.wfile.write(s.encode())
+
+    def flush(self) -> None:
+        self.wfile.flush()
+
+
+@click.command(
+    help="Starts a long-lived GLITCH server which answers JSON-RPC 2.0 requests "
+    "(one per line) to analyze paths or in-memory buffers."
+)
+@click.option(
+    "--socket",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="The path of the Unix socket in which the server listens. "
+    "Otherwise, the requests are read from stdin and the responses written to stdout.",
+)
+@click.option(
+    "--tech",
+    type=click.Choice([t.tech for t in Tech]),
+    multiple=True,
+    help="Technologies for which the analyzers are loaded when the server starts.",
+)
+def serve(socket: Optional[str], tech: List[str]) -> None:
+    server = AnalysisServer()
+    for t in tech:
+        server.get_analyzer(get_tech(t), None, ())
+
+    if socket is None:
+        # The responses are the only output written to stdout, so that other
+        # prints (e.g. from the parsers) do not break the protocol
+        stdout = sys.stdout
+        sys.stdout = sys.stderr
+        try:
+            server.serve_stream(sys.stdin, stdout)
+        finally:
+            sys.stdout = stdout
+    else:
+        try:
+            mode = os.lstat(socket).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            # Only a socket left by a previous server is replaced
+            if not stat.S_ISSOCK(mode):
+                raise click.BadParameter(
+                    f"'{socket}' already exists and is not a socket.",
+                    param_hint="'--socket'",
+                )
+            os.remove(socket)
+        with _UnixServer(socket, server) as unix_server:
+            try:
+                unix_server.serve_forever()
+            finally:
+                os.remove(socket)
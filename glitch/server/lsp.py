@@ -0,0 +1,436 @@
+import os
+import sys
+import json
+import click
+import pickle
+import shutil
+import hashlib
+import tempfile
+import threading
+
+from urllib.parse import urlparse, unquote
+from typing import Any, BinaryIO, Callable, Dict, Optional, Set, Tuple
+from glitch.analysis.rules import Error
+from glitch.analyzer import Analyzer
+from glitch.repr.inter import Module, Project, UnitBlock, UnitBlockType
+from glitch.server.daemon import (
+    AnalysisServer,
+    RPCError,
+    get_tech,
+    write_buffer,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    INTERNAL_ERROR,
+)
+from glitch.tech import Tech
+
+# Values defined by the Language Server Protocol specification
+SERVER_NOT_INITIALIZED = -32002
+TEXT_DOCUMENT_SYNC_FULL = 1
+DIAGNOSTIC_SEVERITY_WARNING = 2
+
+
+def uri_to_path(uri: str) -> str:
+    return unquote(urlparse(uri).path)
+
+
+def get_document_tech(path: str) -> Optional[Tech]:
+    """Get the technology of a document from its name. Documents with other
+    names are not analyzed, unless the technology is given in the settings."""
+    folder, name = os.path.split(path)
+    if "Dockerfile" in name:
+        return Tech.docker
+    elif name.endswith((".yml", ".yaml")):
+        # GitHub only runs the workflows defined in the .github/workflows folder
+        parent, folder = os.path.split(folder)
+        if folder == "workflows" and os.path.basename(parent) == ".github":
+            return Tech.gha
+        return Tech.ansible
+    elif name.endswith(".rb"):
+        return Tech.chef
+    elif name.endswith(".pp"):
+        return Tech.puppet
+    elif name.endswith(".tf"):
+        return Tech.terraform
+    return None
+
+
+def error_as_diagnostic(error: Error) -> Dict[str, Any]:
+    line = max(error.line - 1, 0)
+    message = Error.ALL_ERRORS[error.code]
+    if error.opt_msg:
+        message += f"\n-> {error.opt_msg}"
+    return {
+        "range": {
+            "start": {"line": line, "character": 0},
+            "end": {"line": line + 1, "character": 0},
+        },
+        "severity": DIAGNOSTIC_SEVERITY_WARNING,
+        "code": error.code,
+        "source": "glitch",
+        "message": message,
+    }
+
+
+class Document:
+    def __init__(self, uri: str, text: str, version: Optional[int]) -> None:
+        self.uri = uri
+        self.path = uri_to_path(uri)
+        self.text = text
+        self.version = version
+        # Last analysis of the document, identified by the hash of its text
+        self.analyzed_hash: Optional[str] = None
+        # Pickled representation of the last parse, identified by the hash of
+        # the text, the technology and the type. The analyses change the
+        # representation, so a copy is unpickled for each analysis
+        self.parsed: Optional[Tuple[Tuple[str, Tech, UnitBlockType], bytes]] = None
+        self.errors: Set[Error] = set()
+        self.timer: Optional[threading.Timer] = None
+        # The text is always written to the same file inside this folder,
+        # since the representation refers to the path of the file
+        self.folder: Optional[str] = None
+        self.closed = False
+
+    def close(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+        self.closed = True
+        if self.folder is not None:
+            shutil.rmtree(self.folder, ignore_errors=True)
+
+
+class LanguageServer:
+    """Language server which publishes the errors found by GLITCH as
+    diagnostics of the open documents.
+
+    The text of the documents is analyzed as it is in the editor, not as it is
+    saved on disk. Changes are analyzed after a debounce delay, and the
+    representation and errors of the last analysis of each document are kept,
+    so that documents whose text did not change are not analyzed again, and
+    are not parsed again when only the settings change.
+    """
+
+    def __init__(self, input: BinaryIO, output: BinaryIO, debounce: float) -> None:
+        self.input = input
+        self.output = output
+        self.debounce = debounce
+        self.analyzers = AnalysisServer()
+        self.documents: Dict[str, Document] = {}
+        self.settings: Dict[str, Any] = {}
+        self.initialized = False
+        self.shutdown_requested = False
+        # The documents are analyzed one at a time, outside of the main loop
+        self.analysis_lock = threading.Lock()
+        self.output_lock = threading.Lock()
+        self.documents_lock = threading.Lock()
+
+    def read_message(self) -> Optional[Any]:
+        headers: Dict[str, str] = {}
+        while True:
+            line = self.input.readline()
+            if line == b"":
+                return None
+            line = line.decode("ascii").strip()
+            if line == "":
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        return json.loads(self.input.read(length).decode("utf-8"))
+
+    def send(self, message: Dict[str, Any]) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+        with self.output_lock:
+            self.output.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii"))
+            self.output.write(body)
+            self.output.flush()
+
+    def notify(self, method: str, params: Any) -> None:
+        self.send({"method": method, "params": params})
+
+    def get_analyzer(self, document: Document) -> Optional[Analyzer]:
+        tech: Optional[Tech]
+        if self.settings.get("tech"):
+            tech = get_tech(self.settings["tech"])
+        else:
+            tech = get_document_tech(document.path)
+        if tech is None:
+            return None
+
+        return self.analyzers.get_analyzer(
+            tech,
+            self.settings.get("config") or None,
+            tuple(self.settings.get("smell_types", ())),
+        )
+
+    def analyze(self, uri: str) -> None:
+        with self.documents_lock:
+            document = self.documents.get(uri)
+            if document is None:
+                return
+            text, version = document.text, document.version
+
+        with self.analysis_lock:
+            if document.closed:
+                return
+            text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if document.analyzed_hash != text_hash:
+                analyzer = self.get_analyzer(document)
+                if analyzer is None:
+                    return
+
+                inter = self.parse(document, analyzer, text, text_hash)
+                document.errors = analyzer.check(inter) if inter is not None else set()
+                document.analyzed_hash = text_hash
+
+        with self.documents_lock:
+            if self.documents.get(uri) is not document:
+                # The document was closed during the analysis
+                return
+        self.notify(
+            "textDocument/publishDiagnostics",
+            {
+                "uri": uri,
+                "version": version,
+                "diagnostics": [
+                    error_as_diagnostic(e)
+                    for e in sorted(document.errors, key=lambda e: (e.line, e.code))
+                ],
+            },
+        )
+
+    def parse(
+        self, document: Document, analyzer: Analyzer, text: str, text_hash: str
+    ) -> Optional[Module | Project | UnitBlock]:
+        """Parses the text of a document, unless the same text was parsed with
+        the same technology and type in the last analysis of the document.
+        """
+        key = (text_hash, analyzer.tech, self.get_type())
+        if document.parsed is not None and document.parsed[0] == key:
+            return pickle.loads(document.parsed[1])
+
+        if document.folder is None:
+            document.folder = tempfile.mkdtemp(prefix="glitch-")
+        path = write_buffer(document.folder, document.path, text)
+        inter = analyzer.parse(path, key[2], False)
+        document.parsed = None
+        if inter is not None:
+            try:
+                document.parsed = (key, pickle.dumps(inter, pickle.HIGHEST_PROTOCOL))
+            except RecursionError:
+                # The representation of deeply nested code can not be pickled
+                pass
+        return inter
+
+    def get_type(self) -> UnitBlockType:
+        try:
+            return UnitBlockType(self.settings.get("type", UnitBlockType.unknown))
+        except ValueError:
+            return UnitBlockType.unknown
+
+    def schedule(self, document: Document, delay: float) -> None:
+        if document.timer is not None:
+            document.timer.cancel()
+        document.timer = threading.Timer(delay, self.__analyze, (document.uri,))
+        document.timer.daemon = True
+        document.timer.start()
+
+    def __analyze(self, uri: str) -> None:
+        try:
+            self.analyze(uri)
+        except Exception as e:
+            self.notify(
+                "window/logMessage",
+                {"type": 1, "message": f"GLITCH - Could not analyze {uri}: {e!r}"},
+            )
+
+    def update_settings(self, settings: Any) -> None:
+        if isinstance(settings, dict) and isinstance(settings.get("glitch"), dict):
+            settings = settings["glitch"]  # type: ignore
+        if not isinstance(settings, dict):
+            return
+
+        self.settings = settings  # type: ignore
+        with self.documents_lock:
+            documents = list(self.documents.values())
+        # The errors found depend on the settings, so every document is analyzed again
+        for document in documents:
+            document.analyzed_hash = None
+            self.schedule(document, 0)
+
+    def initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.initialized = True
+        if params.get("initializationOptions") is not None:
+            self.update_settings(params["initializationOptions"])
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": TEXT_DOCUMENT_SYNC_FULL,
+                    "save": {"includeText": False},
+                }
+            },
+            "serverInfo": {"name": "glitch"},
+        }
+
+    def did_open(self, params: Dict[str, Any]) -> None:
+        item = params["textDocument"]
+        document = Document(item["uri"], item["text"], item.get("version"))
+        with self.documents_lock:
+            self.documents[document.uri] = document
+        self.schedule(document, 0)
+
+    def did_change(self, params: Dict[str, Any]) -> None:
+        with self.documents_lock:
+            document = self.documents.get(params["textDocument"]["uri"])
+            if document is None or len(params["contentChanges"]) == 0:
+                return
+            # The server only supports full synchronization of the documents
+            document.text = params["contentChanges"][-1]["text"]
+            document.version = params["textDocument"].get("version")
+        self.schedule(document, self.debounce)
+
+    def did_save(self, params: Dict[str, Any]) -> None:
+        with self.documents_lock:
+            document = self.documents.get(params["textDocument"]["uri"])
+            if document is None:
+                return
+            if params.get("text") is not None:
+                document.text = params["text"]
+        self.schedule(document, 0)
+
+    def did_close(self, params: Dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        with self.documents_lock:
+            document = self.documents.pop(uri, None)
+        if document is not None:
+            with self.analysis_lock:
+                document.close()
+        self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    def handle(self, message: Any) -> bool:
+        """Handles a message from the client.
+
+        Returns:
+            bool: If the server should exit.
+        """
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            if isinstance(message, dict) and "id" in message:
+                # Responses to requests sent by the server are ignored
+                return False
+            self.send(
+                {
+                    "id": None,
+                    "error": {"code": INVALID_REQUEST, "message": "Invalid request."},
+                }
+            )
+            return False
+
+        method: str = message["method"]
+        params: Dict[str, Any] = message.get("params") or {}
+        is_request = "id" in message
+
+        if method == "exit":
+            return True
+
+        requests: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "initialize": self.initialize,
+            "shutdown": lambda _: setattr(self, "shutdown_requested", True),
+        }
+        notifications: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "initialized": lambda _: None,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didSave": self.did_save,
+            "textDocument/didClose": self.did_close,
+            "workspace/didChangeConfiguration": lambda p: self.update_settings(
+                p.get("settings")
+            ),
+        }
+
+        try:
+            if not self.initialized and method != "initialize":
+                raise RPCError(SERVER_NOT_INITIALIZED, "Server not initialized.")
+            elif method in requests:
+                result = requests[method](params)
+            elif method in notifications:
+                notifications[method](params)
+                result = None
+            elif is_request:
+                raise RPCError(METHOD_NOT_FOUND, f"Method '{method}' not found.")
+            else:
+                # Unknown notifications (e.g. $/setTrace) are ignored
+                result = None
+
+            if is_request:
+                self.send({"id": message["id"], "result": result})
+        except RPCError as e:
+            if is_request:
+                self.send(
+                    {
+                        "id": message["id"],
+                        "error": {"code": e.code, "message": e.message},
+                    }
+                )
+        except (KeyError, TypeError) as e:
+            if is_request:
+                self.send(
+                    {
+                        "id": message["id"],
+                        "error": {"code": INVALID_PARAMS, "message": repr(e)},
+                    }
+                )
+        except Exception as e:
+            if is_request:
+                self.send(
+                    {
+                        "id": message["id"],
+                        "error": {"code": INTERNAL_ERROR, "message": repr(e)},
+                    }
+                )
+
+        return False
+
+    def run(self) -> int:
+        """Handles messages until the client asks the server to exit.
+
+        Returns:
+            int: The exit code of the server.
+        """
+        while True:
+            message = self.read_message()
+            if message is None or self.handle(message):
+                break
+
+        with self.documents_lock, self.analysis_lock:
+            for document in self.documents.values():
+                document.close()
+        return 0 if self.shutdown_requested else 1
+
+
+@click.command(
+    help="Starts a Language Server Protocol server, which communicates through "
+    "stdin and stdout, that publishes the smells found by GLITCH as diagnostics."
+)
+@click.option(
+    "--debounce",
+    type=click.IntRange(min=0),
+    default=300,
+    help="Time in milliseconds that the server waits after a change to a document "
+    "before analyzing it. Defaults to 300.",
+)
+def lsp(debounce: int) -> None:
+    # The messages are the only output written to stdout, so that other
+    # prints (e.g. from the parsers) do not break the protocol
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        server = LanguageServer(
+            sys.stdin.buffer, stdout.buffer, debounce / 1000  # type: ignore
+        )
+        code = server.run()
+    finally:
+        sys.stdout = stdout
+    sys.exit(code)
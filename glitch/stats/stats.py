@@ -3,6 +3,7 @@ from typing import Union, Set
 from abc import ABC, abstractmethod
 
 from glitch.repr.inter import *
+from glitch.repr.source import get_source
 
 CodeElementDict = dict[
     Union["CodeElementDict", CodeElement], Union["CodeElementDict", CodeElement]
@@ -77,6 +78,12 @@ class FileStats(Stats):
         self.files: Set[str] = set()
         self.loc = 0
 
+    def merge(self, other: "FileStats") -> None:
+        """Adds the stats computed by other (e.g. in a different process) to
+        these stats. Both stats are expected to be computed on different files."""
+        self.files.update(other.files)
+        self.loc += other.loc
+
     def compute_project(self, p: Project) -> None:
         for m in p.modules:
             self.compute(m)
@@ -88,19 +95,17 @@ class FileStats(Stats):
             self.compute(u)
         if os.path.isfile(m.path) and m.path not in self.files:
             self.files.add(m.path)
-            with open(m.path, "r") as f:
-                self.loc += len(f.readlines())
+            self.loc += len(get_source(m.path))
 
     def compute_unitblock(self, u: UnitBlock) -> None:
         for ub in u.unit_blocks:
             self.compute(ub)
         if os.path.isfile(u.path) and u.path not in self.files:
             self.files.add(u.path)
-            with open(u.path, "r") as f:
-                try:
-                    self.loc += len(f.readlines())
-                except UnicodeDecodeError:
-                    pass
+            try:
+                self.loc += len(get_source(u.path))
+            except UnicodeDecodeError:
+                pass
 
     def compute_atomicunit(self, au: AtomicUnit) -> None:
         pass
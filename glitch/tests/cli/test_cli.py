@@ -1,10 +1,16 @@
+import os
 import csv
+import json
+import shutil
 import subprocess
+import glitch.cache as cache
 import glitch.__main__ as glitch
 
 from typing import Callable, Set, Tuple, List
+from unittest.mock import patch
 from glitch.tech import Tech
-from tempfile import NamedTemporaryFile
+from glitch.cache import DiskCache, FileHashes, hash_path
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 
 
 def test_cli_help():
@@ -46,6 +52,7 @@ def test_cli_analyze():
                 "chef",
                 "--folder-strategy",
                 "include-all",
+                "--no-cache",
                 "--csv",
                 "tests/cli/resources/chef_project",
                 f.name,
@@ -82,3 +89,302 @@ def test_cli_analyze():
             "user:'root'",
             "-",
         ]
+
+
+def test_cli_analyze_process_executor():
+    with NamedTemporaryFile() as f:
+        run = subprocess.run(
+            [
+                "glitch",
+                "--tech",
+                "chef",
+                "--folder-strategy",
+                "include-all",
+                "--executor",
+                "process",
+                "--n-workers",
+                "2",
+                "--no-cache",
+                "--csv",
+                "tests/cli/resources/chef_project",
+                f.name,
+            ],
+            capture_output=True,
+        )
+        assert run.returncode == 0
+        assert b"Lines of Code" in run.stdout
+        assert b"12" in run.stdout
+
+        with open(f.name, "r") as f:
+            rows = list(csv.reader(f))
+
+        assert [row[2] for row in rows] == [
+            "sec_def_admin",
+            "sec_hard_secr",
+            "sec_hard_user",
+        ]
+
+
+def test_cli_analyze_thread_executor():
+    # The parsers are shared by the threads, so the errors must be the same
+    # as in a single thread
+    for tech in ["puppet", "terraform", "docker"]:
+        outputs: List[List[List[str]]] = []
+        for n_workers in ["1", "8"]:
+            with NamedTemporaryFile() as f:
+                run = subprocess.run(
+                    [
+                        "glitch",
+                        "--tech",
+                        tech,
+                        "--folder-strategy",
+                        "include-all",
+                        "--n-workers",
+                        n_workers,
+                        "--no-cache",
+                        "--csv",
+                        "tests",
+                        f.name,
+                    ],
+                    capture_output=True,
+                )
+                assert run.returncode == 0
+
+                with open(f.name, "r") as f:
+                    outputs.append(sorted(csv.reader(f)))
+
+        assert len(outputs[0]) > 0
+        assert outputs[0] == outputs[1]
+
+
+def test_cli_analyze_cache():
+    with TemporaryDirectory() as cache_dir:
+        runs: List[subprocess.CompletedProcess[bytes]] = []
+        for _ in range(2):
+            runs.append(
+                subprocess.run(
+                    [
+                        "glitch",
+                        "--tech",
+                        "chef",
+                        "--folder-strategy",
+                        "include-all",
+                        "--cache-dir",
+                        cache_dir,
+                        "--csv",
+                        "tests/cli/resources/chef_project",
+                    ],
+                    capture_output=True,
+                )
+            )
+            assert runs[-1].returncode == 0
+
+        # The findings and the parsed file are cached
+        for cache in ["findings", "ir"]:
+            folder = os.path.join(cache_dir, cache)
+            entries = [files for _, _, files in os.walk(folder) if files != []]
+            assert len(entries) == 1 and len(entries[0]) == 1
+        assert runs[0].stdout == runs[1].stdout
+        assert b"sec_hard_user" in runs[1].stdout
+
+
+def test_cli_cache_hash_path():
+    with TemporaryDirectory() as project:
+        os.makedirs(os.path.join(project, ".git"))
+        shutil.copy(
+            "tests/cli/resources/chef_project/test.rb", os.path.join(project, "test.rb")
+        )
+        digest = hash_path(project, Tech.chef)
+
+        # Files that are not parsed and version control folders are ignored
+        with open(os.path.join(project, "README.md"), "w") as f:
+            f.write("readme\n")
+        with open(os.path.join(project, ".git", "index.rb"), "w") as f:
+            f.write("index\n")
+        assert hash_path(project, Tech.chef) == digest
+
+        with open(os.path.join(project, "test.rb"), "a") as f:
+            f.write("# changed\n")
+        assert hash_path(project, Tech.chef) != digest
+
+
+def test_cli_cache_file_hashes():
+    with TemporaryDirectory() as cache_dir, TemporaryDirectory() as project:
+        path = os.path.join(project, "test.rb")
+        shutil.copy("tests/cli/resources/chef_project/test.rb", path)
+        # Recently modified files are not indexed
+        os.utime(path, (0, 0))
+        digest = hash_path(path, Tech.chef)
+        assert FileHashes(cache_dir, 1 << 20).hash_file(path) == digest
+
+        # The content is only read again after the size or time change
+        with patch.object(cache, "hash_file", side_effect=cache.hash_file) as m:
+            assert FileHashes(cache_dir, 1 << 20).hash_file(path) == digest
+            assert m.call_count == 0
+            with open(path, "a") as f:
+                f.write("# changed\n")
+            os.utime(path, (1, 1))
+            assert FileHashes(cache_dir, 1 << 20).hash_file(path) != digest
+            assert m.call_count == 1
+
+
+def test_cli_cache_prune():
+    with TemporaryDirectory() as cache_dir:
+        disk_cache = DiskCache(cache_dir, 0)
+        disk_cache.put("ab" * 32, b"value")
+        disk_cache.prune()
+        assert disk_cache.get("ab" * 32) is None
+
+        # Nothing is evicted if nothing was written since the last prune
+        os.makedirs(os.path.join(cache_dir, "ef"))
+        with open(os.path.join(cache_dir, "ef", "ef" * 32), "wb") as f:
+            f.write(b"value")
+        disk_cache.prune()
+        assert disk_cache.get("ef" * 32) == b"value"
+
+
+def test_cli_analyze_profile():
+    with NamedTemporaryFile() as f:
+        run = subprocess.run(
+            [
+                "glitch",
+                "--tech",
+                "chef",
+                "--folder-strategy",
+                "include-all",
+                "--executor",
+                "process",
+                "--no-cache",
+                "--profile-output",
+                f.name,
+                "tests/cli/resources/chef_project",
+            ],
+            capture_output=True,
+        )
+        assert run.returncode == 0
+        assert b"Mean time (ms)" in run.stdout
+
+        with open(f.name, "r") as f:
+            profile = json.load(f)
+
+        stages = {(r["phase"], r["name"]): r["calls"] for r in profile}
+        assert stages[("run", "total")] == 1
+        assert stages[("discovery", "include-all")] == 1
+        # The profiles of the worker processes are merged
+        assert stages[("parse", "chef")] == 1
+        assert stages[("parse", "ruby (ripper)")] == 1
+        assert stages[("analysis", "design, security")] == 1
+        assert stages[("checker", "ChefMisplacedAttribute")] >= 1
+        assert stages[("stats", "FileStats.compute")] == 1
+        assert stages[("output", "stats")] == 1
+        assert profile == sorted(profile, key=lambda r: -r["total"])
+
+
+def test_cli_filter_changed_paths():
+    __filter_changed_paths: Callable[
+        [str, str, Tech, Set[str], bool, Set[str]], Tuple[Set[str], bool]
+    ] = getattr(glitch, "__filter_changed_paths")
+
+    with TemporaryDirectory() as project:
+        for file in [
+            "site.yml",
+            "roles/web/tasks/main.yml",
+            "roles/db/tasks/main.yml",
+            "roles/db/README.md",
+        ]:
+            os.makedirs(os.path.join(project, os.path.dirname(file)), exist_ok=True)
+            open(os.path.join(project, file), "w").close()
+        root = os.path.realpath(project)
+
+        paths, module = __filter_changed_paths(
+            "project",
+            project,
+            Tech.ansible,
+            {project},
+            False,
+            {
+                os.path.join(root, "roles/web/tasks/main.yml"),
+                os.path.join(root, "roles/db/README.md"),
+            },
+        )
+        assert paths == {os.path.join(project, "roles", "web")}
+        assert module
+
+        paths, module = __filter_changed_paths(
+            "project",
+            project,
+            Tech.ansible,
+            {project},
+            False,
+            {
+                os.path.join(root, "roles/web/tasks/main.yml"),
+                os.path.join(root, "site.yml"),
+            },
+        )
+        assert paths == {project}
+        assert not module
+
+        paths, _ = __filter_changed_paths(
+            "project",
+            project,
+            Tech.ansible,
+            {project},
+            False,
+            {os.path.join(root, "roles/db/README.md")},
+        )
+        assert paths == set()
+
+        # The modules of deleted files are analyzed, unless they were deleted
+        paths, module = __filter_changed_paths(
+            "project",
+            project,
+            Tech.ansible,
+            {project},
+            False,
+            {
+                os.path.join(root, "roles/db/tasks/deleted.yml"),
+                os.path.join(root, "roles/deleted/tasks/main.yml"),
+            },
+        )
+        assert paths == {os.path.join(project, "roles", "db")}
+        assert module
+
+
+def test_cli_analyze_changed_since():
+    with TemporaryDirectory() as project:
+        for name in ["changed.rb", "unchanged.rb", "deleted.rb"]:
+            shutil.copy(
+                "tests/cli/resources/chef_project/test.rb", os.path.join(project, name)
+            )
+
+        def git(*args: str) -> None:
+            subprocess.run(
+                ["git", "-C", project, *args], check=True, capture_output=True
+            )
+
+        git("init")
+        git("add", ".")
+        git("-c", "user.name=test", "-c", "user.email=test", "commit", "-m", "init")
+        with open(os.path.join(project, "changed.rb"), "a") as f:
+            f.write("# changed\n")
+        os.remove(os.path.join(project, "deleted.rb"))
+
+        run = subprocess.run(
+            [
+                "glitch",
+                "--tech",
+                "chef",
+                "--folder-strategy",
+                "include-all",
+                "--changed-since",
+                "HEAD",
+                "--no-cache",
+                "--csv",
+                project,
+            ],
+            capture_output=True,
+        )
+        assert run.returncode == 0
+        assert b"changed.rb" in run.stdout
+        assert b"unchanged.rb" not in run.stdout
+        assert b"deleted.rb" not in run.stdout
@@ -6,9 +6,11 @@ from glitch.tech import Tech
 
 
 class TestDesign(unittest.TestCase):
-    def __help_test(self, path, n_errors: int, codes, lines) -> None:
+    def __help_test(
+        self, path, n_errors: int, codes, lines, module: bool = False
+    ) -> None:
         parser = TerraformParser()
-        inter = parser.parse(path, "script", False)
+        inter = parser.parse(path, "script", module)
         analysis = DesignVisitor(Tech.terraform)
         analysis.config("configs/default.ini")
         errors = list(
@@ -51,6 +53,15 @@ class TestDesign(unittest.TestCase):
             [1, 10],
         )
 
+    def test_terraform_duplicate_block_files(self) -> None:
+        self.__help_test(
+            "tests/design/terraform/files/duplicate_block_files",
+            1,
+            ["design_duplicate_block"],
+            [1],
+            module=True,
+        )
+
     def test_terraform_avoid_comments(self) -> None:
         self.__help_test(
             "tests/design/terraform/files/avoid_comments.tf",
@@ -0,0 +1,17 @@
+import unittest
+from glitch.parsers.ripper_parser import parser_yacc
+
+
+class TestRipperParser(unittest.TestCase):
+    def test_ripper_parser_after_error(self) -> None:
+        # The input ends in the middle of an id
+        with self.assertRaises(Exception):
+            parser_yacc("[:foo")
+        self.assertEqual(
+            parser_yacc('[:program, [[:@int, "1", [1, 0]]]]'),
+            ([], [("id", "program"), [[("id", "@int"), "1", [1, 0]]]]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from threading import Thread
+from typing import List
+from glitch.parsers.ripper_parser import parser_yacc
+from glitch.parsers.ripper_worker import RipperError, RipperPool
+
+
+class TestRipperWorker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pool = RipperPool(2)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+
+    def test_ripper_comments_and_sexp(self) -> None:
+        comments, sexp = self.pool.ripper("tests/hierarchical/chef/vars.rb")
+        self.assertEqual(parser_yacc(comments)[0], [])
+        program = parser_yacc(sexp)[1]
+        self.assertEqual(program[0], ("id", "program"))
+
+    def test_ripper_missing_file(self) -> None:
+        with self.assertRaises(RipperError):
+            self.pool.ripper("tests/parser/chef/files/missing.rb")
+        # The worker is still used after an error
+        self.assertEqual(len(self.pool.workers), 1)
+        self.pool.ripper("tests/hierarchical/chef/vars.rb")
+        self.assertEqual(len(self.pool.workers), 1)
+
+    def test_ripper_worker_crash(self) -> None:
+        self.pool.ripper("tests/hierarchical/chef/vars.rb")
+        worker = self.pool.workers[0]
+        worker.process.kill()
+        worker.process.wait()
+
+        with self.assertRaises(RipperError):
+            self.pool.ripper("tests/hierarchical/chef/vars.rb")
+        # The worker that crashed is replaced
+        self.assertNotIn(worker, self.pool.workers)
+        self.pool.ripper("tests/hierarchical/chef/vars.rb")
+
+    def test_ripper_pool_size(self) -> None:
+        errors: List[Exception] = []
+
+        def ripper() -> None:
+            try:
+                for _ in range(5):
+                    self.pool.ripper("tests/hierarchical/chef/vars.rb")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [Thread(target=ripper) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(self.pool.workers), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
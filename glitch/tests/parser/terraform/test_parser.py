@@ -1,5 +1,10 @@
+import json
 import unittest
+from tempfile import TemporaryDirectory
+from glitch.cache import IRCache
 from glitch.parsers.terraform import TerraformParser
+from glitch.repr.inter import UnitBlockType
+from glitch.tech import Tech
 from typing import Sequence
 
 
@@ -62,3 +67,18 @@ class TestTerraform(unittest.TestCase):
     def test_terraform_comments(self) -> None:
         comments = "[#comment1\n, //comment2\n, /*comment3\n  default_table_expiration_ms = 3600000\n  \n  finish comment3 */, #comment4\n, #comment5\n, #comment inside dict\n, //comment2 inside dict\n]"
         self.__help_test_comments("tests/parser/terraform/files/comments.tf", comments)
+
+    def test_terraform_cache(self) -> None:
+        path = "tests/parser/terraform/files/dict_value_assign.tf"
+        unitblock = TerraformParser().parse_file(path, UnitBlockType.script)
+        with TemporaryDirectory() as cache_dir:
+            parser = TerraformParser()
+            parser.cache = IRCache(cache_dir, 1 << 20, Tech.terraform)
+            parser.parse_file(path, UnitBlockType.script)
+            # The file is not parsed again
+            parser._parse_file = None  # type: ignore
+            cached = parser.parse_file(path, UnitBlockType.script)
+        self.assertIsNotNone(cached)
+        self.assertEqual(
+            json.dumps(cached.as_dict()), json.dumps(unitblock.as_dict())  # type: ignore
+        )
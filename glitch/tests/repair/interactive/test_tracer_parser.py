@@ -238,3 +238,20 @@ def test_tracer_parser_chdir() -> None:
     assert parsed.cmd == "chdir"
     assert parsed.args == ["/home/test"]
     assert parsed.exitCode == 0
+
+
+def test_tracer_parser_threads() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    lines = [
+        f'[pid {i}] openat(AT_FDCWD, "/tmp/test{i}", O_RDWR|O_CREAT, 0644) = {i}'
+        for i in range(200)
+    ]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        parsed = list(pool.map(parse_tracer_output, lines))
+
+    for i, syscall in enumerate(parsed):
+        assert isinstance(syscall, Syscall)
+        assert syscall.args[1] == f"/tmp/test{i}"
+        assert syscall.args[2] == [OpenFlag.O_RDWR, OpenFlag.O_CREAT]
+        assert syscall.exitCode == i
@@ -0,0 +1,75 @@
+import unittest
+from glitch.repr.inter import *
+
+
+class TestAttributeIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        # settings { database_flags { name = "a" } }
+        # dynamic.settings { database_flags { database_flags = "b" } }
+        # database_flags { name = "c" }
+        # actions[0] = "s3:*", actions[1] = "*"
+        self.au = AtomicUnit("db", "resource.google_sql_database_instance")
+        for setting, flag_attr, flag_value in [
+            ("settings", "name", "a"),
+            ("dynamic.settings", "database_flags", "b"),
+        ]:
+            settings = Attribute(setting, None, False)  # type: ignore
+            flags = KeyValue("database_flags", None, False)
+            flags.keyvalues = [KeyValue(flag_attr, flag_value, False)]
+            settings.keyvalues = [flags]
+            self.au.add_attribute(settings)
+        flags = Attribute("database_flags", None, False)  # type: ignore
+        flags.keyvalues = [KeyValue("name", "c", False)]
+        self.au.add_attribute(flags)
+        self.au.add_attribute(Attribute("actions[0]", "s3:*", False))
+        self.au.add_attribute(Attribute("actions[1]", "*", False))
+
+    def test_attribute_index_names(self) -> None:
+        index = self.au.get_attribute_index()
+        self.assertIs(index, self.au.get_attribute_index())
+        self.assertEqual([a.value for a in index.get([""], "name")], ["a", "c"])
+        # Attributes are not indexed inside attributes with the same name
+        self.assertEqual(
+            [a.value for a in index.get([""], "database_flags")], [None, None, None]
+        )
+        self.assertEqual(index.get([""], "actions[1]")[0].value, "*")
+        self.assertEqual(index.get([""], "actions[2]"), [])
+
+    def test_attribute_index_parents(self) -> None:
+        index = self.au.get_attribute_index()
+        flags = index.get(["settings"], "database_flags")
+        self.assertEqual(len(flags), 2)
+        self.assertEqual(flags[1].keyvalues[0].value, "b")
+        self.assertEqual(
+            [a.value for a in index.get(["settings", "database_flags"], "name")],
+            ["a", "c"],
+        )
+        self.assertIs(
+            index.get(["settings"], "database_flags"),
+            index.get(["settings"], "database_flags"),
+        )
+
+    def test_attribute_index_normalized(self) -> None:
+        au = AtomicUnit("bucket", "resource.aws_s3_bucket")
+        au.add_attribute(Attribute(" ACL", "private", False))
+        versioning = Attribute("Versioning", None, False)  # type: ignore
+        versioning.keyvalues = [KeyValue("Enabled", "true", False)]
+        au.add_attribute(versioning)
+        index = au.get_attribute_index()
+        self.assertEqual(index.get([""], "acl"), [au.attributes[0]])
+        self.assertEqual(
+            index.get(["versioning"], "enabled"), [versioning.keyvalues[0]]
+        )
+
+        # The security visitor normalizes the names after the index is built
+        for kv in [au.attributes[0], versioning, versioning.keyvalues[0]]:
+            kv.name = kv.name.strip().lower()
+        self.assertIs(index, au.get_attribute_index())
+        self.assertEqual(index.get([""], "acl"), [au.attributes[0]])
+        self.assertEqual(
+            index.get(["versioning"], "enabled"), [versioning.keyvalues[0]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
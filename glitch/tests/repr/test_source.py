@@ -0,0 +1,103 @@
+import os
+import pickle
+import unittest
+from tempfile import TemporaryDirectory
+from glitch.repr.inter import Attribute, Source
+from glitch.repr.source import SourceRegistry
+
+
+class TestSource(unittest.TestCase):
+    def setUp(self) -> None:
+        self.lines = ["a = 1\n", "\n", "b = {\n", "  c = 2\n", "}"]
+        self.source = Source("".join(self.lines), "main.tf")
+
+    def test_source_lines(self) -> None:
+        self.assertEqual(len(self.source), len(self.lines))
+        self.assertEqual(list(self.source), self.lines)
+        self.assertEqual(self.source[-1], "}")
+        with self.assertRaises(IndexError):
+            self.source[len(self.lines)]
+
+    def test_source_lines_span(self) -> None:
+        for start in range(-1, len(self.lines) + 2):
+            for end in range(-1, len(self.lines) + 2):
+                s, e = self.source.lines_span(start, end)
+                self.assertEqual(self.source.text[s:e], "".join(self.lines[start:end]))
+
+    def test_source_span(self) -> None:
+        s, e = self.source.span(2, 4, 3, 7)
+        self.assertEqual(self.source.text[s:e], "{\n  c = 2")
+        s, e = self.source.span(3, 2, 3, 100)
+        self.assertEqual(self.source.text[s:e], "c = 2\n")
+        s, e = self.source.span(3, 2, 3, -1)
+        self.assertEqual(self.source.text[s:e], "c = 2")
+        s, e = self.source.span(3, 2, 2, 0)
+        self.assertEqual(s, e)
+
+    def test_source_code_element(self) -> None:
+        a = Attribute("c", "2", False)
+        a.set_span(self.source, *self.source.lines_span(3, 4))
+        self.assertEqual(a.code, "  c = 2\n")
+        self.assertEqual(a.as_dict()["code"], "  c = 2\n")
+        self.assertEqual(pickle.loads(pickle.dumps(a)).code, "  c = 2\n")
+        a.code = "c = 3"
+        self.assertEqual(a.code, "c = 3")
+
+    def test_source_line_metrics(self) -> None:
+        source = Source("# a\n#\tb\n\n\tc = 1 # d\n//", "main.tf")
+        metrics = source.get_line_metrics("#")
+        self.assertIs(source.get_line_metrics("#"), metrics)
+        self.assertEqual(metrics.lengths.tolist(), [len(l) for l in source])
+        self.assertEqual(metrics.tab_lines.tolist(), [1, 3])
+        self.assertEqual(
+            metrics.comment_lines.tolist(), [True, True, False, False, False]
+        )
+        self.assertEqual(metrics.first_code_line, 3)
+        self.assertEqual(metrics.loc, 5)
+        metrics = source.get_line_metrics("//")
+        self.assertEqual(
+            metrics.comment_lines.tolist(), [False, False, False, False, True]
+        )
+        self.assertEqual(metrics.first_code_line, 1)
+        self.assertIsNone(Source("# a").get_line_metrics("#").first_code_line)
+        self.assertEqual(Source("").get_line_metrics("#").loc, 0)
+
+
+class TestSourceRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = TemporaryDirectory()
+        self.registry = SourceRegistry(2)
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def __write(self, name: str, text: str) -> str:
+        path = os.path.join(self.folder.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_registry_reads_once(self) -> None:
+        path = self.__write("a.tf", "a = 1\n")
+        source = self.registry.get(path)
+        self.assertEqual(list(source), ["a = 1\n"])
+        self.assertIs(self.registry.get(path), source)
+
+    def test_registry_modified_file(self) -> None:
+        path = self.__write("a.tf", "a = 1\n")
+        self.registry.get(path)
+        self.__write("a.tf", "a = 1\nb = 2\n")
+        self.assertEqual(len(self.registry.get(path)), 2)
+
+    def test_registry_lru(self) -> None:
+        paths = [self.__write(f"{i}.tf", f"{i}\n") for i in range(3)]
+        first = self.registry.get(paths[0])
+        self.registry.get(paths[1])
+        self.registry.get(paths[0])
+        self.registry.get(paths[2])
+        self.assertEqual(len(self.registry.sources), 2)
+        self.assertIs(self.registry.get(paths[0]), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
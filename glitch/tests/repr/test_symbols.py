@@ -0,0 +1,47 @@
+import unittest
+from glitch.repr.inter import *
+
+
+class TestSymbolIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.module = Module("vpc", "vpc")
+        for i in range(2):
+            ub = UnitBlock(f"main{i}.tf", UnitBlockType.script)
+            ub.add_atomic_unit(AtomicUnit("bucket", "resource.aws_s3_bucket"))
+            ub.add_atomic_unit(AtomicUnit(f"log{i}", "resource.aws_s3_bucket"))
+            ub.add_variable(Variable("region", f"eu-west-{i}", False))
+            self.module.add_block(ub)
+
+    def test_symbols_first_definition(self) -> None:
+        symbols = self.module.get_symbols()
+        au = symbols.get_atomic_unit("resource.aws_s3_bucket", "bucket")
+        self.assertIs(au, self.module.blocks[0].atomic_units[0])
+        variable = symbols.get_variable("region")
+        self.assertIs(variable, self.module.blocks[0].variables[0])
+        self.assertIsNone(symbols.get_atomic_unit("resource.aws_vpc", "bucket"))
+        self.assertIsNone(symbols.get_variable("zone"))
+
+    def test_symbols_by_type(self) -> None:
+        symbols = self.module.get_symbols()
+        self.assertEqual(
+            [au.name for au in symbols.get_atomic_units("resource.aws_s3_bucket")],
+            ["bucket", "log0", "bucket", "log1"],
+        )
+        self.assertEqual(symbols.get_atomic_units("resource.aws_vpc"), [])
+
+    def test_symbols_unit_block(self) -> None:
+        ub = self.module.blocks[1]
+        au = ub.get_symbols().get_atomic_unit("resource.aws_s3_bucket", "log1")
+        self.assertIs(au, ub.atomic_units[1])
+        self.assertIs(ub.get_symbols(), ub.get_symbols())
+
+    def test_project_get_module(self) -> None:
+        project = Project("infra")
+        project.add_module(self.module)
+        project.add_module(Module("vpc", "other/vpc"))
+        self.assertIs(project.get_module("vpc"), self.module)
+        self.assertIsNone(project.get_module("eks"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from glitch.analysis.terraform.smell_checker import ReferenceGraph
+from glitch.repr.inter import *
+
+
+class TestReferenceGraph(unittest.TestCase):
+    def setUp(self) -> None:
+        self.unit_block = UnitBlock("main.tf", UnitBlockType.script)
+        policy = AtomicUnit("policy", "resource.aws_s3_bucket_policy")
+        policy.attributes = [Attribute("bucket", "${aws_s3_bucket.Logs.id}", True)]
+        flow_log = AtomicUnit("flow", "resource.aws_flow_log")
+        settings = Attribute("settings", None, False)  # type: ignore
+        settings.keyvalues = [Attribute("vpc_id", "${aws_vpc.main.id}", True)]
+        nested = Attribute("vpc_id", None, False)  # type: ignore
+        nested.keyvalues = [Attribute("vpc_id", "${aws_vpc.other.id}", True)]
+        flow_log.attributes = [settings, nested, Attribute("name", "${var.name}", True)]
+        # Mixed-case names and values, and a reference through a local value
+        block = AtomicUnit("block", "resource.aws_s3_bucket_public_access_block")
+        block.attributes = [Attribute(" Bucket", "${AWS_S3_BUCKET.Data.id}", True)]
+        logging = AtomicUnit("logging", "resource.aws_s3_bucket_logging")
+        logging.attributes = [Attribute("bucket", "${local.bucket_name}", True)]
+        self.unit_block.add_variable(
+            Variable("bucket_name", "${aws_s3_bucket.logs.id}", True)
+        )
+        for au in [policy, flow_log, block, logging]:
+            self.unit_block.add_atomic_unit(au)
+        self.references = ReferenceGraph(self.unit_block)
+
+    def test_references(self) -> None:
+        aus = self.references.get_referencing_aus(
+            "resource.aws_s3_bucket_policy", "bucket", "aws_s3_bucket", "logs"
+        )
+        self.assertEqual(aus, [self.unit_block.atomic_units[0]])
+        aus = self.references.get_referencing_aus(
+            "resource.aws_flow_log", "vpc_id", "aws_vpc", "main"
+        )
+        self.assertEqual(aus, [self.unit_block.atomic_units[1]])
+
+    def test_references_normalized(self) -> None:
+        aus = self.references.get_referencing_aus(
+            "resource.aws_s3_bucket_public_access_block",
+            "bucket",
+            "aws_s3_bucket",
+            "data",
+        )
+        self.assertEqual(aus, [self.unit_block.atomic_units[2]])
+        aus = self.references.get_referencing_aus(
+            "resource.aws_s3_bucket_logging", "bucket", "aws_s3_bucket", "logs"
+        )
+        self.assertEqual(aus, [self.unit_block.atomic_units[3]])
+
+    def test_no_references(self) -> None:
+        # Attributes are not searched inside attributes with the same name
+        self.assertEqual(
+            self.references.get_referencing_aus(
+                "resource.aws_flow_log", "vpc_id", "aws_vpc", "other"
+            ),
+            [],
+        )
+        # References need the attribute of the referenced resource
+        self.assertEqual(
+            self.references.get_referencing_aus(
+                "resource.aws_flow_log", "name", "var", "name"
+            ),
+            [],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import unittest
+import glitch.analysis.rules as rules
+
+from typing import List
+from unittest.mock import patch
+from glitch.analysis.rules import Error, RuleVisitor
+from glitch.analyzer import get_analyses, get_config, get_parser
+from glitch.repr.inter import UnitBlockType
+from glitch.tech import Tech
+
+
+class TestCheckAll(unittest.TestCase):
+    def __help_test(self, tech: Tech, folder: str) -> None:
+        parser = get_parser(tech)
+        analyses = get_analyses(tech, get_config(tech), ())
+        for file in sorted(os.listdir(folder)):
+            path = os.path.join(folder, file)
+            if not os.path.isfile(path):
+                continue
+
+            # The visitors change the representation, so each run has its own
+            separate: List[Error] = []
+            inter = parser.parse(path, UnitBlockType.script, False)
+            assert inter is not None
+            for analysis in analyses:
+                separate += analysis.check(inter)
+            inter = parser.parse(path, UnitBlockType.script, False)
+            assert inter is not None
+            fused = RuleVisitor.check_all(analyses, inter)
+
+            self.assertEqual(
+                sorted(e.to_csv() for e in fused),
+                sorted(e.to_csv() for e in separate),
+                path,
+            )
+
+    def test_check_all_puppet(self) -> None:
+        self.__help_test(Tech.puppet, "tests/security/puppet/files")
+        self.__help_test(Tech.puppet, "tests/design/puppet/files")
+
+    def test_check_all_single_walk(self) -> None:
+        parser = get_parser(Tech.puppet)
+        analyses = get_analyses(Tech.puppet, get_config(Tech.puppet), ())
+        inter = parser.parse(
+            "tests/security/puppet/files/admin.pp", UnitBlockType.script, False
+        )
+        assert inter is not None
+        walk = getattr(rules, "_Walk")
+        with patch.object(walk, "walk", autospec=True, side_effect=walk.walk) as m:
+            RuleVisitor.check_all(analyses, inter)
+        # The code is walked once, for all the visitors
+        m.assert_called_once()
+
+    def test_check_all_terraform(self) -> None:
+        self.__help_test(Tech.terraform, "tests/security/terraform/files")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from glitch.helpers import KeywordAutomaton
+from glitch.analysis.security import SecurityVisitor
+
+
+class TestKeywords(unittest.TestCase):
+    def test_keyword_automaton(self) -> None:
+        automaton = KeywordAutomaton(["pass", "password", "sword", "user", "word"])
+        self.assertEqual(
+            automaton.search("db_password"), {"pass", "password", "sword", "word"}
+        )
+        self.assertEqual(automaton.search("usr_passwd"), {"pass"})
+        self.assertEqual(automaton.search("name"), set())
+        self.assertEqual(KeywordAutomaton([]).search("password"), set())
+
+    def test_keyword_list(self) -> None:
+        keywords = SecurityVisitor.KeywordList(
+            ["pass", "user", "pass", "user.name"], r"[_A-Za-z0-9$\/\.\[\]-]*{text}\b"
+        )
+        automaton = KeywordAutomaton(keywords.keywords)
+        name = "db_pass"
+        self.assertEqual(keywords.match(name, automaton.search(name)), ["pass", "pass"])
+        # "user.name" is a regex, so it is matched without being found
+        name = "user_name"
+        self.assertEqual(keywords.match(name, automaton.search(name)), ["user.name"])
+        name = "password"
+        self.assertEqual(keywords.match(name, automaton.search(name)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
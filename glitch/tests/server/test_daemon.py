@@ -0,0 +1,93 @@
+import json
+import tempfile
+import subprocess
+
+from typing import Any, Dict, List
+
+
+def __run_server(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    run = subprocess.run(
+        ["glitch", "serve"],
+        input="\n".join(json.dumps(r) for r in requests) + "\n",
+        capture_output=True,
+        text=True,
+    )
+    assert run.returncode == 0
+    return [json.loads(line) for line in run.stdout.splitlines()]
+
+
+def test_daemon_analyze():
+    with open("tests/cli/resources/chef_project/test.rb") as f:
+        text = f.read()
+
+    responses = __run_server(
+        [
+            {"jsonrpc": "2.0", "id": 1, "method": "ping"},
+            {
+                "jsonrpc": "2.0",
+                "id": 2,
+                "method": "analyze",
+                "params": {
+                    "tech": "chef",
+                    "path": "tests/cli/resources/chef_project/test.rb",
+                },
+            },
+            {
+                "jsonrpc": "2.0",
+                "id": 3,
+                "method": "analyze",
+                "params": {"tech": "chef", "path": "unsaved/recipe.rb", "text": text},
+            },
+            {"jsonrpc": "2.0", "method": "ping"},
+            {"jsonrpc": "2.0", "id": 4, "method": "shutdown"},
+            {"jsonrpc": "2.0", "id": 5, "method": "ping"},
+        ]
+    )
+
+    assert [r["id"] for r in responses] == [1, 2, 3, 4]
+    assert responses[0]["result"] == "pong"
+
+    errors = responses[1]["result"]["errors"]
+    assert [e["code"] for e in errors] == [
+        "sec_def_admin",
+        "sec_hard_secr",
+        "sec_hard_user",
+    ]
+    assert errors[0]["path"] == "tests/cli/resources/chef_project/test.rb"
+    assert errors[0]["line"] == 8
+
+    errors = responses[2]["result"]["errors"]
+    assert len(errors) == 3
+    assert all(e["path"] == "unsaved/recipe.rb" for e in errors)
+
+
+def test_daemon_invalid_requests():
+    responses = __run_server(
+        [
+            {"jsonrpc": "2.0", "id": 1, "method": "unknown"},
+            {"jsonrpc": "2.0", "id": 2, "method": "analyze", "params": {"tech": "x"}},
+            {
+                "jsonrpc": "2.0",
+                "id": 3,
+                "method": "analyze",
+                "params": {"tech": "chef", "path": "does/not/exist.rb"},
+            },
+        ]
+    )
+
+    assert responses[0]["error"]["code"] == -32601
+    assert responses[1]["error"]["code"] == -32602
+    assert responses[2]["error"]["code"] == -32602
+
+
+def test_daemon_socket_not_replaced():
+    with tempfile.NamedTemporaryFile("w", suffix=".sock") as f:
+        f.write("content")
+        f.flush()
+        run = subprocess.run(
+            ["glitch", "serve", "--socket", f.name], capture_output=True, text=True
+        )
+        assert run.returncode != 0
+        assert "is not a socket" in run.stderr
+        with open(f.name) as g:
+            assert g.read() == "content"
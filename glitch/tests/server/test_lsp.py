@@ -0,0 +1,144 @@
+import io
+import os
+import json
+import subprocess
+
+from typing import Any, Dict, IO
+from unittest.mock import patch
+from glitch.analyzer import Analyzer
+from glitch.server.lsp import LanguageServer, get_document_tech
+from glitch.tech import Tech
+
+
+def __send(input: IO[bytes], message: Dict[str, Any]) -> None:
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+    input.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    input.flush()
+
+
+def __receive(output: IO[bytes]) -> Dict[str, Any]:
+    length = 0
+    while True:
+        line = output.readline().decode().strip()
+        if line == "":
+            break
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":")[1])
+    return json.loads(output.read(length))
+
+
+def test_lsp_diagnostics():
+    with open("tests/cli/resources/chef_project/test.rb") as f:
+        text = f.read()
+    uri = "file:///unsaved/recipes/default.rb"
+
+    server = subprocess.Popen(
+        ["glitch", "lsp", "--debounce", "0"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    assert server.stdin is not None and server.stdout is not None
+
+    __send(server.stdin, {"id": 1, "method": "initialize", "params": {}})
+    response = __receive(server.stdout)
+    assert response["id"] == 1
+    assert response["result"]["capabilities"]["textDocumentSync"]["change"] == 1
+    __send(server.stdin, {"method": "initialized", "params": {}})
+
+    __send(
+        server.stdin,
+        {
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {
+                    "uri": uri,
+                    "languageId": "ruby",
+                    "version": 1,
+                    "text": text,
+                }
+            },
+        },
+    )
+    notification = __receive(server.stdout)
+    assert notification["method"] == "textDocument/publishDiagnostics"
+    assert notification["params"]["uri"] == uri
+    diagnostics = notification["params"]["diagnostics"]
+    assert [d["code"] for d in diagnostics] == [
+        "sec_def_admin",
+        "sec_hard_secr",
+        "sec_hard_user",
+    ]
+    assert diagnostics[0]["range"]["start"]["line"] == 7
+
+    __send(
+        server.stdin,
+        {
+            "method": "textDocument/didChange",
+            "params": {
+                "textDocument": {"uri": uri, "version": 2},
+                "contentChanges": [{"text": "# empty\n"}],
+            },
+        },
+    )
+    notification = __receive(server.stdout)
+    assert notification["params"]["version"] == 2
+    assert notification["params"]["diagnostics"] == []
+
+    __send(
+        server.stdin,
+        {"method": "textDocument/didClose", "params": {"textDocument": {"uri": uri}}},
+    )
+    notification = __receive(server.stdout)
+    assert notification["params"]["diagnostics"] == []
+
+    __send(server.stdin, {"id": 2, "method": "shutdown"})
+    assert __receive(server.stdout) == {"jsonrpc": "2.0", "id": 2, "result": None}
+    __send(server.stdin, {"method": "exit"})
+    assert server.wait(timeout=10) == 0
+
+
+def test_lsp_settings_reuse_parse():
+    with open("tests/security/puppet/files/admin.pp") as f:
+        text = f.read()
+    uri = "file:///unsaved/manifests/init.pp"
+
+    server = LanguageServer(io.BytesIO(), io.BytesIO(), 0)
+    server.initialize({})
+    server.did_open(
+        {"textDocument": {"uri": uri, "version": 1, "text": text}},
+    )
+    document = server.documents[uri]
+    assert document.timer is not None
+    document.timer.cancel()
+
+    with patch.object(
+        Analyzer, "parse", autospec=True, side_effect=Analyzer.parse
+    ) as m:
+        server.analyze(uri)
+        errors = document.errors
+        assert len(errors) > 0 and m.call_count == 1
+
+        # Only the smells reported change, the text is not parsed again
+        server.update_settings({"glitch": {"smell_types": ["security"]}})
+        assert document.timer is not None
+        document.timer.cancel()
+        server.analyze(uri)
+        assert 0 < len(document.errors) < len(errors)
+        assert document.errors <= errors and m.call_count == 1
+
+    folder = document.folder
+    assert folder is not None and os.path.isdir(folder)
+    server.did_close({"textDocument": {"uri": uri}})
+    assert not os.path.exists(folder)
+
+
+def test_lsp_document_tech():
+    assert get_document_tech("/repo/.github/workflows/ci.yml") == Tech.gha
+    assert get_document_tech("/repo/.github/workflows/ci.yaml") == Tech.gha
+    assert get_document_tech("/repo/.github/dependabot.yml") == Tech.ansible
+    assert get_document_tech("/repo/workflows/site.yml") == Tech.ansible
+    assert get_document_tech("/repo/roles/web/tasks/main.yml") == Tech.ansible
+    assert get_document_tech("/repo/docker/Dockerfile") == Tech.docker
+    assert get_document_tech("/repo/main.tf") == Tech.terraform
+    assert get_document_tech("/repo/README.md") is None